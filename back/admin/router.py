@@ -1,156 +1,125 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
-from core.database import execute, fetch_all
-from client.openai_client import get_embeddings_batch_openai
-from utils.safe_ops import safe_execute
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query
+from core.database import execute, fetch_one, fetch_all
+from client.openai_client import get_embeddings_batch_openai, EmbeddingPipeline, EMBED_BATCH_SIZE, EMBED_CONCURRENCY
+from core.vector import to_vector_param, bulk_update_embeddings
+from core.job_queue import job, enqueue_job, report_progress
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
-@router.post("/migrate/vectors")
-async def migrate_vectors():
-    """
-    [Admin] 기존 데이터 벡터화 마이그레이션 (동기 실행 - 디버깅용)
+# ==========================================================
+#  벡터 마이그레이션 (임베딩 백필)
+#  - Keyset 커서(id > last_id)로 테이블을 한 번만 훑음 (LIMIT 50 반복 스캔 X)
+#  - EmbeddingPipeline으로 batch_size x concurrency 만큼 동시 임베딩
+#  - 저장은 페이지당 UPDATE ... FROM (VALUES) 한 번
+# ==========================================================
+
+def _video_embedding_text(v: dict) -> str:
+    return f"{v['title'] or ''} {v['channel_title'] or ''} {v['tags'] or ''} {(v['description'] or '')[:300]}"
+
+def _channel_embedding_text(c: dict) -> str:
+    return f"{c['name'] or ''} {c['keywords'] or ''} {c['category'] or ''} {(c['description'] or '')[:300]}"
+
+async def _run_embedding_migration(table: str, key_column: str, columns: str, build_text,
+                                   batch_size: int, concurrency: int, tag: str) -> dict:
+    """embedding IS NULL 행을 id 순으로 끝까지 한 번 훑으며 임베딩 생성 + 일괄 저장"""
+    async def _save(results: dict):
+        updated = await bulk_update_embeddings(table, key_column, results)
+        print(f"💾 [{tag}] Saved {updated} vectors")
+
+    pipeline = EmbeddingPipeline(on_flush=_save, batch_size=batch_size, concurrency=concurrency)
+    page_size = pipeline.batch_size * pipeline.concurrency
+    sql = f"""
+        SELECT id, {key_column}, {columns}
+        FROM {table}
+        WHERE embedding IS NULL AND id > :last_id
+        ORDER BY id
+        LIMIT :limit
     """
-    print("🚀 [Migration] API Called. Starting process...")
-    try:
-        count = await _process_vector_migration()
-        return {"message": f"Migration finished. Processed {count} videos."}
-    except Exception as e:
-        print(f"❌ [Migration] Error in wrapper: {e}")
-        return {"error": str(e)}
 
-async def _process_vector_migration():
-    """백그라운드에서 실행될 벡터 마이그레이션 작업 (전체 일괄 처리)"""
-    
-    total_processed = 0
-    
+    # 진행률 계산용 (id 순으로 훑으므로 last_id / max_id)
+    max_row = await fetch_one(f"SELECT MAX(id) AS max_id FROM {table}", use_primary=True)
+    max_id = max_row["max_id"] or 0
+
+    last_id = 0
+    scanned = 0
+    started = time.perf_counter()
     while True:
-        # 1. 임베딩 없는 영상 조회
-        print("🔍 [Migration] Fetching NULL embedding videos...")
-        with safe_execute("Fetch videos without embedding"):
-            sql = """
-                SELECT video_id, title, description, tags, channel_title 
-                FROM youtube_list 
-                WHERE embedding IS NULL 
-                LIMIT 50
-            """
-            videos = await fetch_all(sql)
-        
-        if not videos:
-            print(f"✅ [Migration] All done! Total processed: {total_processed}")
+        # 방금 저장한 임베딩이 복제 지연으로 다시 보이지 않도록 Primary에서 조회
+        rows = await fetch_all(sql, {"last_id": last_id, "limit": page_size}, use_primary=True)
+        if not rows:
             break
 
-        print(f"📦 [Migration] Found {len(videos)} videos. Generating embeddings...")
-        
-        # 2. 텍스트 청크 생성
-        texts = []
-        for v in videos:
-            try:
-                tags = v['tags'] or ""
-                desc = (v['description'] or "")[:300]
-                ch = v['channel_title'] or ""
-                title = v['title'] or ""
-                text = f"{title} {ch} {tags} {desc}"
-                texts.append(text)
-            except Exception as e:
-                print(f"⚠️ Text gen error for video {v.get('video_id')}: {e}")
-                texts.append("") # Error handling
-        
-        # 3. 배치 임베딩 생성 (OpenAI API)
-        from client.openai_client import get_embeddings_batch_openai
-        # safe_execute 대신 직접 try-except (디버깅)
-        try:
-            embeddings = await get_embeddings_batch_openai(texts)
-        except Exception as e:
-             print(f"❌ [Migration] OpenAI Check: Is OPENAI_API_KEY set? Error: {e}")
-             break
-        
-        if not embeddings:
-            print("⚠️ [Migration] Failed to generate embeddings (Empty list returned).")
-            # 0으로라도 채워서 무한루프 방지해야 함? 아니면 Break.
-            # 여기서는 Break.
-            break
+        last_id = rows[-1]["id"]
+        scanned += len(rows)
+        for row in rows:
+            await pipeline.add(row[key_column], build_text(row))
+        await pipeline.flush()
 
-        # 4. DB 업데이트 (하나씩)
-        print(f"💾 [Migration] Saving {len(embeddings)} vectors to DB...")
-        for i, vid in enumerate(videos):
-            try:
-                update_sql = "UPDATE youtube_list SET embedding = CAST(:embed AS vector) WHERE video_id = :vid"
-                # embedding이 list[float]인지 확인
-                vec = embeddings[i]
-                if not vec or len(vec) != 1536:
-                     print(f"⚠️ Invalid vector for {vid['video_id']}, len={len(vec) if vec else 0}")
-                     continue
-                     
-                await execute(update_sql, {"embed": str(vec), "vid": vid['video_id']}) # Vector는 string으로 변환해서 넣는게 안전 (pgvector)
-            except Exception as e:
-                print(f"❌ [Migration] DB Update Error for {vid['video_id']}: {e}")
-                
-        total_processed += len(videos)
-        
-    print("🏁 [Migration] Workflow finished.")
-    return total_processed
+        if max_id:
+            await report_progress(last_id / max_id, f"scanned {scanned}, embedded {pipeline.embedded_count}")
+
+        elapsed = time.perf_counter() - started
+        print(f"📦 [{tag}] Scanned {scanned} (last_id={last_id}), embedded {pipeline.embedded_count}, "
+              f"{round(pipeline.embedded_count / elapsed, 1) if elapsed else 0} rows/s")
+
+    print(f"✅ [{tag}] All done! Scanned: {scanned}, Embedded: {pipeline.embedded_count}, Failed: {pipeline.failed_count}")
+    return {
+        "scanned": scanned,
+        "embedded": pipeline.embedded_count,
+        "failed": pipeline.failed_count,
+        "elapsed_sec": round(time.perf_counter() - started, 2)
+    }
+
+@job("admin.migrate_vectors", concurrency=1, max_attempts=3)
+async def _process_vector_migration(batch_size: int = EMBED_BATCH_SIZE, concurrency: int = EMBED_CONCURRENCY) -> dict:
+    """영상 벡터화 마이그레이션 (전체 일괄 처리)"""
+    return await _run_embedding_migration(
+        "youtube_list", "video_id", "title, description, tags, channel_title",
+        _video_embedding_text, batch_size, concurrency, "Migration"
+    )
 
-async def _process_channel_migration():
+@job("admin.migrate_channels", concurrency=1, max_attempts=3)
+async def _process_channel_migration(batch_size: int = EMBED_BATCH_SIZE, concurrency: int = EMBED_CONCURRENCY) -> dict:
     """채널 데이터 벡터화 마이그레이션"""
-    total_processed = 0
-    while True:
-        print("🔍 [Migration-Ch] Fetching NULL embedding channels...")
-        with safe_execute("Fetch channels"):
-            sql = "SELECT channel_id, name, keywords, description, category FROM youtube_channels WHERE embedding IS NULL LIMIT 50"
-            channels = await fetch_all(sql)
-            
-        if not channels:
-            print(f"✅ [Migration-Ch] All done! Total: {total_processed}")
-            break
-            
-        print(f"📦 [Migration-Ch] Found {len(channels)} channels.")
-        
-        texts = []
-        for c in channels:
-            try:
-                name = c['name'] or ""
-                kw = c['keywords'] or ""
-                desc = (c['description'] or "")[:300]
-                cat = c['category'] or ""
-                texts.append(f"{name} {kw} {cat} {desc}")
-            except Exception:
-                texts.append("")
-                
-        from client.openai_client import get_embeddings_batch_openai
-        try:
-            embeddings = await get_embeddings_batch_openai(texts)
-        except Exception as e:
-            print(f"❌ [Migration-Ch] API Error: {e}")
-            break
-            
-        if not embeddings: break
-        
-        print(f"💾 [Migration-Ch] Saving...")
-        for i, ch in enumerate(channels):
-            try:
-                sql = "UPDATE youtube_channels SET embedding = CAST(:embed AS vector) WHERE channel_id = :cid"
-                vec = embeddings[i]
-                if vec and len(vec) == 1536:
-                    await execute(sql, {"embed": str(vec), "cid": ch['channel_id']})
-            except Exception as e:
-                print(f"❌ [Migration-Ch] DB Error {ch['channel_id']}: {e}")
-                
-        total_processed += len(channels)
-        
-    return total_processed
+    return await _run_embedding_migration(
+        "youtube_channels", "channel_id", "name, keywords, description, category",
+        _channel_embedding_text, batch_size, concurrency, "Migration-Ch"
+    )
+
+@router.post("/migrate/vectors")
+async def migrate_vectors(batch_size: int = EMBED_BATCH_SIZE, concurrency: int = EMBED_CONCURRENCY, background: bool = False):
+    """
+    [Admin] 기존 데이터 벡터화 마이그레이션 (동기 실행 - 디버깅용)
+    - batch_size: OpenAI 요청 1회당 텍스트 수 / concurrency: 동시 요청 수
+    - background=true: 작업 큐에 등록 (worker.py에서 실행, /api/admin/jobs/{job_id}로 진행률 확인)
+    """
+    if background:
+        return await enqueue_job("admin.migrate_vectors", {"batch_size": batch_size, "concurrency": concurrency},
+                                 dedupe_key="admin.migrate_vectors")
+    print(f"🚀 [Migration] API Called. Starting process... (batch={batch_size}, concurrency={concurrency})")
+    try:
+        stats = await _process_vector_migration(batch_size, concurrency)
+        return {"message": f"Migration finished. Processed {stats['embedded']} videos.", **stats}
+    except Exception as e:
+        print(f"❌ [Migration] Error in wrapper: {e}")
+        return {"error": str(e)}
 
 @router.post("/migrate/channels")
-async def migrate_channels():
-    """[Admin] 채널 데이터 벡터화"""
-    print("🚀 [Migration-Ch] Start...")
-    count = await _process_channel_migration()
-    return {"message": f"Channel migration finished. Processed {count} channels."}
+async def migrate_channels(batch_size: int = EMBED_BATCH_SIZE, concurrency: int = EMBED_CONCURRENCY, background: bool = False):
+    """[Admin] 채널 데이터 벡터화 (background=true: 작업 큐에 등록)"""
+    if background:
+        return await enqueue_job("admin.migrate_channels", {"batch_size": batch_size, "concurrency": concurrency},
+                                 dedupe_key="admin.migrate_channels")
+    print(f"🚀 [Migration-Ch] Start... (batch={batch_size}, concurrency={concurrency})")
+    stats = await _process_channel_migration(batch_size, concurrency)
+    return {"message": f"Channel migration finished. Processed {stats['embedded']} channels.", **stats}
 
 @router.post("/discover/channels")
 async def discover_channels_by_keyword(keyword: str):
     """
-    [Admin] 키워드로 상위 30개 채널 발굴하여 자동 추가 + 벡터화
-    Cost: 100 (YouTube Search API 1회)
+    [Admin] 키워드로 활성 채널 최대 30개 발굴하여 자동 추가 + 벡터화
+    Cost: 100 (YouTube Search API 1회, DISCOVER_MAX_PAGES > 1이면 페이지당 +100)
     """
     if not keyword:
         return {"error": "Keyword is required"}
@@ -159,13 +128,13 @@ async def discover_channels_by_keyword(keyword: str):
     
     # 1. 유튜브에서 채널 검색 (RSS 검증된 알짜 채널)
     from client.youtube_client import discover_interest_channels
-    # 단일 키워드 1회 검색 (Cost: 100)
-    result = discover_interest_channels(keyword)
+    # 30개 검증되면 RSS 검증 조기 종료
+    result = await discover_interest_channels(keyword, target_count=30)
     
     if "error" in result:
         return result
         
-    channels = result.get("found_channels", [])[:30] # 상위 30개 제한
+    channels = result.get("found_channels", [])
     print(f"📦 [Discovery] Found {len(channels)} validated channels.")
     
     if not channels:
@@ -208,7 +177,6 @@ async def discover_channels_by_keyword(keyword: str):
             """
             
             vec = embeddings[i] if embeddings and i < len(embeddings) else None
-            vec_str = str(vec) if vec else None
             
             await execute(sql, {
                 "cid": ch["id"],
@@ -217,7 +185,7 @@ async def discover_channels_by_keyword(keyword: str):
                 "cat": "auto-discovered",
                 "thumb": ch["thumbnail"],
                 "desc": ch.get("description", ""),
-                "embed": vec_str
+                "embed": to_vector_param(vec)
             })
             saved_count += 1
         except Exception as e:
@@ -249,3 +217,213 @@ async def fix_schema():
     except Exception as e:
         print(f"❌ [Fix] Error: {e}")
         return {"error": str(e)}
+
+@router.get("/stats/rss-cache")
+async def rss_cache_stats():
+    """[Admin] RSS 피드 캐시 적중/재검증 통계 (/interest/rss, 채널 발굴 절감 효과 확인용)"""
+    from client.youtube_client import get_feed_cache_stats
+    return get_feed_cache_stats()
+
+@router.get("/stats/embedding-cache")
+async def embedding_cache_stats():
+    """[Admin] 검색어 임베딩 캐시 적중 통계"""
+    from core.embedding_cache import get_embedding_cache_stats
+    return get_embedding_cache_stats()
+
+@router.get("/stats/auth")
+async def auth_stats():
+    """[Admin] 인증 유저 캐시 적중 / 활동 시간 Write-Behind / Presence 통계"""
+    from user.cache import user_cache
+    from user.activity import activity_tracker
+    from user.presence import presence
+    return {
+        "user_cache": user_cache.snapshot(),
+        "activity": activity_tracker.snapshot(),
+        "presence": await presence.snapshot()
+    }
+
+@router.get("/stats/db-pool")
+async def db_pool_stats():
+    """[Admin] DB 커넥션 풀 상태 + 커넥션 획득 대기 시간 (Primary / 읽기 복제본)"""
+    from core.database import get_pool_stats
+    return {"engines": get_pool_stats()}
+
+@router.get("/stats/random-sampler")
+async def random_sampler_stats():
+    """[Admin] 랜덤 샘플러 풀 크기 / 풀 적중 / Probe / TABLESAMPLE 횟수"""
+    from content.youtube.sampler import random_sampler
+    return random_sampler.snapshot()
+
+@router.get("/stats/watch-time")
+async def watch_time_stats():
+    """[Admin] 시청 시간 Write-Behind 버퍼 대기 건수 / flush 지연 (유실 가능 구간)"""
+    from content.youtube.watch_time import watch_time_buffer
+    return watch_time_buffer.snapshot()
+
+@router.get("/stats/enrichment")
+async def enrichment_stats():
+    """[Admin] 영상 메타데이터 보강 큐 대기/합침/버림/처리 건수"""
+    from content.youtube.enrichment import enrichment_queue
+    return enrichment_queue.snapshot()
+
+@router.get("/stats/crawler")
+async def crawler_stats():
+    """[Admin] 인기 영상 크롤러 샤드별 체크포인트 (진행 위치 / 마지막 실행 신규·갱신·생략 건수)"""
+    from content.youtube.crawler import list_checkpoints
+    return {"shards": await list_checkpoints()}
+
+@router.get("/stats/crawler/plan")
+async def crawler_plan(force: bool = False):
+    """[Admin] 다음 글로벌 수집 실행 순서 미리보기 (샤드별 예상 쿼터 / 변화율 / 우선순위 + 남은 쿼터)"""
+    from content.youtube.crawl_scheduler import CrawlScheduler
+    from content.youtube.service import trend_shards
+    from client.youtube_client import _manage_quota
+    scheduler = CrawlScheduler()
+    plan = await scheduler.plan(trend_shards(), force=force)
+    remaining, limit = _manage_quota(cost=0)
+    return {
+        "quota": {"remaining": remaining, "limit": limit, "reserve": scheduler.quota_reserve},
+        "concurrency": scheduler.concurrency,
+        "projected_cost": sum(p["cost"] for p in plan),
+        "shards": plan
+    }
+
+@router.get("/stats/hybrid-search")
+async def hybrid_search_stats():
+    """[Admin] 하이브리드 검색 질의 수 / 레그별 타임아웃·에러 횟수"""
+    from content.search.tools.hybrid_search import get_hybrid_search_stats
+    return get_hybrid_search_stats()
+
+@router.get("/stats/statements")
+async def statement_stats(limit: int = 50, reset: bool = False):
+    """[Admin] SQL Statement별 실행 횟수 / 누적·평균·최대 시간 (누적 시간 상위순)"""
+    from core.database import get_statement_stats, reset_statement_stats, DB_PREPARED_STATEMENT_CACHE_SIZE
+    stats = get_statement_stats(limit)
+    if reset:
+        reset_statement_stats()
+    return {"prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE, "statements": stats}
+
+# ========================================================
+#  벡터 인덱스 관리 (HNSW / IVFFlat)
+# ========================================================
+
+@router.get("/vector-index")
+async def list_vector_indexes():
+    """[Admin] 벡터 컬럼 인덱스 목록 조회"""
+    from core.vector import get_vector_indexes
+    return {"indexes": await get_vector_indexes()}
+
+@router.post("/vector-index/rebuild")
+async def rebuild_vector_index_endpoint(
+    table: str = "youtube_list",
+    method: str = "hnsw",
+    m: int = 16,
+    ef_construction: int = 64,
+    lists: int = 100
+):
+    """
+    [Admin] ANN 인덱스 무중단 재생성 (CONCURRENTLY)
+    - method: hnsw (m, ef_construction) | ivfflat (lists)
+    """
+    from core.vector import rebuild_vector_index
+    try:
+        return await rebuild_vector_index(table, method=method, m=m, ef_construction=ef_construction, lists=lists)
+    except Exception as e:
+        print(f"❌ [VectorIndex] Rebuild Error: {e}")
+        return {"error": str(e)}
+
+@router.get("/vector-index/benchmark")
+async def benchmark_vector_index_endpoint(
+    table: str = "youtube_list",
+    method: str = "hnsw",
+    k: int = 10,
+    samples: int = 20,
+    ef_search: str = "20,40,80,160",
+    probes: str = "1,5,10,20"
+):
+    """
+    [Admin] 정확 검색 대비 ANN Recall@k / 지연시간(p50, p95) 측정
+    - ef_search, probes: 콤마로 구분한 후보 값 목록
+    """
+    from core.vector import benchmark_vector_search
+    try:
+        return await benchmark_vector_search(
+            table,
+            k=k,
+            samples=samples,
+            method=method,
+            ef_search_values=[int(v) for v in ef_search.split(",") if v.strip()],
+            probes_values=[int(v) for v in probes.split(",") if v.strip()]
+        )
+    except Exception as e:
+        print(f"❌ [VectorIndex] Benchmark Error: {e}")
+        return {"error": str(e)}
+
+# ========================================================
+#  키워드 검색 벤치마크 (ILIKE vs pg_trgm)
+# ========================================================
+
+@router.get("/search/benchmark")
+async def search_benchmark(
+    q: list[str] = Query(...),
+    target: str = "video",
+    limit: int = 20,
+    runs: int = 5
+):
+    """
+    [Admin] 키워드 검색 지연시간 비교 (기존 ILIKE Seq Scan vs 트라이그램 GIN 인덱스)
+    예: /api/admin/search/benchmark?q=먹방&q=브이로그&target=video
+    """
+    from content.search.tools.keyword_search import benchmark_keyword_search
+    if target not in ("video", "channel"):
+        return {"error": "target must be video or channel"}
+    return await benchmark_keyword_search(q, target=target, limit=limit, runs=runs)
+
+# ========================================================
+#  유저 취향 벡터 재계산
+# ========================================================
+
+@router.post("/taste/rebuild")
+async def rebuild_taste_vectors(user_id: int = None):
+    """
+    [Admin] 취향 벡터 전체 재계산 (증분 갱신 누적 오차 / 나중에 임베딩된 영상 반영)
+    - user_id 지정 시 해당 유저만 즉시 재계산, 없으면 전체를 작업 큐로
+    """
+    from content.youtube.taste_vector import rebuild_taste_vector
+    if user_id is not None:
+        return await rebuild_taste_vector(user_id)
+    return await enqueue_job("taste.rebuild_all", dedupe_key="taste.rebuild_all")
+
+
+# ========================================================
+#  백그라운드 작업 큐 (jobs 테이블)
+# ========================================================
+
+@router.get("/jobs")
+async def list_jobs_endpoint(status: str = None, job_type: str = None, limit: int = 50):
+    """[Admin] 작업 목록 (최신순, status: queued | running | succeeded | failed)"""
+    from core.job_queue import list_jobs
+    return {"jobs": await list_jobs(status, job_type, limit)}
+
+@router.get("/jobs/stats")
+async def job_stats():
+    """[Admin] 작업 종류/상태별 건수 (최근 1일 완료 + 대기/실행 중)"""
+    from core.job_queue import get_job_counts
+    return {"counts": await get_job_counts()}
+
+@router.get("/jobs/{job_id}")
+async def get_job_endpoint(job_id: int):
+    """[Admin] 작업 상태 / 진행률 / 결과 / 마지막 에러"""
+    from core.job_queue import get_job
+    found = await get_job(job_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return found
+
+@router.post("/jobs/{job_id}/retry")
+async def retry_job_endpoint(job_id: int):
+    """[Admin] 실패한 작업 즉시 재시도"""
+    from core.job_queue import retry_job
+    if not await retry_job(job_id):
+        raise HTTPException(status_code=409, detail="Only failed jobs can be retried")
+    return {"job_id": job_id, "status": "queued"}
@@ -0,0 +1,39 @@
+"""add ANN (HNSW) vector indexes on embedding columns
+
+Revision ID: 6b1e7c2d9a41
+Revises: 51d6f3c9b2f3
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1e7c2d9a41'
+down_revision: Union[str, Sequence[str], None] = '51d6f3c9b2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 대용량 테이블 쓰기 차단 방지를 위해 CONCURRENTLY 생성 (트랜잭션 밖에서 실행)
+    # 파라미터 변경/재생성은 POST /api/admin/vector-index/rebuild 사용
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_list_embedding_ann
+            ON youtube_list USING hnsw (embedding vector_cosine_ops)
+            WITH (m = 16, ef_construction = 64)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_channels_embedding_ann
+            ON youtube_channels USING hnsw (embedding vector_cosine_ops)
+            WITH (m = 16, ef_construction = 64)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_channels_embedding_ann")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_list_embedding_ann")
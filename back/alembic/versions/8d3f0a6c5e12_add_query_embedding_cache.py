@@ -0,0 +1,36 @@
+"""add query_embedding_cache table
+
+Revision ID: 8d3f0a6c5e12
+Revises: 6b1e7c2d9a41
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f0a6c5e12'
+down_revision: Union[str, Sequence[str], None] = '6b1e7c2d9a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('query_embedding_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('query_text', sa.Text(), nullable=True),
+    sa.Column('embedding', Vector(1536), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index(op.f('ix_query_embedding_cache_created_at'), 'query_embedding_cache', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_query_embedding_cache_created_at'), table_name='query_embedding_cache')
+    op.drop_table('query_embedding_cache')
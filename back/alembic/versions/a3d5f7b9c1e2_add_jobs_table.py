@@ -0,0 +1,57 @@
+"""add jobs table for the Postgres-backed background job queue
+
+Revision ID: a3d5f7b9c1e2
+Revises: f2b6d4e8a1c3
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d5f7b9c1e2'
+down_revision: Union[str, Sequence[str], None] = 'f2b6d4e8a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('job_type', sa.String(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), server_default='{}', nullable=False),
+    sa.Column('status', sa.String(), server_default='queued', nullable=False),
+    sa.Column('priority', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('dedupe_key', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('max_attempts', sa.Integer(), server_default='3', nullable=False),
+    sa.Column('run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_by', sa.String(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('progress', sa.Float(), nullable=True),
+    sa.Column('progress_message', sa.Text(), nullable=True),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # 워커 Claim 쿼리 (status = 'queued' 부분 인덱스 -> 완료 작업이 쌓여도 작게 유지)
+    op.create_index('ix_jobs_claim', 'jobs', ['job_type', sa.text('priority DESC'), 'run_at', 'id'],
+                    unique=False, postgresql_where=sa.text("status = 'queued'"))
+    # 같은 dedupe_key는 대기/실행 중 1개만 (중복 수집 요청 방지)
+    op.create_index('uq_jobs_dedupe_active', 'jobs', ['dedupe_key'],
+                    unique=True, postgresql_where=sa.text("status IN ('queued', 'running')"))
+    op.create_index('ix_jobs_created_at', 'jobs', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_created_at', table_name='jobs')
+    op.drop_index('uq_jobs_dedupe_active', table_name='jobs')
+    op.drop_index('ix_jobs_claim', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,47 @@
+"""add crawl_checkpoints table and youtube_list.etag for the incremental trend crawler
+
+Revision ID: b6e8d2f4a7c9
+Revises: a3d5f7b9c1e2
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e8d2f4a7c9'
+down_revision: Union[str, Sequence[str], None] = 'a3d5f7b9c1e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 영상 리소스 ETag (같으면 메타데이터/조회수 변화 없음 -> DB 쓰기 생략)
+    op.add_column('youtube_list', sa.Column('etag', sa.String(), nullable=True))
+
+    # (국가, 카테고리) 샤드별 진행 상황 -> 중단 지점(page_token)부터 재개
+    op.create_table('crawl_checkpoints',
+    sa.Column('shard_key', sa.String(), nullable=False),
+    sa.Column('country', sa.String(), nullable=False),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), server_default='running', nullable=False),
+    sa.Column('page_token', sa.String(), nullable=True),
+    sa.Column('pages_done', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('list_etag', sa.String(), nullable=True),
+    sa.Column('items_seen', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('items_new', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('items_updated', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('items_skipped', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('shard_key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('crawl_checkpoints')
+    op.drop_column('youtube_list', 'etag')
@@ -0,0 +1,50 @@
+"""add keyset pagination indexes for video feed and channel list
+
+Revision ID: c5a7e2d4f918
+Revises: 8d3f0a6c5e12
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a7e2d4f918'
+down_revision: Union[str, Sequence[str], None] = '8d3f0a6c5e12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# core.pagination.EPOCH_SQL 과 같은 식이어야 플래너가 인덱스를 사용
+EPOCH = "TIMESTAMPTZ '1970-01-01 00:00:00+00'"
+
+
+def upgrade() -> None:
+    # (정렬값 DESC, id DESC) 표현식 인덱스 -> WHERE (정렬값, id) < 커서 조건을 Index Seek로 처리
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_list_feed_newest
+            ON youtube_list ((COALESCE(published_at, {EPOCH})) DESC, id DESC)
+        """)
+        op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_list_feed_country_newest
+            ON youtube_list (country_code, (COALESCE(published_at, {EPOCH})) DESC, id DESC)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_list_feed_popular
+            ON youtube_list ((COALESCE(view_count, -1)) DESC, id DESC)
+        """)
+        op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_channels_list_created
+            ON youtube_channels ((COALESCE(created_at, {EPOCH})) DESC, id DESC)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_channels_list_created")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_list_feed_popular")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_list_feed_country_newest")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_list_feed_newest")
@@ -0,0 +1,32 @@
+"""enqueue a one-time taste vector rebuild for existing users
+
+Revision ID: c9f1a3e5b7d2
+Revises: b6e8d2f4a7c9
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f1a3e5b7d2'
+down_revision: Union[str, Sequence[str], None] = 'b6e8d2f4a7c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # e4a9c2b7f6d1은 취향 벡터를 채우지 않음 -> 기존 시청 기록/구독을 반영하도록 전체 재계산 1회 예약
+    # (워커가 taste.rebuild_all 처리, 이미 대기/실행 중이면 건너뜀)
+    op.execute("""
+        INSERT INTO jobs (job_type, payload, priority, dedupe_key, max_attempts, run_at, created_at)
+        VALUES ('taste.rebuild_all', '{}'::jsonb, 0, 'taste.rebuild_all', 2, NOW(), NOW())
+        ON CONFLICT (dedupe_key) WHERE status IN ('queued', 'running') DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    # 아직 시작 안 한 예약만 취소 (이미 재계산된 벡터는 그대로)
+    op.execute("DELETE FROM jobs WHERE job_type = 'taste.rebuild_all' AND status = 'queued'")
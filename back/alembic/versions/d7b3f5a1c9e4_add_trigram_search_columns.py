@@ -0,0 +1,55 @@
+"""add pg_trgm search_text columns and GIN trigram indexes
+
+Revision ID: d7b3f5a1c9e4
+Revises: c5a7e2d4f918
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3f5a1c9e4'
+down_revision: Union[str, Sequence[str], None] = 'c5a7e2d4f918'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 트라이그램은 형태소 분석 없이 글자 단위로 쪼개므로 한국어(띄어쓰기/조사)에도 그대로 동작
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # 검색 대상 컬럼을 합친 소문자 텍스트 (Generated Column -> 수집/수정 시 DB가 자동 갱신, 트리거 불필요)
+    # 주의: STORED 컬럼 추가는 테이블 재작성 (짧은 배타 잠금)
+    op.execute("""
+        ALTER TABLE youtube_list ADD COLUMN IF NOT EXISTS search_text TEXT
+        GENERATED ALWAYS AS (
+            lower(coalesce(title, '') || ' ' || coalesce(channel_title, '') || ' ' || coalesce(tags, ''))
+        ) STORED
+    """)
+    op.execute("""
+        ALTER TABLE youtube_channels ADD COLUMN IF NOT EXISTS search_text TEXT
+        GENERATED ALWAYS AS (
+            lower(coalesce(name, '') || ' ' || coalesce(keywords, '') || ' ' || coalesce(description, ''))
+        ) STORED
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_list_search_trgm
+            ON youtube_list USING gin (search_text gin_trgm_ops)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_channels_search_trgm
+            ON youtube_channels USING gin (search_text gin_trgm_ops)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_channels_search_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_list_search_trgm")
+    op.execute("ALTER TABLE youtube_channels DROP COLUMN IF EXISTS search_text")
+    op.execute("ALTER TABLE youtube_list DROP COLUMN IF EXISTS search_text")
@@ -0,0 +1,32 @@
+"""add user taste embedding columns
+
+Revision ID: e4a9c2b7f6d1
+Revises: d7b3f5a1c9e4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c2b7f6d1'
+down_revision: Union[str, Sequence[str], None] = 'd7b3f5a1c9e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 취향 벡터 (시청/구독 임베딩 가중 평균) + 누적 가중치 (증분 평균 계산용)
+    # PK로만 읽으므로 ANN 인덱스 불필요
+    op.execute('ALTER TABLE "user" ADD COLUMN IF NOT EXISTS taste_embedding vector(1536)')
+    op.add_column('user', sa.Column('taste_weight', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('user', sa.Column('taste_updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'taste_updated_at')
+    op.drop_column('user', 'taste_weight')
+    op.execute('ALTER TABLE "user" DROP COLUMN IF EXISTS taste_embedding')
@@ -0,0 +1,87 @@
+"""dedupe user_youtube_logs and add unique (user_id, video_id) index
+
+Revision ID: f2b6d4e8a1c3
+Revises: e4a9c2b7f6d1
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d4e8a1c3'
+down_revision: Union[str, Sequence[str], None] = 'e4a9c2b7f6d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = 'uq_user_youtube_logs_user_video'
+BUILD_ATTEMPTS = 3
+
+
+def _dedupe() -> None:
+    # 중복 정리: (user_id, video_id)별 가장 최근 행(id 최대)만 남기고,
+    # 시청 시간은 최대값 / 최초·최근 시청 시각은 그룹 전체 기준으로 합침
+    op.execute("""
+        WITH merged AS (
+            SELECT user_id, video_id,
+                   MAX(id) AS keep_id,
+                   MAX(watched_seconds) AS watched_seconds,
+                   MIN(created_at) AS created_at,
+                   MAX(updated_at) AS updated_at
+            FROM user_youtube_logs
+            GROUP BY user_id, video_id
+            HAVING COUNT(*) > 1
+        )
+        UPDATE user_youtube_logs l
+        SET watched_seconds = m.watched_seconds,
+            created_at = m.created_at,
+            updated_at = m.updated_at
+        FROM merged m
+        WHERE l.id = m.keep_id
+    """)
+    op.execute("""
+        DELETE FROM user_youtube_logs l
+        USING user_youtube_logs newer
+        WHERE newer.user_id = l.user_id
+          AND newer.video_id = l.video_id
+          AND newer.id > l.id
+    """)
+
+
+def _drop_invalid_index() -> None:
+    # CONCURRENTLY 생성이 실패하면 INVALID 인덱스가 남음 -> IF NOT EXISTS가 건너뛰지 않도록 먼저 제거
+    invalid = op.get_bind().execute(sa.text("""
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :name AND NOT i.indisvalid
+    """), {"name": INDEX_NAME}).first()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+
+
+def upgrade() -> None:
+    # 유니크 인덱스 (무중단 생성) -> log_view의 ON CONFLICT (user_id, video_id) 대상
+    # 구버전 앱이 정리 ~ 생성 사이에 중복을 다시 넣을 수 있으므로 생성 직전에 매번 정리하고, 실패하면 다시 시도
+    with op.get_context().autocommit_block():
+        for attempt in range(1, BUILD_ATTEMPTS + 1):
+            _drop_invalid_index()
+            _dedupe()
+            try:
+                op.execute(f"""
+                    CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME}
+                    ON user_youtube_logs (user_id, video_id)
+                """)
+                break
+            except sa.exc.IntegrityError:
+                if attempt == BUILD_ATTEMPTS:
+                    _drop_invalid_index()
+                    raise
+
+
+def downgrade() -> None:
+    # 정리된 중복 행은 복구하지 않음
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
@@ -69,7 +69,7 @@ def _parse_items(items):
         results.append(place)
     return results
 
-def search_place(query: str, display: int = 5):
+async def search_place(query: str, display: int = 5):
     """
     네이버 지역 검색 API를 호출합니다. (외부 노출 함수)
     """
@@ -85,7 +85,7 @@ def search_place(query: str, display: int = 5):
     url = f"{BASE_URL}?query={encoded_query}&display={display}&sort=random"
     
     # safe_ops를 이용한 안전한 HTTP 호출
-    data, error = safe_http_get(url, headers)
+    data, error = await safe_http_get(url, headers)
     
     if error:
         return {"error": error}
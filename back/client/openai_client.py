@@ -2,10 +2,12 @@ import os
 from dotenv import load_dotenv
 load_dotenv(override=True)
 
+import asyncio
 from openai import AsyncOpenAI
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from typing import List
+from typing import Awaitable, Callable, Dict, List
+from utils.rate_limit import TokenBucket
 
 # ========================================================
 #  OpenAI Client (Chat & Embedding)
@@ -13,6 +15,8 @@ from typing import List
 
 _async_client = None
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
 def get_async_client():
     global _async_client
     if not _async_client:
@@ -34,7 +38,7 @@ async def get_embedding_openai(text: str) -> List[float]:
     try:
         response = await client.embeddings.create(
             input=[text],
-            model="text-embedding-3-small"
+            model=EMBEDDING_MODEL
         )
         return response.data[0].embedding
     except Exception as e:
@@ -46,17 +50,118 @@ async def get_embeddings_batch_openai(texts: List[str]) -> List[List[float]]:
     if not texts:
         return []
     
+    # OpenAI는 빈 문자열 입력을 거부하므로 공백으로 치환
+    texts = [(t or " ").replace("\n", " ") for t in texts]
     client = get_async_client()
     try:
         response = await client.embeddings.create(
             input=texts,
-            model="text-embedding-3-small"
+            model=EMBEDDING_MODEL
         )
         return [d.embedding for d in response.data]
     except Exception as e:
         print(f"⚠️ OpenAI Batch Error: {e}")
         return [[0.0] * 1536 for _ in texts]
 
+# --------------------------------------------------------
+#  Embedding Pipeline (Batch + Concurrency + Rate Limit)
+# --------------------------------------------------------
+
+EMBED_BATCH_SIZE = int(os.getenv("OPENAI_EMBED_BATCH_SIZE", "100"))     # 요청 1회당 텍스트 수
+EMBED_CONCURRENCY = int(os.getenv("OPENAI_EMBED_CONCURRENCY", "4"))     # 동시 요청 수
+EMBED_TPM = int(os.getenv("OPENAI_EMBED_TPM", "1000000"))               # 분당 토큰 한도 (Tier별 상이)
+
+_embed_bucket = None
+
+def get_embed_bucket() -> TokenBucket:
+    """프로세스 전역 임베딩 토큰 버킷 (여러 파이프라인이 한도를 공유)"""
+    global _embed_bucket
+    if not _embed_bucket:
+        _embed_bucket = TokenBucket(capacity=EMBED_TPM, refill_per_sec=EMBED_TPM / 60)
+    return _embed_bucket
+
+def _estimate_tokens(text: str) -> int:
+    # 한글은 글자당 토큰이 많으므로 보수적으로 2글자 = 1토큰으로 추정
+    return max(1, len(text) // 2)
+
+def _is_valid_vector(vec) -> bool:
+    # API 실패 시 get_embeddings_batch_openai가 0 벡터를 돌려주므로 저장 대상에서 제외
+    return bool(vec) and len(vec) == 1536 and any(vec)
+
+
+class EmbeddingPipeline:
+    """
+    배치 임베딩 파이프라인
+    - add()로 (key, text)를 쌓아두고, batch_size 단위로 잘라 get_embeddings_batch_openai 호출
+    - 최대 concurrency개의 배치를 동시에 요청 (토큰 버킷으로 분당 토큰 한도 준수)
+    - 결과는 on_flush 콜백에 {key: vector} 형태로 한 번에 전달 (DB Bulk Write)
+    - 실패한(0 벡터) 항목은 전달하지 않음 -> embedding IS NULL로 남아 마이그레이션에서 재시도
+
+    사용법:
+        pipeline = EmbeddingPipeline(on_flush=save_embeddings)
+        await pipeline.add(video_id, text)   # 쌓이면 자동 flush
+        await pipeline.flush()               # 남은 것 마무리
+    """
+    def __init__(
+        self,
+        on_flush: Callable[[Dict[str, List[float]]], Awaitable[None]],
+        batch_size: int = EMBED_BATCH_SIZE,
+        concurrency: int = EMBED_CONCURRENCY,
+        bucket: TokenBucket = None
+    ):
+        self.on_flush = on_flush
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.bucket = bucket or get_embed_bucket()
+        self.pending: Dict[str, str] = {}
+        self.embedded_count = 0
+        self.failed_count = 0
+
+    async def add(self, key: str, text: str):
+        """임베딩 대상 추가 (동일 key는 마지막 텍스트로 덮어씀)"""
+        if not text or not text.strip():
+            return
+        self.pending[key] = text.replace("\n", " ")
+        # 동시 요청 슬롯을 가득 채울 만큼 쌓이면 flush
+        if len(self.pending) >= self.batch_size * self.concurrency:
+            await self.flush()
+
+    async def _embed_batch(self, semaphore: asyncio.Semaphore, keys: List[str], texts: List[str]) -> Dict[str, List[float]]:
+        async with semaphore:
+            await self.bucket.acquire(sum(_estimate_tokens(t) for t in texts))
+            vectors = await get_embeddings_batch_openai(texts)
+
+        results = {}
+        for key, vec in zip(keys, vectors):
+            if _is_valid_vector(vec):
+                results[key] = vec
+        return results
+
+    async def flush(self) -> int:
+        """쌓인 텍스트를 모두 임베딩하고 on_flush로 일괄 저장. 저장된 개수 반환"""
+        if not self.pending:
+            return 0
+
+        items = list(self.pending.items())
+        self.pending = {}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        for i in range(0, len(items), self.batch_size):
+            chunk = items[i:i + self.batch_size]
+            tasks.append(self._embed_batch(semaphore, [k for k, _ in chunk], [t for _, t in chunk]))
+
+        results = {}
+        for batch_result in await asyncio.gather(*tasks):
+            results.update(batch_result)
+
+        self.embedded_count += len(results)
+        self.failed_count += len(items) - len(results)
+
+        if results:
+            await self.on_flush(results)
+        return len(results)
+
 # --------------------------------------------------------
 #  Chat Methods (LangChain)
 # --------------------------------------------------------
@@ -1,11 +1,16 @@
 import re
 import os
+import time
+import asyncio
+import heapq
+from collections import OrderedDict
+from itertools import islice
 import urllib.parse
-import requests
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from dotenv import load_dotenv
 from utils.safe_ops import safe_http_get, load_json_safe, save_json_safe, append_json_line
+from utils.http_client import http_get
 
 # .env 로드
 env_path = os.path.join(os.path.dirname(__file__), '..', '..', '.env')
@@ -18,6 +23,9 @@ API_KEY = os.getenv("YOUTUBE_API_KEY") or os.getenv("VITE_YOUTUBE_API_KEY")
 BASE_URL = "https://www.googleapis.com/youtube/v3"
 CHANNELS_FILE = os.path.join(os.path.dirname(__file__), 'dating_channels.json')
 
+RSS_CONCURRENCY = int(os.getenv("RSS_CONCURRENCY", "16"))      # 동시에 긁을 피드 수
+RSS_FEED_TIMEOUT = float(os.getenv("RSS_FEED_TIMEOUT", "5"))    # 피드 1개당 최대 대기 (초, 재시도 포함)
+
 def save_interaction_log(log_data: dict):
     log_file = os.path.join(os.path.dirname(__file__), '..', 'logs', 'youtube_interaction.jsonl')
     log_data['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -76,48 +84,178 @@ def _parse_videos(items):
             "publishedAt": snippet.get('publishedAt'),
             "viewCount": statistics.get('viewCount'),
             "duration": duration_sec,
-            "isShort": is_short
+            "isShort": is_short,
+            "etag": item.get('etag')                # 리소스 ETag (내용이 바뀌면 달라짐)
         })
     return results
 
-def get_channel_rss(channel_id: str):
+# =========================================================
+#  RSS 피드 캐시 (TTL + Conditional GET)
+# =========================================================
+RSS_CACHE_TTL = int(os.getenv("RSS_CACHE_TTL", "600"))            # 메모리에서 바로 응답하는 시간 (초)
+RSS_CACHE_MAX_SIZE = int(os.getenv("RSS_CACHE_MAX_SIZE", "5000"))  # 최대 보관 채널 수 (LRU)
+
+class FeedCache:
+    """
+    채널별 RSS 파싱 결과 캐시
+    - TTL 이내: 네트워크 없이 메모리에서 응답 (hit)
+    - TTL 경과: ETag/Last-Modified로 조건부 GET -> 304면 파싱 없이 재사용 (revalidated)
+    - 변경됨/최초: 다운로드 + 파싱 후 저장 (refetched / miss)
+    """
+    def __init__(self, ttl: int = RSS_CACHE_TTL, max_size: int = RSS_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        # channel_id -> {"videos": [...], "etag": str, "last_modified": str, "fetched_at": float}
+        self.entries: OrderedDict[str, dict] = OrderedDict()
+        self.stats = {"hit": 0, "miss": 0, "revalidated": 0, "refetched": 0, "stale_served": 0, "error": 0}
+
+    def get(self, channel_id: str) -> dict | None:
+        entry = self.entries.get(channel_id)
+        if entry:
+            self.entries.move_to_end(channel_id)
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.monotonic() - entry["fetched_at"] < self.ttl
+
+    def put(self, channel_id: str, videos: list, etag: str = None, last_modified: str = None):
+        self.entries[channel_id] = {
+            "videos": videos,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.monotonic()
+        }
+        self.entries.move_to_end(channel_id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def touch(self, channel_id: str):
+        self.entries[channel_id]["fetched_at"] = time.monotonic()
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hit"] + self.stats["miss"] + self.stats["revalidated"] + self.stats["refetched"]
+        saved = self.stats["hit"] + self.stats["revalidated"]
+        return {
+            **self.stats,
+            "size": len(self.entries),
+            "ttl": self.ttl,
+            "saved_ratio": round(saved / lookups, 3) if lookups else 0.0
+        }
+
+feed_cache = FeedCache()
+
+def get_feed_cache_stats() -> dict:
+    """RSS 캐시 적중/재검증 통계 (Admin 모니터링용)"""
+    return feed_cache.snapshot()
+
+def _copy_videos(videos: list) -> list:
+    # 호출자가 channelTitle 등을 주입(변경)하므로 캐시 원본 보호
+    return [dict(v) for v in videos]
+
+def _parse_rss(content: bytes) -> list:
+    root = ET.fromstring(content)
+    ns = {'atom': 'http://www.w3.org/2005/Atom', 'yt': 'http://www.youtube.com/xml/schemas/2015'}
+    
+    videos = []
+    for entry in root.findall('atom:entry', ns):
+        video_id = entry.find('yt:videoId', ns).text
+        title = entry.find('atom:title', ns).text
+        published = entry.find('atom:published', ns).text
+        thumbnail = f"https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"
+        author = entry.find('atom:author', ns)
+        channel_title = author.find('atom:name', ns).text if author is not None else "Unknown"
+
+        videos.append({
+            "id": video_id,
+            "title": title,
+            "description": "",
+            "thumbnail": thumbnail,
+            "channelTitle": channel_title,
+            "publishedAt": published,
+            "viewCount": None, 
+            "duration": 0,
+            "isShort": False,
+            # RSS item doesn't come with channel ID, but we know it from context
+            # "channelId": channel_id (Injected by caller)
+        })
+    return videos
+
+async def get_channel_rss(channel_id: str):
     url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+
+    # 1. TTL 이내면 네트워크 없이 응답
+    entry = feed_cache.get(channel_id)
+    if entry and feed_cache.is_fresh(entry):
+        feed_cache.stats["hit"] += 1
+        return _copy_videos(entry["videos"])
+
+    # 2. 조건부 GET 헤더 (캐시가 있으면)
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
     try:
-        response = requests.get(url, timeout=5)
+        response = await http_get(url, headers=headers or None, timeout=5)
+
+        # 304 Not Modified -> 파싱 비용 0
+        if response.status_code == 304 and entry:
+            feed_cache.stats["revalidated"] += 1
+            feed_cache.touch(channel_id)
+            return _copy_videos(entry["videos"])
+
         if response.status_code != 200:
-            return []
+            raise ValueError(f"HTTP {response.status_code}")
             
-        root = ET.fromstring(response.content)
-        ns = {'atom': 'http://www.w3.org/2005/Atom', 'yt': 'http://www.youtube.com/xml/schemas/2015'}
-        
-        videos = []
-        for entry in root.findall('atom:entry', ns):
-            video_id = entry.find('yt:videoId', ns).text
-            title = entry.find('atom:title', ns).text
-            published = entry.find('atom:published', ns).text
-            thumbnail = f"https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"
-            author = entry.find('atom:author', ns)
-            channel_title = author.find('atom:name', ns).text if author is not None else "Unknown"
-
-            videos.append({
-                "id": video_id,
-                "title": title,
-                "description": "",
-                "thumbnail": thumbnail,
-                "channelTitle": channel_title,
-                "publishedAt": published,
-                "viewCount": None, 
-                "duration": 0,
-                "isShort": False,
-                # RSS item doesn't come with channel ID, but we know it from context
-                # "channelId": channel_id (Injected by caller)
-            })
-        return videos
+        videos = _parse_rss(response.content)
+        feed_cache.stats["refetched" if entry else "miss"] += 1
+        feed_cache.put(
+            channel_id,
+            videos,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified")
+        )
+        return _copy_videos(videos)
     except Exception as e:
         print(f"RSS Parsing Error ({channel_id}): {e}")
+        feed_cache.stats["error"] += 1
+        # 실패 시 오래된 캐시라도 있으면 사용 (Stale-if-error)
+        if entry:
+            feed_cache.stats["stale_served"] += 1
+            return _copy_videos(entry["videos"])
         return []
 
-def get_dating_videos():
+async def fetch_channel_feeds(channel_ids: list, concurrency: int = RSS_CONCURRENCY, timeout: float = RSS_FEED_TIMEOUT) -> list:
+    """
+    여러 채널 RSS 동시 수집 (Bounded Worker Pool)
+    - 최대 concurrency개만 동시에 요청, 피드별 timeout 초과 시 빈 리스트 처리
+    - 반환 순서는 channel_ids 순서와 동일: [[videos of ch1], [videos of ch2], ...]
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _fetch(channel_id: str):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(get_channel_rss(channel_id), timeout)
+            except asyncio.TimeoutError:
+                print(f"RSS Timeout ({channel_id}): >{timeout}s")
+                return []
+
+    return await asyncio.gather(*[_fetch(cid) for cid in channel_ids])
+
+def _merge_latest(feeds: list, limit: int = None) -> list:
+    """
+    채널별 최신순 리스트를 k-way merge (전체 합친 뒤 정렬하지 않음)
+    limit이 있으면 앞에서 limit개만 꺼내고 중단
+    """
+    for feed in feeds:
+        # Atom 피드는 보통 이미 최신순 -> 정렬돼 있으면 O(n) 검사로 끝남 (Timsort)
+        feed.sort(key=lambda x: x['publishedAt'] or '', reverse=True)
+    merged = heapq.merge(*feeds, key=lambda x: x['publishedAt'] or '', reverse=True)
+    return list(islice(merged, limit)) if limit else list(merged)
+
+async def get_dating_videos():
     """
     JSON 파일에 저장된 연애 관련 유튜버들의 최신 영상을 RSS로 긁어옵니다. (Cost: 0)
     """
@@ -130,15 +268,14 @@ def get_dating_videos():
             {"id": "UCIfadKo7fcwSfgARMTz7xzA", "name": "나는 SOLO", "category": "reality"},
         ]
         
-    all_videos = []
-    for channel in target_channels:
-        vids = get_channel_rss(channel['id'])
+    # RSS Fetch (Concurrent)
+    feeds = await fetch_channel_feeds([channel['id'] for channel in target_channels])
+    for channel, vids in zip(target_channels, feeds):
         for v in vids:
              v['channelTitle'] = channel['name']
              v['category'] = channel.get('category', 'reality') # 영상에도 카테고리 태깅
-        all_videos.extend(vids)
     
-    all_videos.sort(key=lambda x: x['publishedAt'], reverse=True)
+    all_videos = _merge_latest(feeds)
     
     remaining, limit = _manage_quota(cost=0) # Read quota only
     
@@ -151,7 +288,7 @@ def get_dating_videos():
         }
     }
 
-def discover_new_channels(category: str = "reality"):
+async def discover_new_channels(category: str = "reality"):
     """
     AI 채널 발굴: 카테고리에 맞는 연애 유튜버 검색 및 추가 (Cost: 100)
     category: 'reality' | 'sketch'
@@ -168,7 +305,7 @@ def discover_new_channels(category: str = "reality"):
     encoded_query = urllib.parse.quote(query)
     url = f"{BASE_URL}/search?part=snippet&q={encoded_query}&maxResults=10&type=channel&key={API_KEY}"
     
-    data, error = safe_http_get(url)
+    data, error = await safe_http_get(url)
     
     if error: return {"error": error}
     
@@ -198,16 +335,20 @@ def discover_new_channels(category: str = "reality"):
         "meta": {"remaining": remaining, "limit": limit}
     }
 
-def search_videos(query: str, max_results: int = 50):
+async def search_videos(query: str, max_results: int = 50):
     if not API_KEY: return {"error": "No Key"}
     encoded_query = urllib.parse.quote(query)
     url = f"{BASE_URL}/search?part=snippet&q={encoded_query}&maxResults={max_results}&type=video&key={API_KEY}"
-    data, error = safe_http_get(url)
+    data, error = await safe_http_get(url)
     if error: return {"error": error}
     remaining, limit = _manage_quota(cost=100)
     return {"items": _parse_videos(data.get('items', [])), "meta": {"remaining": str(remaining), "limit": str(limit)}}
 
-def get_popular_videos(max_results: int = 50, category_id: str = None, region_code: str = 'KR', page_token: str = None):
+async def get_popular_videos(max_results: int = 50, category_id: str = None, region_code: str = 'KR', page_token: str = None, etag: str = None):
+    """
+    인기 차트 1페이지 조회 (Cost: 1)
+    etag: 이전 응답의 ETag -> If-None-Match 조건부 요청, 목록이 그대로면 {"not_modified": True}
+    """
     if not API_KEY: return {"error": "No Key"}
     
     url = f"{BASE_URL}/videos?part=snippet,statistics,contentDetails&chart=mostPopular&maxResults={max_results}&regionCode={region_code}&key={API_KEY}"
@@ -216,17 +357,29 @@ def get_popular_videos(max_results: int = 50, category_id: str = None, region_co
         url += f"&videoCategoryId={category_id}"
     if page_token:
         url += f"&pageToken={page_token}"
-        
-    data, error = safe_http_get(url)
-    
-    if error: return {"error": error}
-    
+
+    try:
+        response = await http_get(url, headers={"If-None-Match": etag} if etag else None)
+    except Exception as e:
+        return {"error": f"네트워크 오류: {str(e)}"}
+
+    not_modified = response.status_code == 304 and etag
+    if response.status_code != 200 and not not_modified:
+        return {"error": f"API 호출 실패: {response.status_code}, 상세: {response.text}"}
+
     remaining, limit = _manage_quota(cost=1)
-    
+    meta = {"remaining": str(remaining), "limit": str(limit)}
+
+    # 304 Not Modified -> 목록 변화 없음 (파싱/저장 생략)
+    if not_modified:
+        return {"not_modified": True, "etag": etag, "meta": meta}
+
+    data = response.json()
     return {
         "items": _parse_videos(data.get('items', [])), 
         "nextPageToken": data.get('nextPageToken'), # 다음 페이지 토큰
-        "meta": {"remaining": str(remaining), "limit": str(limit)}
+        "etag": data.get('etag'),                   # 목록 ETag (다음 실행 때 If-None-Match)
+        "meta": meta
     }
 
 # =========================================================
@@ -234,7 +387,7 @@ def get_popular_videos(max_results: int = 50, category_id: str = None, region_co
 # =========================================================
 INTEREST_CHANNELS_FILE = os.path.join(os.path.dirname(__file__), 'interest_channels.json')
 
-def get_interest_videos(target_keyword: str = None, my_channels: list = None):
+async def get_interest_videos(target_keyword: str = None, my_channels: list = None):
     """
     [Harvest Step] 채널 리스트를 받아서 RSS를 긁어옴 (Cost: 0)
     my_channels: [{"channel_id": "...", "name": "...", "keywords": "..."}, ...] (DB에서 온 데이터)
@@ -260,77 +413,116 @@ def get_interest_videos(target_keyword: str = None, my_channels: list = None):
     else:
         target_channels = all_channels
 
-    # RSS Fetch (Sequential)
-    all_videos = []
-    for channel in target_channels:
-        vids = get_channel_rss(channel['id'])
+    # RSS Fetch (Concurrent)
+    feeds = await fetch_channel_feeds([channel['id'] for channel in target_channels])
+    for channel, vids in zip(target_channels, feeds):
         for v in vids:
              v['channelTitle'] = channel['name']
              v['channelId'] = channel['id'] # 채널 ID 주입 (프론트 필터링 및 구독용)
              v['tags'] = channel.get('keywords', [])
-        all_videos.extend(vids)
-    
-    # 최신순 정렬
-    all_videos.sort(key=lambda x: x['publishedAt'], reverse=True)
     
-    # Limit to latest 100
+    # 최신순 k-way merge (Limit to latest 100)
     return {
-        "items": all_videos[:100], 
+        "items": _merge_latest(feeds, limit=100), 
         "channels": target_channels,
         "channels_count": len(target_channels)
     }
 
-def discover_interest_channels(keyword: str):
+async def _validate_active_channels(items: list, target_count: int, concurrency: int = RSS_CONCURRENCY, timeout: float = RSS_FEED_TIMEOUT) -> list:
+    """
+    검색 결과 채널들의 RSS를 동시에 찔러보고 '영상 있는' 채널만 검색 순위대로 반환
+    - 최대 concurrency개 동시 검증, 피드별 timeout
+    - 순위 순서대로 결과를 확정하다가 target_count개가 차면 나머지 검증은 취소 (Early Stop)
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _has_videos(channel_id: str) -> bool:
+        async with semaphore:
+            try:
+                rss_videos = await asyncio.wait_for(get_channel_rss(channel_id), timeout)
+            except asyncio.TimeoutError:
+                return False
+            return bool(rss_videos)
+
+    tasks = [asyncio.create_task(_has_videos(item['snippet']['channelId'])) for item in items]
+    valid_items = []
+    try:
+        # 검색 순위대로 await -> 순서 안정 + 뒤쪽 채널은 그동안 병렬로 검증 진행
+        for item, task in zip(items, tasks):
+            if await task:
+                valid_items.append(item)
+                if len(valid_items) >= target_count:
+                    break
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    return valid_items
+
+DISCOVER_MAX_PAGES = int(os.getenv("DISCOVER_MAX_PAGES", "1"))   # 채널 발굴 검색 최대 페이지 (페이지당 Cost 100, 기본 1 = 기존 비용)
+
+async def discover_interest_channels(keyword: str, target_count: int = 50):
     """
     [Seed Step] 키워드로 채널 발굴 + 활동 여부 검증 (RSS Check)
-    Cost: 100 (Search API) + 0 (RSS Check)
-    목표: '영상 있는' 알짜 채널 15개를 꽉 채워서 반환
+    Cost: 100 (Search API 1회) + 0 (RSS Check)
+    목표: '영상 있는' 알짜 채널을 target_count개까지 반환 (검색 순위 유지)
+    - 기본은 검색 1페이지만 사용, DISCOVER_MAX_PAGES > 1로 설정하면 모자랄 때 다음 페이지(+Cost 100)까지 검색
+    - 페이지마다 검증 후 활성 채널 수로 종료 판단 -> 다 찼으면 다음 페이지 요청 안 함
+    - 목표가 작거나 거의 찼으면 페이지 크기를 줄여 RSS 검증 수도 줄임
     """
     if not API_KEY: return {"error": "API Key Missing"}
 
-    # 1. 넉넉하게 검색 (최대 50개) - 어차피 100점 똑같음
     encoded_query = urllib.parse.quote(keyword)
-    url = f"{BASE_URL}/search?part=snippet&q={encoded_query}&maxResults=50&type=channel&key={API_KEY}"
-    
-    data, error = safe_http_get(url)
-    
-    if error: return {"error": error}
-    
-    remaining, limit = _manage_quota(cost=100)
-    
-    # 2. RSS 검증 및 필터링
-    valid_channels = []
-    target_count = 50  # 목표 채널 수 15 -> 50으로 증가
-    
-    for item in data.get('items', []):
-        if len(valid_channels) >= target_count:
+    valid_items = []
+    seen = set()
+    page_token = None
+    pages = 0
+    remaining, limit = _manage_quota(cost=0)
+
+    while len(valid_items) < target_count and pages < DISCOVER_MAX_PAGES:
+        # 1. 검색 (필요한 수의 2배까지, 최대 50개)
+        needed = target_count - len(valid_items)
+        per_page = min(50, max(needed * 2, 10))
+        url = f"{BASE_URL}/search?part=snippet&q={encoded_query}&maxResults={per_page}&type=channel&key={API_KEY}"
+        if page_token:
+            url += f"&pageToken={page_token}"
+
+        data, error = await safe_http_get(url)
+        if error:
+            if pages == 0: return {"error": error}
+            break  # 앞 페이지 결과는 살려서 반환
+
+        remaining, limit = _manage_quota(cost=100)
+        pages += 1
+
+        # 2. RSS 검증 및 필터링 (동시 검증, 남은 목표 수 채우면 조기 종료)
+        items = [item for item in data.get('items', []) if item['snippet']['channelId'] not in seen]
+        seen.update(item['snippet']['channelId'] for item in items)
+        valid_items += await _validate_active_channels(items, needed)
+
+        page_token = data.get('nextPageToken')
+        if not page_token:
             break
-            
-        c_id = item['snippet']['channelId']
-        c_title = item['snippet']['channelTitle']
-        c_thumbnail = item['snippet'].get('thumbnails', {}).get('default', {}).get('url', '')
-        c_description = item['snippet'].get('description', '')  # 설명 추가
-        
-        # RSS 찔러보기 (영상 있는지 확인)
-        rss_videos = get_channel_rss(c_id)
-        if rss_videos and len(rss_videos) > 0:
-            valid_channels.append({
-                "id": c_id,
-                "name": c_title,
-                "keyword": keyword,
-                "thumbnail": c_thumbnail,
-                "description": c_description  # 설명 추가!
-            })
+
+    valid_channels = []
+    for item in valid_items:
+        valid_channels.append({
+            "id": item['snippet']['channelId'],
+            "name": item['snippet']['channelTitle'],
+            "keyword": keyword,
+            "thumbnail": item['snippet'].get('thumbnails', {}).get('default', {}).get('url', ''),
+            "description": item['snippet'].get('description', '')  # 설명 추가!
+        })
             
     return {
         "success": True,
         "added": len(valid_channels),
         "found_count": len(valid_channels),
         "found_channels": valid_channels,
-        "meta": {"remaining": remaining, "limit": limit}
+        "meta": {"remaining": remaining, "limit": limit, "pages": pages}
     }
 
-def get_video_detail(video_id: str):
+async def get_video_detail(video_id: str):
     """
     영상 1개 상세 조회 (JIT Enrichment용) - Cost: 1
     """
@@ -343,14 +535,14 @@ def get_video_detail(video_id: str):
         "key": API_KEY
     }
     
-    data, error = safe_http_get(url, params)
+    data, error = await safe_http_get(url, params=params)
     
     if data and 'items' in data and len(data['items']) > 0:
         _manage_quota(cost=1)
         return _parse_videos(data['items'])[0]
     return None
 
-def fetch_channel_metadata(channel_id: str):
+async def fetch_channel_metadata(channel_id: str):
     """
     채널 ID로 상세 정보 조회 (Cost: 1)
     구독 시 DB에 없는 채널일 경우 최초 1회 정보를 가져오기 위함
@@ -370,7 +562,7 @@ def fetch_channel_metadata(channel_id: str):
     
     try:
         print(f"[YoutubeAPI] Fetching metadata for channel: {channel_id}")
-        res = requests.get(url, params=params, timeout=10)
+        res = await http_get(url, params=params, timeout=10)
         
         if res.status_code != 200:
             print(f"[YoutubeAPI] Error {res.status_code}: {res.text}")
@@ -1,5 +1,7 @@
 from core.database import fetch_all
-from client.openai_client import get_embedding_openai, generate_response_openai
+from core.vector import fetch_all_ann
+from client.openai_client import generate_response_openai
+from core.embedding_cache import get_query_embedding
 from utils.safe_ops import safe_execute
 
 async def analyze_user_context(user_id: int) -> str:
@@ -44,10 +46,10 @@ async def retrieve_videos(query_text: str, limit: int = 4):
     """
     [RAG] 질문과 유사한 영상을 벡터 유사도 검색으로 찾기
     """
-    # 1. 질문 벡터화
-    query_vector = await get_embedding_openai(query_text)
+    # 1. 질문 벡터화 (고정 프롬프트/반복 질문은 캐시 적중)
+    query_vector = await get_query_embedding(query_text)
     
-    # 2. 벡터 검색 (Cosine Distance: <=>)
+    # 2. 벡터 검색 (Cosine Distance: <=>, HNSW 인덱스)
     sql = """
         SELECT video_id, title, channel_title, description, 
                (1 - (embedding <=> :qv)) as similarity
@@ -58,7 +60,7 @@ async def retrieve_videos(query_text: str, limit: int = 4):
     """
     
     try:
-        results = await fetch_all(sql, {"qv": str(query_vector), "limit": limit})
+        results = await fetch_all_ann(sql, {"qv": query_vector, "limit": limit})
         return results
     except Exception as e:
         print(f"⚠️ Vector Search Error: {e}")
@@ -7,14 +7,14 @@ router = APIRouter(prefix="/api/content/hotplace",
 )
 
 @router.get("/search")
-def search_place_endpoint(query: str):
+async def search_place_endpoint(query: str):
     """
     네이버 장소 검색 API
     """
     if not query:
         raise HTTPException(status_code=400, detail="검색어를 입력해주세요.")
     
-    result = search_place(query)
+    result = await search_place(query)
     
     if "error" in result:
         return result
@@ -8,6 +8,7 @@ from langchain_core.messages import HumanMessage
 
 from content.novel.image_service import generate_character_image, generate_scene_image, generate_cover_image
 from content.novel import service as novel_service
+from core.job_queue import job
 
 # ========================================================
 #  LangGraph State 정의
@@ -311,6 +312,7 @@ def create_webtoon_workflow():
 #  실행 함수
 # ========================================================
 
+@job("novel.generate_webtoon", concurrency=2, max_attempts=1)
 async def generate_webtoon_task(
     novel_id: int,
     topic: str,
@@ -320,7 +322,8 @@ async def generate_webtoon_task(
     script_length: str = "medium"
 ):
     """
-    Background Task로 실행될 메인 함수
+    작업 큐(worker.py)에서 실행될 메인 함수
+    - 실패/취소(워커 종료) 시 자체 롤백(소설 삭제) 후 예외를 다시 던짐 -> 작업은 failed로 기록, 재시도하지 않음 (max_attempts=1)
     """
     print(f"🚀 웹툰 생성 시작 (ID: {novel_id})")
     
@@ -342,11 +345,12 @@ async def generate_webtoon_task(
     try:
         await app.ainvoke(initial_state)
         print(f"✨ 웹툰 생성 최종 완료 (ID: {novel_id})")
-    except Exception as e:
-        print(f"❌ 웹툰 생성 중 오류 발생: {e}")
+    except BaseException as e:  # CancelledError(워커 종료)도 롤백
+        print(f"❌ 웹툰 생성 중 오류 발생: {e!r}")
         try:
             # 롤백 처리: DB에서 해당 소설 및 컷 삭제
             await novel_service.delete_novel(novel_id)
             print(f"⚠️ 에러로 인해 소설 데이터가 롤백되었습니다. (ID: {novel_id})")
         except Exception as rollback_err:
             print(f"❌ 롤백 중 추가 에러 발생: {rollback_err}")
+        raise
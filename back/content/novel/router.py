@@ -1,11 +1,11 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
 from typing import List
 import os
 
 from content.novel.schemas import NovelCreate, NovelResponse
 from content.novel import service
-from content.novel.langgraph_workflow import generate_webtoon_task
+from core.job_queue import enqueue_job
 from utils.safe_ops import handle_exceptions
 
 router = APIRouter(
@@ -18,24 +18,27 @@ from datetime import datetime
 
 @router.post("/generate", response_model=NovelResponse)
 @handle_exceptions(default_message="웹툰 생성 요청 실패")
-async def generate_novel(request: NovelCreate, background_tasks: BackgroundTasks):
+async def generate_novel(request: NovelCreate):
     """
     AI 웹툰 생성 요청 (비동기 처리)
-    ID를 즉시 반환하고 백그라운드에서 생성 작업을 수행합니다.
+    ID를 즉시 반환하고 작업 큐(worker.py)에서 생성 작업을 수행합니다.
     """
     # 1. 빈 소설 레코드 생성 (ID 확보)
     novel = await service.create_novel(request.topic)
     novel_id = novel["id"]
     
-    # 2. 백그라운드 태스크 등록
-    background_tasks.add_task(
-        generate_webtoon_task,
-        novel_id=novel_id,
-        topic=request.topic,
-        character_count=request.character_count,
-        character_descriptions=request.character_descriptions,
-        scene_count=request.scene_count,
-        script_length=request.script_length
+    # 2. 작업 큐 등록 (API 프로세스 재시작에도 유실되지 않음)
+    await enqueue_job(
+        "novel.generate_webtoon",
+        {
+            "novel_id": novel_id,
+            "topic": request.topic,
+            "character_count": request.character_count,
+            "character_descriptions": request.character_descriptions,
+            "scene_count": request.scene_count,
+            "script_length": request.script_length
+        },
+        dedupe_key=f"novel:{novel_id}"
     )
     
     # 3. 초기 상태 반환 (DB 조회 회피)
@@ -2,23 +2,31 @@
 스마트 검색 API Router
 - 영상/채널 검색을 하나의 엔드포인트로 통합
 - 의도 분류 후 적절한 Tool 실행
+- 키워드 의도는 기본적으로 하이브리드(키워드 + 벡터, RRF) 검색
 """
-from fastapi import APIRouter, Depends
+import os
+from fastapi import APIRouter, Depends, HTTPException
 from user.router import get_current_user
 from content.search.service import classify_search_intent
 from content.search.tools import (
     keyword_search_videos, keyword_search_channels,
     personalized_recommend_videos, personalized_recommend_channels,
     find_similar_videos, find_similar_channels,
-    analyze_user_preference
+    analyze_user_preference,
+    hybrid_search_videos, hybrid_search_channels
 )
 
+# auto 모드에서 keyword 의도를 하이브리드로 처리할지 (false면 기존 키워드 단독 검색)
+SEARCH_HYBRID_DEFAULT = os.getenv("SEARCH_HYBRID_DEFAULT", "true").lower() == "true"
+SEARCH_MODES = ("auto", "hybrid", "keyword", "vector")
+
 router = APIRouter(prefix="/api/content/search", tags=["Smart Search"])
 
 @router.get("/smart")
 async def smart_search(
     query: str,
     target: str = "video",  # "video" | "channel"
+    mode: str = "auto",     # "auto" | "hybrid" | "keyword" | "vector"
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -27,17 +35,25 @@ async def smart_search(
     Query Params:
         - query: 검색어
         - target: "video" (영상 검색) 또는 "channel" (채널 검색)
+        - mode: "auto" (의도 분류) / "hybrid" / "keyword" / "vector" (검색 방식 강제)
     
     Intent Types:
         - keyword: 기본 키워드 검색
         - personalized: 개인화 추천
         - similar: 유사 콘텐츠
         - analyze: 성향 분석 (영상 검색에서만)
+        - hybrid: 키워드 + 벡터 동시 검색 후 RRF 융합
     """
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {SEARCH_MODES}")
+
     user_id = current_user['id']
-    intent = classify_search_intent(query)
+    if mode == "auto":
+        intent = classify_search_intent(query)
+    else:
+        intent = {"vector": "similar"}.get(mode, mode)
     
-    print(f"🔍 [SmartSearch] Query: '{query}', Intent: {intent}, Target: {target}")
+    print(f"🔍 [SmartSearch] Query: '{query}', Intent: {intent}, Target: {target}, Mode: {mode}")
     
     # Intent에 따라 적절한 Tool 실행
     if intent == "analyze":
@@ -64,6 +80,14 @@ async def smart_search(
             results = await find_similar_channels(query, limit=10)
         return {"intent": "similar", "results": results}
     
+    if intent == "hybrid" or (intent == "keyword" and mode == "auto" and SEARCH_HYBRID_DEFAULT):
+        # 하이브리드 검색 (레그별 타임아웃, 한쪽이 늦으면 다른 쪽 결과만으로 응답)
+        if target == "video":
+            fused = await hybrid_search_videos(query, limit=20)
+        else:
+            fused = await hybrid_search_channels(query, limit=10)
+        return {"intent": "hybrid", "results": fused["results"], "legs": fused["legs"]}
+    
     else:  # intent == "keyword"
         # 기본 키워드 검색
         if target == "video":
@@ -6,6 +6,7 @@ from .keyword_search import keyword_search_videos, keyword_search_channels
 from .personalized import personalized_recommend_videos, personalized_recommend_channels
 from .similar_content import find_similar_videos, find_similar_channels
 from .analyze_preference import analyze_user_preference
+from .hybrid_search import hybrid_search_videos, hybrid_search_channels
 
 __all__ = [
     "keyword_search_videos",
@@ -14,5 +15,7 @@ __all__ = [
     "personalized_recommend_channels",
     "find_similar_videos",
     "find_similar_channels",
-    "analyze_user_preference"
+    "analyze_user_preference",
+    "hybrid_search_videos",
+    "hybrid_search_channels"
 ]
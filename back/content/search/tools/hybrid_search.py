@@ -0,0 +1,95 @@
+"""
+하이브리드 검색 Tool (키워드 + 벡터, Reciprocal Rank Fusion)
+- 트라이그램 키워드 검색과 pgvector 유사도 검색을 동시에 실행
+- 두 결과를 순위 기반으로 융합: score = Σ 1 / (k + rank)  (점수 스케일이 달라도 정규화 불필요)
+- 전체 지연 예산(SEARCH_LATENCY_BUDGET) 안에서 레그별 타임아웃 -> 임베딩 호출이 느려도 키워드 결과로 응답
+"""
+import os
+import time
+import asyncio
+from .keyword_search import keyword_search_videos, keyword_search_channels
+from .similar_content import find_similar_videos, find_similar_channels
+
+SEARCH_RRF_K = int(os.getenv("SEARCH_RRF_K", "60"))                              # RRF 상수 (클수록 하위 순위 영향 증가)
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "50"))                    # 레그별 후보 수
+SEARCH_LATENCY_BUDGET = float(os.getenv("SEARCH_LATENCY_BUDGET", "1.5"))         # 전체 지연 예산 (초)
+SEARCH_KEYWORD_TIMEOUT = float(os.getenv("SEARCH_KEYWORD_TIMEOUT", "1.0"))       # 키워드 레그 최대 대기 (초)
+SEARCH_VECTOR_TIMEOUT = float(os.getenv("SEARCH_VECTOR_TIMEOUT", "1.2"))         # 벡터 레그 최대 대기 (초, 임베딩 포함)
+
+_stats = {"queries": 0, "keyword_timeout": 0, "vector_timeout": 0, "keyword_error": 0, "vector_error": 0}
+
+
+async def _run_leg(name: str, coro, timeout: float) -> tuple[list[dict], dict]:
+    """레그 1개 실행 (타임아웃/에러는 빈 결과로 대체하고 상태만 기록)"""
+    started = time.perf_counter()
+    status = "ok"
+    rows = []
+    try:
+        rows = await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        status = "timeout"
+        _stats[f"{name}_timeout"] += 1
+        print(f"⏱️ [HybridSearch] {name} leg timed out ({timeout}s)")
+    except Exception as e:
+        status = "error"
+        _stats[f"{name}_error"] += 1
+        print(f"⚠️ [HybridSearch] {name} leg failed: {e}")
+    elapsed = round((time.perf_counter() - started) * 1000, 1)
+    return rows, {"status": status, "hits": len(rows), "ms": elapsed}
+
+
+def reciprocal_rank_fusion(ranked_lists: dict[str, list[dict]], id_field: str, k: int = SEARCH_RRF_K) -> list[dict]:
+    """
+    여러 순위 목록을 RRF로 융합
+    - 같은 id의 row는 컬럼을 합치고, 어느 레그에서 나왔는지 sources에 기록
+    """
+    merged: dict = {}
+    for source, rows in ranked_lists.items():
+        for rank, row in enumerate(rows, start=1):
+            key = row[id_field]
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = {**row, "rrf_score": 0.0, "sources": []}
+            else:
+                for column, value in row.items():
+                    entry.setdefault(column, value)
+            entry["rrf_score"] += 1.0 / (k + rank)
+            entry["sources"].append(source)
+
+    fused = sorted(merged.values(), key=lambda r: r["rrf_score"], reverse=True)
+    for row in fused:
+        row["rrf_score"] = round(row["rrf_score"], 6)
+    return fused
+
+
+async def _hybrid_search(query: str, limit: int, keyword_func, vector_func, id_field: str) -> dict:
+    _stats["queries"] += 1
+    candidates = max(limit, SEARCH_CANDIDATES)
+    (keyword_rows, keyword_leg), (vector_rows, vector_leg) = await asyncio.gather(
+        _run_leg("keyword", keyword_func(query, limit=candidates), min(SEARCH_KEYWORD_TIMEOUT, SEARCH_LATENCY_BUDGET)),
+        _run_leg("vector", vector_func(query, limit=candidates), min(SEARCH_VECTOR_TIMEOUT, SEARCH_LATENCY_BUDGET))
+    )
+    fused = reciprocal_rank_fusion({"keyword": keyword_rows, "vector": vector_rows}, id_field)
+    return {"results": fused[:limit], "legs": {"keyword": keyword_leg, "vector": vector_leg}}
+
+
+async def hybrid_search_videos(query: str, limit: int = 20) -> dict:
+    """
+    영상 하이브리드 검색 (제목/태그/채널명 트라이그램 + 임베딩 유사도)
+    """
+    return await _hybrid_search(query, limit, keyword_search_videos, find_similar_videos, "video_id")
+
+async def hybrid_search_channels(query: str, limit: int = 10) -> dict:
+    """
+    채널 하이브리드 검색 (이름/키워드/설명 트라이그램 + 임베딩 유사도)
+    """
+    return await _hybrid_search(query, limit, keyword_search_channels, find_similar_channels, "channel_id")
+
+
+def get_hybrid_search_stats() -> dict:
+    return {
+        **_stats,
+        "rrf_k": SEARCH_RRF_K,
+        "budget_sec": SEARCH_LATENCY_BUDGET,
+        "timeouts_sec": {"keyword": SEARCH_KEYWORD_TIMEOUT, "vector": SEARCH_VECTOR_TIMEOUT}
+    }
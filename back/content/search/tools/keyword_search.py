@@ -1,13 +1,57 @@
 """
 키워드 기반 검색 Tool
-- 제목/태그에서 키워드 매칭 (LIKE 또는 Full-Text Search)
+- 제목/태그/채널명에서 키워드 매칭
+- 기본: pg_trgm 트라이그램 (search_text 컬럼 + GIN 인덱스, 부분일치 + 오타 허용 + 유사도 랭킹)
+- KEYWORD_SEARCH_BACKEND=ilike 로 기존 ILIKE 방식 사용 가능 (마이그레이션 전 환경 / 벤치마크 비교용)
 """
+import os
+import time
 from core.database import fetch_all
+from core.vector import _percentile
 
-async def keyword_search_videos(query: str, limit: int = 20):
+KEYWORD_SEARCH_BACKEND = os.getenv("KEYWORD_SEARCH_BACKEND", "trgm")   # trgm | ilike
+
+
+def like_pattern(query: str) -> str:
+    """부분일치 LIKE 패턴 (search_text는 소문자 -> 질의도 소문자, 와일드카드 문자 이스케이프)"""
+    escaped = query.strip().lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+# ==========================================================
+#  트라이그램 검색 (GIN 인덱스)
+# ==========================================================
+
+async def _trgm_search_videos(query: str, limit: int) -> list[dict]:
+    # LIKE: 정확한 부분일치 (기존 ILIKE와 같은 결과 보장) / <%: 오타·띄어쓰기 차이 허용
+    # 두 조건 모두 GIN 인덱스 사용 (BitmapOr) -> 부분일치(유사도 1.0) 우선, 동점은 조회수순
+    sql = """
+        SELECT video_id, title, channel_title, thumbnail_url, view_count, is_short, published_at,
+               word_similarity(:q, search_text) AS score
+        FROM youtube_list
+        WHERE search_text LIKE :like OR :q <% search_text
+        ORDER BY score DESC, view_count DESC NULLS LAST
+        LIMIT :limit
     """
-    영상 키워드 검색 (제목 + 태그 + 채널명)
+    return await fetch_all(sql, {"q": query.strip().lower(), "like": like_pattern(query), "limit": limit})
+
+async def _trgm_search_channels(query: str, limit: int) -> list[dict]:
+    sql = """
+        SELECT channel_id, name, keywords, category, thumbnail_url, description,
+               word_similarity(:q, search_text) AS score
+        FROM youtube_channels
+        WHERE search_text LIKE :like OR :q <% search_text
+        ORDER BY score DESC
+        LIMIT :limit
     """
+    return await fetch_all(sql, {"q": query.strip().lower(), "like": like_pattern(query), "limit": limit})
+
+
+# ==========================================================
+#  기존 ILIKE 검색 (Seq Scan)
+# ==========================================================
+
+async def _ilike_search_videos(query: str, limit: int) -> list[dict]:
     sql = """
         SELECT video_id, title, channel_title, thumbnail_url, view_count, is_short, published_at
         FROM youtube_list
@@ -15,18 +59,81 @@ async def keyword_search_videos(query: str, limit: int = 20):
         ORDER BY view_count DESC
         LIMIT :limit
     """
-    results = await fetch_all(sql, {"q": f"%{query}%", "limit": limit})
-    return results
+    return await fetch_all(sql, {"q": f"%{query}%", "limit": limit})
 
-async def keyword_search_channels(query: str, limit: int = 20):
-    """
-    채널 키워드 검색 (이름 + 키워드 + 설명)
-    """
+async def _ilike_search_channels(query: str, limit: int) -> list[dict]:
     sql = """
         SELECT channel_id, name, keywords, category, thumbnail_url, description
         FROM youtube_channels
         WHERE name ILIKE :q OR keywords ILIKE :q OR description ILIKE :q
         LIMIT :limit
     """
-    results = await fetch_all(sql, {"q": f"%{query}%", "limit": limit})
-    return results
+    return await fetch_all(sql, {"q": f"%{query}%", "limit": limit})
+
+
+def channel_search_clause(alias: str, query: str, params: dict, param: str = "search") -> str:
+    """
+    다른 쿼리에 끼워 넣을 채널 부분일치 조건 (백엔드 설정을 따름)
+    - trgm: search_text LIKE (GIN 트라이그램 인덱스) / ilike: 원본 컬럼 ILIKE (마이그레이션 전 환경)
+    """
+    if KEYWORD_SEARCH_BACKEND == "ilike":
+        params[param] = f"%{query}%"
+        return f"({alias}.name ILIKE :{param} OR {alias}.keywords ILIKE :{param} OR {alias}.description ILIKE :{param})"
+    params[param] = like_pattern(query)
+    return f"{alias}.search_text LIKE :{param}"
+
+
+async def keyword_search_videos(query: str, limit: int = 20):
+    """
+    영상 키워드 검색 (제목 + 태그 + 채널명)
+    """
+    if KEYWORD_SEARCH_BACKEND == "ilike":
+        return await _ilike_search_videos(query, limit)
+    return await _trgm_search_videos(query, limit)
+
+async def keyword_search_channels(query: str, limit: int = 20):
+    """
+    채널 키워드 검색 (이름 + 키워드 + 설명)
+    """
+    if KEYWORD_SEARCH_BACKEND == "ilike":
+        return await _ilike_search_channels(query, limit)
+    return await _trgm_search_channels(query, limit)
+
+
+# ==========================================================
+#  벤치마크 (ILIKE vs 트라이그램)
+# ==========================================================
+
+async def benchmark_keyword_search(queries: list[str], target: str = "video", limit: int = 20, runs: int = 5) -> dict:
+    """
+    같은 질의를 두 방식으로 runs번씩 실행해 지연시간(p50/p95)과 결과 겹침 비교
+    - overlap: ILIKE 결과 중 트라이그램 결과에도 포함된 비율 (부분일치 재현율)
+    """
+    if target == "video":
+        backends = {"ilike": _ilike_search_videos, "trgm": _trgm_search_videos}
+        id_field = "video_id"
+    else:
+        backends = {"ilike": _ilike_search_channels, "trgm": _trgm_search_channels}
+        id_field = "channel_id"
+
+    report = []
+    for query in queries:
+        entry = {"query": query}
+        results = {}
+        for name, search in backends.items():
+            latencies = []
+            for _ in range(max(1, runs)):
+                started = time.perf_counter()
+                rows = await search(query, limit)
+                latencies.append((time.perf_counter() - started) * 1000)
+            results[name] = {row[id_field] for row in rows}
+            entry[name] = {
+                "hits": len(rows),
+                "p50_ms": round(_percentile(latencies, 50), 2),
+                "p95_ms": round(_percentile(latencies, 95), 2)
+            }
+        baseline = results["ilike"]
+        entry["overlap"] = round(len(baseline & results["trgm"]) / len(baseline), 3) if baseline else None
+        report.append(entry)
+
+    return {"target": target, "limit": limit, "runs": runs, "results": report}
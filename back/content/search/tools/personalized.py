@@ -1,15 +1,44 @@
 """
 개인화 추천 Tool
 - 유저의 시청 기록/구독 채널 기반 추천
+- 취향 벡터(user.taste_embedding)가 있으면 ANN 쿼리 1번, 없으면 카테고리/채널 기반 Fallback
 """
 from core.database import fetch_all
+from core.vector import fetch_all_ann
+from content.youtube.taste_vector import get_taste_vector
 
 async def personalized_recommend_videos(user_id: int, limit: int = 20):
     """
     유저 취향 기반 영상 추천
-    - 가장 많이 본 카테고리
-    - 구독한 채널의 최신 영상
+    - 취향 벡터와 가까운 영상 (이미 본 영상 제외)
+    - 취향 벡터가 없으면 가장 많이 본 카테고리
     """
+    taste = await get_taste_vector(user_id)
+    if taste is not None:
+        # HNSW로 후보를 먼저 뽑고 (CTE), 본 영상만 제외
+        sql = """
+            WITH candidates AS (
+                SELECT video_id, title, channel_title, thumbnail_url, view_count, category_id,
+                       embedding <=> :tv AS distance
+                FROM youtube_list
+                WHERE embedding IS NOT NULL
+                ORDER BY embedding <=> :tv
+                LIMIT :candidates
+            )
+            SELECT c.video_id, c.title, c.channel_title, c.thumbnail_url, c.view_count, c.category_id,
+                   (1 - c.distance) AS similarity
+            FROM candidates c
+            WHERE NOT EXISTS (
+                SELECT 1 FROM user_youtube_logs uyl
+                WHERE uyl.user_id = :uid AND uyl.video_id = c.video_id
+            )
+            ORDER BY c.distance
+            LIMIT :limit
+        """
+        results = await fetch_all_ann(sql, {"tv": taste, "uid": user_id, "limit": limit, "candidates": limit * 3})
+        if results:
+            return results
+
     # 1. 유저가 많이 본 카테고리 파악
     category_sql = """
         SELECT yl.category_id, COUNT(*) as cnt
@@ -46,16 +75,46 @@ async def personalized_recommend_videos(user_id: int, limit: int = 20):
 async def personalized_recommend_channels(user_id: int, limit: int = 10):
     """
     유저 취향 기반 채널 추천
-    - 구독한 채널과 비슷한 채널 (벡터 유사도)
+    - 취향 벡터와 가까운 채널 (이미 구독한 채널 제외)
+    - 취향 벡터가 없으면 많이 본 영상의 채널 중 미구독 채널
     """
-    # 구독 채널 기준 유사 채널 (벡터 검색)
-    # 일단 간단하게: 키워드 겹치는 채널 추천
+    taste = await get_taste_vector(user_id)
+    if taste is not None:
+        sql = """
+            WITH candidates AS (
+                SELECT channel_id, name, keywords, thumbnail_url,
+                       embedding <=> :tv AS distance
+                FROM youtube_channels
+                WHERE embedding IS NOT NULL
+                ORDER BY embedding <=> :tv
+                LIMIT :candidates
+            )
+            SELECT c.channel_id, c.name, c.keywords, c.thumbnail_url, (1 - c.distance) AS similarity
+            FROM candidates c
+            WHERE NOT EXISTS (
+                SELECT 1 FROM user_logs ul
+                WHERE ul.user_id = :uid AND ul.action = 'subscribe' AND ul.content_id = c.channel_id
+            )
+            ORDER BY c.distance
+            LIMIT :limit
+        """
+        results = await fetch_all_ann(sql, {"tv": taste, "uid": user_id, "limit": limit, "candidates": limit * 3})
+        if results:
+            return results
+
+    # Fallback: 시청 기록 기준 채널 (기존 키워드 ILIKE Self-Join 대체)
     sql = """
-        SELECT DISTINCT yc.channel_id, yc.name, yc.keywords, yc.thumbnail_url
-        FROM user_logs ul
-        JOIN youtube_channels yc ON ul.content_id = yc.channel_id
-        JOIN youtube_channels yc2 ON yc.keywords ILIKE '%' || yc2.keywords || '%'
-        WHERE ul.user_id = :uid AND ul.action = 'subscribe'
+        SELECT yc.channel_id, yc.name, yc.keywords, yc.thumbnail_url, COUNT(*) AS watched
+        FROM user_youtube_logs uyl
+        JOIN youtube_list yl ON yl.video_id = uyl.video_id
+        JOIN youtube_channels yc ON yc.channel_id = yl.channel_id
+        WHERE uyl.user_id = :uid
+          AND NOT EXISTS (
+              SELECT 1 FROM user_logs ul
+              WHERE ul.user_id = :uid AND ul.action = 'subscribe' AND ul.content_id = yc.channel_id
+          )
+        GROUP BY yc.channel_id, yc.name, yc.keywords, yc.thumbnail_url
+        ORDER BY watched DESC
         LIMIT :limit
     """
     results = await fetch_all(sql, {"uid": user_id, "limit": limit})
@@ -2,18 +2,35 @@
 유사 콘텐츠 검색 Tool
 - 벡터 유사도 기반 검색 (pgvector)
 """
-from core.database import fetch_all
-from client.openai_client import get_embedding_openai
+import asyncio
+from core.vector import fetch_all_ann
+from core.embedding_cache import get_query_embedding
+
+
+async def _query_vector(query: str):
+    """
+    검색어 임베딩 (캐시 우선)
+    - shield: 하이브리드 검색 타임아웃으로 취소돼도 임베딩은 끝까지 실행 -> 캐시가 채워져 다음 요청부터 빠름
+    - OpenAI 실패(0 벡터)면 None (거리 계산이 NaN이 되어 아무 행이나 섞이지 않도록)
+    """
+    task = asyncio.ensure_future(get_query_embedding(query))
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())  # 취소된 뒤 실패해도 경고 없이 정리
+    vector = await asyncio.shield(task)
+    if vector is None or not vector.any():
+        return None
+    return vector
 
 async def find_similar_videos(query: str, limit: int = 10):
     """
     벡터 유사도 기반 영상 검색
     - 검색어를 벡터화하여 유사한 영상 찾기
     """
-    # 1. 검색어 벡터화
-    query_vector = await get_embedding_openai(query)
+    # 1. 검색어 벡터화 (캐시 우선)
+    query_vector = await _query_vector(query)
+    if query_vector is None:
+        return []
     
-    # 2. 벡터 유사도 검색
+    # 2. 벡터 유사도 검색 (HNSW 인덱스)
     sql = """
         SELECT video_id, title, channel_title, thumbnail_url, view_count,
                (1 - (embedding <=> :qv)) as similarity
@@ -22,14 +39,16 @@ async def find_similar_videos(query: str, limit: int = 10):
         ORDER BY embedding <=> :qv ASC
         LIMIT :limit
     """
-    results = await fetch_all(sql, {"qv": str(query_vector), "limit": limit})
+    results = await fetch_all_ann(sql, {"qv": query_vector, "limit": limit})
     return results
 
 async def find_similar_channels(query: str, limit: int = 10):
     """
     벡터 유사도 기반 채널 검색
     """
-    query_vector = await get_embedding_openai(query)
+    query_vector = await _query_vector(query)
+    if query_vector is None:
+        return []
     
     sql = """
         SELECT channel_id, name, keywords, thumbnail_url, description,
@@ -39,5 +58,5 @@ async def find_similar_channels(query: str, limit: int = 10):
         ORDER BY embedding <=> :qv ASC
         LIMIT :limit
     """
-    results = await fetch_all(sql, {"qv": str(query_vector), "limit": limit})
+    results = await fetch_all_ann(sql, {"qv": query_vector, "limit": limit})
     return results
@@ -0,0 +1,176 @@
+"""
+인기 영상 크롤 스케줄러 ((국가, 카테고리) 샤드 병렬 수집)
+- 샤드를 CRAWL_CONCURRENCY개까지 동시에 crawl_shard로 실행
+- 쿼터 기반 입장: 샤드 예상 비용(페이지 수 x 1 Unit)이 남은 일일 쿼터(_manage_quota) - 실행 중 예약분 - CRAWL_QUOTA_RESERVE
+  안에 들어갈 때만 시작, 안 들어가면 deferred (체크포인트 그대로 -> 다음 실행/다음 날 이어서)
+- 우선순위: 지난 실행에서 목록이 얼마나 바뀌었나(신규 비율) x 마지막 완료 후 지난 시간
+  -> 빨리 바뀌는 샤드부터, 한 번도 안 긁은 샤드는 최우선
+"""
+import os
+import asyncio
+import time
+from typing import Awaitable, Callable
+from core.database import fetch_all
+from client.youtube_client import _manage_quota
+from client.openai_client import EmbeddingPipeline
+from content.youtube.crawler import (
+    crawl_shard, shard_key, CRAWL_MAX_PAGES, CRAWL_SHARD_MIN_INTERVAL, CRAWL_RESUME_WINDOW
+)
+
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))            # 동시에 수집할 샤드 수
+CRAWL_QUOTA_RESERVE = int(os.getenv("CRAWL_QUOTA_RESERVE", "1000"))     # 크롤러가 건드리지 않는 쿼터 (검색/채널 탐색용)
+CRAWL_CHURN_FLOOR = float(os.getenv("CRAWL_CHURN_FLOOR", "0.05"))       # 변화 없던 샤드도 시간이 지나면 다시 올라오도록 하는 최소 변화율
+
+
+class CrawlScheduler:
+    def __init__(
+        self,
+        concurrency: int = CRAWL_CONCURRENCY,
+        quota_reserve: int = CRAWL_QUOTA_RESERVE,
+        max_pages: int = CRAWL_MAX_PAGES
+    ):
+        self.concurrency = max(1, concurrency)
+        self.quota_reserve = quota_reserve
+        self.max_pages = max_pages
+        self.reserved = 0   # 실행 중 샤드들이 아직 쓰지 않은 예상 쿼터
+
+    # ==========================================================
+    #  계획 (우선순위 + 예상 비용)
+    # ==========================================================
+
+    def _estimate(self, cp: dict | None, force: bool) -> tuple[int, float, float]:
+        """샤드 1개의 (예상 비용, 변화율, 우선순위)"""
+        if cp is None:
+            return self.max_pages, 1.0, float("inf")  # 처음 긁는 샤드
+
+        resumable = (not force and cp["status"] == "running" and cp["page_token"]
+                     and cp["idle_sec"] < CRAWL_RESUME_WINDOW)
+        if resumable:
+            cost = max(1, self.max_pages - cp["pages_done"])
+        elif cp["status"] == "completed" and cp["pages_done"]:
+            cost = min(self.max_pages, cp["pages_done"])  # 지난번 실제 페이지 수 (목록이 짧은 샤드)
+        else:
+            cost = self.max_pages
+
+        # 지난 실행에서 본 영상이 없으면 (첫 페이지 304 = 목록 그대로) 변화 없음으로 취급
+        churn = (cp["items_new"] / cp["items_seen"]) if cp["items_seen"] else CRAWL_CHURN_FLOOR
+        age_hours = (cp["completed_ago_sec"] if cp["completed_ago_sec"] is not None else cp["idle_sec"]) / 3600
+        priority = max(churn, CRAWL_CHURN_FLOOR) * age_hours
+        if resumable:
+            priority = float("inf")  # 이어서 긁을 page_token이 만료되기 전에
+        return cost, churn, priority
+
+    async def plan(self, shards: list[tuple[str, str | None]], force: bool = False) -> list[dict]:
+        """샤드별 예상 비용/변화율/우선순위 (우선순위 높은 순, 최근 완료 샤드는 status='recent')"""
+        keys = [shard_key(country, category) for country, category in shards]
+        rows = await fetch_all("""
+            SELECT shard_key, status, page_token, pages_done, items_seen, items_new,
+                   EXTRACT(EPOCH FROM (NOW() - updated_at)) AS idle_sec,
+                   EXTRACT(EPOCH FROM (NOW() - completed_at)) AS completed_ago_sec
+            FROM crawl_checkpoints
+            WHERE shard_key = ANY(:keys)
+        """, {"keys": keys}, use_primary=True)
+        checkpoints = {row["shard_key"]: row for row in rows}
+
+        planned = []
+        for (country, category), key in zip(shards, keys):
+            cp = checkpoints.get(key)
+            cost, churn, priority = self._estimate(cp, force)
+            recent = (not force and cp is not None and cp["status"] == "completed"
+                      and cp["completed_ago_sec"] is not None and cp["completed_ago_sec"] < CRAWL_SHARD_MIN_INTERVAL)
+            planned.append((recent, -priority, {
+                "shard": key, "country": country, "category": category,
+                "status": "recent" if recent else "pending",
+                "cost": 0 if recent else cost,
+                "churn": round(churn, 3),
+                "priority": round(priority, 3) if priority != float("inf") else None  # None = 최우선 (JSON에 inf 불가)
+            }))
+        planned.sort(key=lambda p: p[:2])
+        return [p for _, _, p in planned]
+
+    # ==========================================================
+    #  쿼터 기반 입장
+    # ==========================================================
+
+    def _admit(self, cost: int) -> bool:
+        remaining, _ = _manage_quota(cost=0)
+        if remaining - self.reserved - cost < self.quota_reserve:
+            return False
+        self.reserved += cost
+        return True
+
+    # ==========================================================
+    #  실행
+    # ==========================================================
+
+    async def run(
+        self,
+        shards: list[tuple[str, str | None]],
+        force: bool = False,
+        pipeline: EmbeddingPipeline = None,
+        on_progress: Callable[[int, int, dict], Awaitable] = None
+    ) -> dict:
+        """
+        우선순위 순으로 샤드를 최대 concurrency개씩 병렬 수집
+        on_progress(done, total, totals): 샤드 1개 끝날 때마다 호출 (작업 진행률 보고용)
+        Returns: {"shards": [crawl_shard 결과 | deferred/recent/error], "totals", "elapsed_sec", "quota_remaining"}
+        """
+        started = time.monotonic()
+        planned = await self.plan(shards, force)
+        queue = [p for p in planned if p["status"] == "pending"]
+        results = [{"shard": p["shard"], "status": "recent"} for p in planned if p["status"] == "recent"]
+        totals = {"seen": 0, "new": 0, "updated": 0, "skipped": 0}
+        done = len(results)
+        lock = asyncio.Lock()
+
+        async def _record(res: dict):
+            nonlocal done
+            async with lock:
+                results.append(res)
+                for name in totals:
+                    totals[name] += res.get(name, 0)
+                done += 1
+                if on_progress:
+                    await on_progress(done, len(planned), totals)
+
+        async def _run_one(p: dict):
+            left = p["cost"]
+
+            async def _on_page(pages_done: int, max_pages: int):
+                # 쓴 만큼 예약 해제 (_manage_quota 잔량에 이미 반영됨)
+                nonlocal left
+                if left > 0:
+                    left -= 1
+                    self.reserved -= 1
+
+            try:
+                res = await crawl_shard(p["country"], p["category"], max_pages=self.max_pages,
+                                        force=force, pipeline=pipeline, on_page=_on_page)
+            except Exception as e:
+                print(f"⚠️ [Scheduler] Shard {p['shard']} failed: {e}")
+                res = {"shard": p["shard"], "status": "error", "error": str(e)}
+            finally:
+                self.reserved -= left
+            await _record(res)
+
+        async def _worker():
+            while queue:
+                p = queue.pop(0)
+                if not self._admit(p["cost"]):
+                    # 우선순위가 낮아도 더 싼 샤드는 들어갈 수 있으므로 다음 샤드 계속 확인
+                    await _record({"shard": p["shard"], "status": "deferred", "cost": p["cost"]})
+                    continue
+                await _run_one(p)
+
+        await asyncio.gather(*[_worker() for _ in range(min(self.concurrency, len(queue)))])
+
+        deferred = sum(1 for r in results if r["status"] == "deferred")
+        remaining, limit = _manage_quota(cost=0)
+        if deferred:
+            print(f"⏸️ [Scheduler] {deferred} shards deferred (quota {remaining}/{limit}, reserve {self.quota_reserve})")
+        return {
+            "shards": results,
+            "totals": totals,
+            "elapsed_sec": round(time.monotonic() - started, 2),
+            "quota_remaining": remaining
+        }
@@ -0,0 +1,224 @@
+"""
+증분/재개형 인기 영상 크롤러
+- (국가, 카테고리) 샤드마다 crawl_checkpoints에 진행 상황 저장 -> 중간에 죽어도 다음 실행이 page_token부터 재개
+- CRAWL_SHARD_MIN_INTERVAL 안에 끝난 샤드는 건너뜀 (API 호출 0)
+- 첫 페이지는 지난 실행의 목록 ETag로 조건부 요청 -> 304면 샤드 전체 생략
+- 영상별 etag(없으면 조회수)를 DB 값과 비교해 안 바뀐 영상은 쓰지 않고,
+  바뀐 영상도 마지막 갱신이 CRAWL_STATS_TTL보다 오래된 행만 갱신 (신규 영상은 항상 저장)
+"""
+import os
+from typing import Awaitable, Callable
+from core.database import execute, fetch_one, fetch_all, register_statement
+from client.youtube_client import get_popular_videos
+from client.openai_client import EmbeddingPipeline
+
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "4"))                             # 샤드당 최대 페이지 (50개/페이지)
+CRAWL_SHARD_MIN_INTERVAL = int(os.getenv("CRAWL_SHARD_MIN_INTERVAL", "3600"))        # 완료 후 이 시간(초) 안에는 다시 긁지 않음
+CRAWL_RESUME_WINDOW = int(os.getenv("CRAWL_RESUME_WINDOW", "1800"))                  # 중단된 page_token을 이어 쓸 수 있는 시간 (초)
+CRAWL_STATS_TTL = int(os.getenv("CRAWL_STATS_TTL", "21600"))                         # 바뀐 영상도 이 시간(초)이 지나야 조회수 갱신
+
+
+def shard_key(country: str, category: str = None) -> str:
+    return f"{country}:{category or '*'}"
+
+
+# ==========================================================
+#  체크포인트
+# ==========================================================
+
+LOAD_CHECKPOINT = register_statement("crawler.load_checkpoint", """
+    SELECT shard_key, country, category, status, page_token, pages_done, list_etag,
+           items_seen, items_new, items_updated, items_skipped,
+           started_at, updated_at, completed_at,
+           EXTRACT(EPOCH FROM (NOW() - updated_at)) AS idle_sec,
+           EXTRACT(EPOCH FROM (NOW() - completed_at)) AS completed_ago_sec
+    FROM crawl_checkpoints
+    WHERE shard_key = :key
+""")
+
+# 새 실행 시작: 진행 위치/통계 초기화 (list_etag는 완료 시에만 다시 채움 -> 중간에 죽은 목록으로 304 받지 않도록)
+START_CHECKPOINT = register_statement("crawler.start_checkpoint", """
+    INSERT INTO crawl_checkpoints (shard_key, country, category, status, page_token, pages_done, started_at, updated_at)
+    VALUES (:key, :country, :category, 'running', NULL, 0, NOW(), NOW())
+    ON CONFLICT (shard_key) DO UPDATE SET
+        status = 'running', page_token = NULL, pages_done = 0, list_etag = NULL,
+        items_seen = 0, items_new = 0, items_updated = 0, items_skipped = 0,
+        started_at = NOW(), updated_at = NOW()
+""")
+
+SAVE_PAGE = register_statement("crawler.save_page", """
+    UPDATE crawl_checkpoints
+    SET page_token = :page_token, pages_done = pages_done + 1,
+        items_seen = items_seen + :seen, items_new = items_new + :new,
+        items_updated = items_updated + :updated, items_skipped = items_skipped + :skipped,
+        updated_at = NOW()
+    WHERE shard_key = :key
+""")
+
+COMPLETE_CHECKPOINT = register_statement("crawler.complete_checkpoint", """
+    UPDATE crawl_checkpoints
+    SET status = 'completed', page_token = NULL, list_etag = :list_etag,
+        completed_at = NOW(), updated_at = NOW()
+    WHERE shard_key = :key
+""")
+
+
+async def load_checkpoint(country: str, category: str = None) -> dict | None:
+    return await fetch_one(LOAD_CHECKPOINT, {"key": shard_key(country, category)}, use_primary=True)
+
+
+async def list_checkpoints() -> list[dict]:
+    """전체 샤드 진행 상황 (Admin)"""
+    return await fetch_all("""
+        SELECT shard_key, status, pages_done, items_seen, items_new, items_updated, items_skipped,
+               started_at, updated_at, completed_at
+        FROM crawl_checkpoints
+        ORDER BY shard_key
+    """, use_primary=True)
+
+
+# ==========================================================
+#  변경 감지 (바뀐 영상만 저장)
+# ==========================================================
+
+EXISTING_VIDEOS = register_statement("crawler.existing_videos", """
+    SELECT video_id, etag, view_count, (embedding IS NULL) AS needs_embedding,
+           (updated_at IS NULL OR updated_at < NOW() - make_interval(secs => :ttl)) AS stale
+    FROM youtube_list
+    WHERE video_id = ANY(:ids)
+""")
+
+
+def _is_unchanged(item: dict, row: dict) -> bool:
+    """etag가 양쪽에 있으면 etag로, 아니면 조회수로 비교"""
+    if item.get("etag") and row.get("etag"):
+        return item["etag"] == row["etag"]
+    views = int(item["viewCount"]) if item.get("viewCount") else 0
+    return views == (row.get("view_count") or 0)
+
+
+async def store_changed_videos(items: list, country: str, pipeline: EmbeddingPipeline) -> dict:
+    """
+    인기 영상 1페이지 중 신규/변경+오래된 영상만 Upsert
+    Returns: {"seen", "new", "updated", "skipped"}
+    """
+    from content.youtube.service import _store_trend_page, _build_embedding_text
+
+    items = [item for item in items if item.get("id")]
+    if not items:
+        return {"seen": 0, "new": 0, "updated": 0, "skipped": 0}
+
+    rows = await fetch_all(
+        EXISTING_VIDEOS,
+        {"ids": [item["id"] for item in items], "ttl": CRAWL_STATS_TTL},
+        use_primary=True
+    )
+    existing = {row["video_id"]: row for row in rows}
+
+    to_write = []
+    skipped = 0
+    for item in items:
+        row = existing.get(item["id"])
+        if row is None or (row["stale"] and not _is_unchanged(item, row)):
+            to_write.append(item)
+            continue
+        skipped += 1
+        # 쓰기는 생략해도 임베딩이 비어 있으면 채움
+        if row["needs_embedding"]:
+            await pipeline.add(item["id"], _build_embedding_text(item))
+
+    new_count = await _store_trend_page(to_write, country, pipeline) if to_write else 0
+    return {"seen": len(items), "new": new_count, "updated": len(to_write) - new_count, "skipped": skipped}
+
+
+# ==========================================================
+#  샤드 크롤링
+# ==========================================================
+
+async def crawl_shard(
+    country: str,
+    category: str = None,
+    max_pages: int = CRAWL_MAX_PAGES,
+    force: bool = False,
+    pipeline: EmbeddingPipeline = None,
+    on_page: Callable[[int, int], Awaitable] = None
+) -> dict:
+    """
+    (국가, 카테고리) 샤드 1개 수집
+    - force: 최근 완료/목록 ETag 무시하고 처음부터 다시 긁음
+    - pipeline: 여러 샤드가 임베딩 배치를 공유할 때 전달 (없으면 직접 만들고 마지막에 flush)
+    - on_page(pages_done, max_pages): 페이지 저장 후 호출 (작업 진행률 보고용)
+    Returns: {"shard", "status", "resumed", "pages", "seen", "new", "updated", "skipped"}
+      status: completed | not_modified | recent (건너뜀) | error (checkpoint에 page_token 남김)
+    """
+    key = shard_key(country, category)
+    own_pipeline = pipeline is None
+    if own_pipeline:
+        from content.youtube.service import _save_video_embeddings
+        pipeline = EmbeddingPipeline(on_flush=_save_video_embeddings)
+
+    result = {"shard": key, "status": "completed", "resumed": False, "pages": 0,
+              "seen": 0, "new": 0, "updated": 0, "skipped": 0}
+
+    cp = await load_checkpoint(country, category)
+    if (not force and cp and cp["status"] == "completed"
+            and cp["completed_ago_sec"] is not None and cp["completed_ago_sec"] < CRAWL_SHARD_MIN_INTERVAL):
+        result["status"] = "recent"
+        return result
+
+    resume = (not force and cp is not None and cp["status"] == "running" and cp["page_token"]
+              and cp["idle_sec"] < CRAWL_RESUME_WINDOW and cp["pages_done"] < max_pages)
+    if resume:
+        page_token, pages_done = cp["page_token"], cp["pages_done"]
+        list_etag = None  # 첫 페이지를 이번에 못 봤으므로 목록 ETag 없음
+        result["resumed"] = True
+        print(f"⏯️ [Crawler] Resume {key} from page {pages_done + 1}")
+    else:
+        page_token, pages_done = None, 0
+        list_etag = cp["list_etag"] if (cp and not force) else None
+        await execute(START_CHECKPOINT, {"key": key, "country": country, "category": category})
+
+    first_etag = None
+    while pages_done < max_pages:
+        res = await get_popular_videos(
+            max_results=50,
+            region_code=country,
+            category_id=category,
+            page_token=page_token,
+            etag=list_etag if pages_done == 0 else None
+        )
+        if "error" in res:
+            print(f"❌ [Crawler] API Error ({key}): {res['error']}")
+            result["status"] = "error"
+            break
+
+        if res.get("not_modified"):
+            # 목록이 지난 실행과 같음 -> 나머지 페이지도 생략
+            first_etag = list_etag
+            result["status"] = "not_modified"
+            break
+
+        if pages_done == 0:
+            first_etag = res.get("etag")
+
+        items = res.get("items", [])
+        counts = await store_changed_videos(items, country, pipeline)
+        for name, value in counts.items():
+            result[name] += value
+
+        page_token = res.get("nextPageToken")
+        pages_done += 1
+        result["pages"] += 1
+        await execute(SAVE_PAGE, {"key": key, "page_token": page_token, **counts})
+        if on_page:
+            await on_page(pages_done, max_pages)
+
+        if not items or not page_token:
+            break
+
+    if result["status"] != "error":
+        await execute(COMPLETE_CHECKPOINT, {"key": key, "list_etag": first_etag})
+
+    if own_pipeline:
+        await pipeline.flush()
+    return result
@@ -0,0 +1,98 @@
+"""
+영상 메타데이터 보강 큐 (시청 로그 클릭 경로에서 분리)
+- log_view는 시청 기록 Upsert 1번만 하고, 메타데이터 저장 + 임베딩(OpenAI) + 취향 벡터 반영은 여기로 넘김
+- 같은 영상이 대기 중이면 하나로 합침 (시청자만 추가) -> 인기 영상 동시 클릭에도 임베딩 1번
+- 큐가 가득 차면 버림 (dropped 집계). 영상 행은 크롤러/다음 시청 때 다시 채워짐
+"""
+import os
+import asyncio
+from utils.safe_ops import safe_execute
+
+ENRICH_QUEUE_SIZE = int(os.getenv("ENRICH_QUEUE_SIZE", "1000"))   # 대기 가능한 영상 수
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "2"))            # 동시 처리 워커 수 (OpenAI 동시 호출 수)
+
+
+class VideoEnrichmentQueue:
+    def __init__(self, max_size: int = ENRICH_QUEUE_SIZE, workers: int = ENRICH_WORKERS):
+        self.max_size = max_size
+        self.workers = workers
+        self.pending: dict[str, dict] = {}   # video_id -> {"data": video_data, "viewers": [(user_id, weight)]}
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self.stats = {"enqueued": 0, "merged": 0, "dropped": 0, "processed": 0, "failed": 0}
+
+    def enqueue(self, video_id: str, video_data: dict, user_id: int = None, taste_weight: float = 0) -> bool:
+        """보강 작업 등록 (DB/네트워크 호출 없음). 버려졌으면 False"""
+        viewer = [(user_id, taste_weight)] if user_id is not None and taste_weight else []
+        entry = self.pending.get(video_id)
+        if entry is not None:
+            entry["viewers"].extend(viewer)
+            self.stats["merged"] += 1
+            return True
+        if self._queue is None or self._queue.full():
+            self.stats["dropped"] += 1
+            return False
+
+        self.pending[video_id] = {"data": video_data, "viewers": viewer}
+        self._queue.put_nowait(video_id)
+        self.stats["enqueued"] += 1
+        return True
+
+    async def _process(self, video_id: str):
+        from content.youtube.service import ensure_video_metadata
+        from content.youtube.taste_vector import on_video_watch
+
+        entry = self.pending.pop(video_id, None)
+        if entry is None:
+            return
+        try:
+            await ensure_video_metadata(video_id, entry["data"])
+            self.stats["processed"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"⚠️ [Enrichment] Metadata ensure failed for {video_id}: {e}")
+
+        # 임베딩이 생긴 뒤에 취향 벡터 반영
+        for user_id, weight in entry["viewers"]:
+            with safe_execute(f"Taste update failed for user {user_id}"):
+                await on_video_watch(user_id, video_id, weight)
+
+    async def _worker(self):
+        while True:
+            video_id = await self._queue.get()
+            try:
+                await self._process(video_id)
+            finally:
+                self._queue.task_done()
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(max(1, self.workers))]
+        print(f"🧩 [Enrichment] started ({len(self._tasks)} workers, queue {self.max_size})")
+
+    async def stop(self, drain_timeout: float = 10):
+        """남은 작업을 drain_timeout초까지 처리한 뒤 워커 종료"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ [Enrichment] {self._queue.qsize()} jobs left unprocessed on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "workers": len(self._tasks)
+        }
+
+
+enrichment_queue = VideoEnrichmentQueue()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Computed, Index
 from sqlalchemy.sql import func
 from pgvector.sqlalchemy import Vector  # [New] 벡터 타입 추가
 from core.database import Base
@@ -33,10 +33,16 @@ class YoutubeList(Base):
     duration = Column(String, nullable=True)                            # 길이
     is_short = Column(Integer, nullable=True)                           # 쇼츠 여부 (1: 쇼츠, 0: 일반, NULL: 미확인)
     view_count = Column(Integer, nullable=True)                         # 조회수
+    etag = Column(String, nullable=True)                                # 영상 리소스 ETag (크롤러 변경 감지용)
     
     # [New] 벡터 임베딩 (1536차원 - OpenAI text-embedding-3-small)
     embedding = Column(Vector(1536), nullable=True)
 
+    # 트라이그램 검색용 (제목 + 채널명 + 태그, DB가 자동 생성 / GIN gin_trgm_ops 인덱스)
+    search_text = Column(Text, Computed(
+        "lower(coalesce(title, '') || ' ' || coalesce(channel_title, '') || ' ' || coalesce(tags, ''))", persisted=True
+    ))
+
     published_at = Column(DateTime(timezone=True), nullable=True)       # 업로드일
     created_at = Column(DateTime(timezone=True), server_default=func.now()) # 수집일
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now()) # 수정일
@@ -56,10 +62,38 @@ class YoutubeChannel(Base):
     # [New] 채널 성향 벡터 임베딩 (1536차원)
     embedding = Column(Vector(1536), nullable=True)
 
+    # 트라이그램 검색용 (채널명 + 키워드 + 설명, DB가 자동 생성 / GIN gin_trgm_ops 인덱스)
+    search_text = Column(Text, Computed(
+        "lower(coalesce(name, '') || ' ' || coalesce(keywords, '') || ' ' || coalesce(description, ''))", persisted=True
+    ))
+
     thumbnail_url = Column(Text, nullable=True)                          # 채널 썸네일 URL
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class CrawlCheckpoint(Base):
+    """인기 영상 크롤러 진행 상황 ((국가, 카테고리) 샤드별 1행, 중단 시 page_token부터 재개)"""
+    __tablename__ = "crawl_checkpoints"
+
+    shard_key = Column(String, primary_key=True)                   # 'KR:10', 'US:*' (*: 전체 카테고리)
+    country = Column(String, nullable=False)
+    category = Column(String, nullable=True)
+    status = Column(String, nullable=False, server_default="running")  # 'running' | 'completed'
+    page_token = Column(String, nullable=True)                     # 다음에 가져올 페이지 (running일 때)
+    pages_done = Column(Integer, nullable=False, server_default="0")
+    list_etag = Column(String, nullable=True)                      # 첫 페이지 ETag (If-None-Match)
+
+    # 마지막 실행 통계 (샤드별 변화율 판단용)
+    items_seen = Column(Integer, nullable=False, server_default="0")
+    items_new = Column(Integer, nullable=False, server_default="0")
+    items_updated = Column(Integer, nullable=False, server_default="0")
+    items_skipped = Column(Integer, nullable=False, server_default="0")
+
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+
 
 class UserLog(Base):
     """유저 통합 활동 로그 (클릭, 좋아요, 조회 등)"""
@@ -85,8 +119,13 @@ class UserYoutubeLog(Base):
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False, index=True)
     video_id = Column(String, nullable=False, index=True)
     
-    watched_seconds = Column(Integer, default=0)  # 실제 시청 시간 (초)
+    watched_seconds = Column(Integer, default=0)  # 실제 시청 시간 (초, 보고된 최대값)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # 유저+영상당 1행 (log_view가 ON CONFLICT Upsert로 사용)
+        Index("uq_user_youtube_logs_user_video", "user_id", "video_id", unique=True),
+    )
+
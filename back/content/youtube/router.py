@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Annotated
 from content.youtube import service
@@ -6,6 +6,9 @@ from user import service as user_service # UUID 조회를 위해 추가
 from user.router import get_current_user
 from user import models
 from core.database import fetch_all, fetch_one, execute
+from core.pagination import KeysetSort, decode_cursor, EPOCH_SQL
+from content.search.tools.keyword_search import channel_search_clause
+from core.job_queue import enqueue_job
 
 router = APIRouter(prefix="/api/content/youtube", tags=["Youtube"])
 
@@ -25,24 +28,24 @@ class DiscoverRequest(BaseModel):
     category: str = "reality" # 'reality' or 'sketch'
 
 @router.get("/search")
-def search_youtube_endpoint(query: str):
-    return search_videos(query)
+async def search_youtube_endpoint(query: str):
+    return await search_videos(query)
 
 @router.get("/popular")
-def popular_youtube_endpoint(categoryId: str = None):
-    return get_popular_videos(category_id=categoryId)
+async def popular_youtube_endpoint(categoryId: str = None):
+    return await get_popular_videos(category_id=categoryId)
 
 @router.get("/dating")
-def dating_youtube_endpoint():
-    return get_dating_videos()
+async def dating_youtube_endpoint():
+    return await get_dating_videos()
 
 @router.post("/dating/discover")
-def discover_dating_endpoint(req: DiscoverRequest):
+async def discover_dating_endpoint(req: DiscoverRequest):
     """
     새로운 연애 채널 자동 발굴 (비용 100)
     category: reality(연애/코칭) | sketch(스케치 코미디)
     """
-    return discover_new_channels(category=req.category)
+    return await discover_new_channels(category=req.category)
 
 class VideoTimeSchema(BaseModel):
     log_id: int
@@ -68,7 +71,9 @@ async def update_time_endpoint(
     """
     시청 시간 업데이트 (종료 시점)
     """
-    return await service.update_video_time(data.log_id, data.watched, data.total)
+    if data.watched < 0:
+        raise HTTPException(status_code=400, detail="watched는 0 이상이어야 합니다.")
+    return await service.update_video_time(current_user["id"], data.log_id, data.watched, data.total)
 
 @router.get("/history")
 async def get_view_history_endpoint(
@@ -112,7 +117,7 @@ async def discover_interest_endpoint(
     2. 검색된 채널을 DB에 저장 및 구독 (Service)
     """
     # 1. 채널 발굴 (API Call)
-    result = discover_interest_channels(keyword=req.keyword)
+    result = await discover_interest_channels(keyword=req.keyword)
     
     if result.get("error"):
         return result
@@ -146,7 +151,7 @@ async def get_interest_endpoint(
         return {"items": [], "channels": [], "message": "구독한 채널이 없습니다."}
 
     # 2. 영상 긁어오기 (RSS) - 실시간으로만 보여주고 DB 저장 안 함
-    return get_interest_videos(target_keyword=keyword, my_channels=my_channels)
+    return await get_interest_videos(target_keyword=keyword, my_channels=my_channels)
 
 
 
@@ -177,30 +182,45 @@ async def subscribe_channel_endpoint(
 #  채널 발굴 & 리스트 API (New UI)
 # =========================================================
 
+# 채널 리스트 Keyset 정렬 (표현식 인덱스: alembic c5a7e2d4f918)
+CHANNEL_LIST_SORT = KeysetSort("created", f"COALESCE(c.created_at, {EPOCH_SQL})", "c.id", "sort_key", "datetime")
+
 @router.get("/channels/list")
 async def get_channels_list_endpoint(
     current_user: Annotated[models.User, Depends(get_current_user)],
     search: str = None,
     category: str = None,
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    cursor: str = None
 ):
     """
     채널 리스트 조회 (발굴된 채널 + 구독 정보)
     - search: 채널명 또는 키워드 검색
     - category: 카테고리 필터
-    - limit/offset: 페이징
+    - cursor: 이전 응답의 next_cursor (Keyset 페이징, 권장)
+    - limit/offset: 페이징 (offset은 하위 호환용, cursor 사용 시 무시)
     """
     where_clauses = []
-    params = {"limit": limit, "offset": offset, "user_id": current_user["id"]}
+    params = {"limit": limit, "user_id": current_user["id"]}
     
     if search:
-        where_clauses.append("(c.name ILIKE :search OR c.keywords ILIKE :search OR c.description ILIKE :search)")
-        params["search"] = f"%{search}%"
+        # 채널명/키워드/설명 부분일치 (기본: search_text + GIN 트라이그램 인덱스, KEYWORD_SEARCH_BACKEND 따름)
+        where_clauses.append(channel_search_clause("c", search, params))
     
     if category:
         where_clauses.append("c.category = :category")
         params["category"] = category
+
+    paging_clause = "LIMIT :limit"
+    if cursor:
+        try:
+            where_clauses.append(CHANNEL_LIST_SORT.where_clause(decode_cursor(cursor, CHANNEL_LIST_SORT.name), params))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif offset:
+        paging_clause += " OFFSET :offset"
+        params["offset"] = offset
     
     where_str = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
     
@@ -213,24 +233,31 @@ async def get_channels_list_endpoint(
             c.description,
             c.thumbnail_url,
             c.created_at,
-            CASE WHEN ul.id IS NOT NULL THEN true ELSE false END as is_subscribed
+            CASE WHEN ul.id IS NOT NULL THEN true ELSE false END as is_subscribed,
+            c.id as row_id,
+            {CHANNEL_LIST_SORT.expr} as sort_key
         FROM youtube_channels c
         LEFT JOIN user_logs ul ON ul.content_id = c.channel_id 
             AND ul.user_id = :user_id 
             AND ul.content_type = 'youtube_channel' 
             AND ul.action = 'subscribe'
         {where_str}
-        ORDER BY c.created_at DESC
-        LIMIT :limit OFFSET :offset
+        {CHANNEL_LIST_SORT.order_clause}
+        {paging_clause}
     """
     
     channels = await fetch_all(sql, params)
+    next_cursor = CHANNEL_LIST_SORT.next_cursor(channels, limit, id_field="row_id")
+    for ch in channels:
+        ch.pop("row_id", None)
+        ch.pop("sort_key", None)
     
     return {
-        "channels": [dict(ch) for ch in channels],
+        "channels": channels,
         "count": len(channels),
         "offset": offset,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 @router.get("/channels/{channel_id}")
@@ -271,27 +298,34 @@ async def get_videos_feed_endpoint(
     country: str = None,
     category: str = None,
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    cursor: str = None
 ):
     """
     영상 피드 조회 (DB 수집 영상)
     - sort_by: "newest" (최신순) | "popular" (조회수순)
     - country, category: 필터
-    - limit/offset: 페이징
-    """
-    videos = await service.get_collected_videos(
-        country=country,
-        category=category,
-        limit=limit,
-        offset=offset,
-        sort_by=sort_by
-    )
+    - cursor: 이전 응답의 next_cursor (Keyset 페이징, 권장)
+    - limit/offset: 페이징 (offset은 하위 호환용)
+    """
+    try:
+        page = await service.get_videos_feed(
+            country=country,
+            category=category,
+            limit=limit,
+            sort_by=sort_by,
+            cursor=cursor,
+            offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
-        "videos": videos,
-        "count": len(videos),
+        "videos": page["videos"],
+        "count": len(page["videos"]),
         "offset": offset,
-        "sort_by": sort_by
+        "sort_by": page["sort_by"],
+        "next_cursor": page["next_cursor"]
     }
 
 
@@ -309,7 +343,7 @@ async def get_live_search_endpoint(
     YouTube API 실시간 인기 급상승 조회 (DB 저장 X)
     """
     try:
-        videos_data = get_popular_videos(
+        videos_data = await get_popular_videos(
             region_code=country,
             category_id=category,
             max_results=limit
@@ -335,7 +369,7 @@ async def search_channels_endpoint(
         from client.youtube_client import discover_interest_channels
         
         print(f"[Channel Search] Keyword: {query}")
-        result = discover_interest_channels(query)
+        result = await discover_interest_channels(query)
         
         # 에러 체크
         if "error" in result:
@@ -389,7 +423,7 @@ class RssRequest(BaseModel):
     channels: list[dict] # [{id: '...', name: '...'}, ...]
 
 @router.post("/interest/rss")
-def get_rss_videos_endpoint(req: RssRequest):
+async def get_rss_videos_endpoint(req: RssRequest):
     """
     특정 채널 리스트에 대한 RSS 영상 가져오기 (DB와 무관)
     발굴된 채널들의 영상을 미리보기 위해 사용
@@ -406,7 +440,7 @@ def get_rss_videos_endpoint(req: RssRequest):
         if cid:
             formatted_channels.append({"channel_id": cid, "name": name})
 
-    return get_interest_videos(target_keyword=None, my_channels=formatted_channels)
+    return await get_interest_videos(target_keyword=None, my_channels=formatted_channels)
 
 class UnsubscribeRequest(BaseModel):
     channel_id: str
@@ -482,13 +516,14 @@ async def get_random_video_endpoint(
     return {"success": True, "video": video}
 
 @router.post("/admin/collect")
-async def collect_global_trends_endpoint(background_tasks: BackgroundTasks):
+async def collect_global_trends_endpoint(force: bool = False):
     """
     [Admin] 글로벌 인기 영상 수집기 실행
-    백그라운드에서 실행되므로 요청은 즉시 반환됨.
+    작업 큐에 등록만 하고 즉시 반환 (worker.py에서 실행, 이미 대기/실행 중이면 기존 작업 반환)
+    force=true: 최근 수집한 샤드도 처음부터 다시 수집
     """
-    background_tasks.add_task(service.collect_global_trends)
-    return {"status": "started", "message": "Global trend collection started in background."}
+    queued = await enqueue_job("youtube.collect_global_trends", {"force": force}, dedupe_key="youtube.collect_global_trends")
+    return {"status": "queued", "message": "Global trend collection queued.", **queued}
 
 @router.get("/db-list")
 async def get_db_videos_endpoint(country: str = None, category: str = None, limit: int = 50):
@@ -501,14 +536,19 @@ async def get_db_videos_endpoint(country: str = None, category: str = None, limi
 class CollectSpecificRequest(BaseModel):
     country: str
     category: str | None = None
+    force: bool = True  # False면 최근 수집한 샤드는 건너뛰고, 중단된 샤드는 이어서 수집
 
 @router.post("/admin/collect-one")
-async def collect_one_trend_endpoint(req: CollectSpecificRequest, background_tasks: BackgroundTasks):
+async def collect_one_trend_endpoint(req: CollectSpecificRequest):
     """
-    [Admin] 특정 국가/카테고리 수집 (점진적 수집)
+    [Admin] 특정 국가/카테고리 수집 (점진적 수집, 작업 큐)
     """
-    background_tasks.add_task(service.collect_trend_one, req.country, req.category)
-    return {"status": "started", "message": f"Collect {req.country} - {req.category} started."}
+    queued = await enqueue_job(
+        "youtube.collect_trend_one",
+        {"country": req.country, "category": req.category, "force": req.force},
+        dedupe_key=f"youtube.collect_trend_one:{req.country}:{req.category}"
+    )
+    return {"status": "queued", "message": f"Collect {req.country} - {req.category} queued.", **queued}
 
 
 class SaveChannelRequest(BaseModel):
@@ -569,7 +609,7 @@ async def subscribe_channel_endpoint(
             print(f"[Subscribe] Channel {req.channel_id} missing in DB. Fetching from API...")
             try:
                 from client.youtube_client import fetch_channel_metadata
-                meta = fetch_channel_metadata(req.channel_id)
+                meta = await fetch_channel_metadata(req.channel_id)
                 
                 if meta:
                     await service.add_channel(
@@ -0,0 +1,189 @@
+"""
+랜덤 영상 샘플러 (ORDER BY RANDOM() 전체 정렬 대체)
+- 단건: 미리 섞어둔 메모리 풀에서 pop (O(1)), 풀이 비면 PK 랜덤 Probe (id >= 난수 LIMIT 1, 인덱스 1회 탐색)
+- 다건: 풀에서 k개, 부족하면 TABLESAMPLE BERNOULLI로 표본 행만 골라 추출
+  (SYSTEM은 블록 단위라 같은 수집 배치(국가/카테고리) 영상끼리 뭉쳐 나옴 -> 행 단위 BERNOULLI 사용)
+  BERNOULLI도 모든 페이지를 읽음 (순차 스캔 1회) -> 없애는 건 전체 정렬(ORDER BY RANDOM())이지 스캔이 아님
+  표본 비율은 SAMPLER_MAX_PCT까지만 올리고, 필터 조합이라 그래도 모자라면 PK Probe 반복으로 보충
+- 풀은 (country, category) 필터 조합별로 유지, 기준치 아래로 줄면 백그라운드에서 다시 채움
+"""
+import os
+import time
+import random
+import asyncio
+from collections import OrderedDict, deque
+from core.database import fetch_one, fetch_all
+
+SAMPLER_POOL_SIZE = int(os.getenv("SAMPLER_POOL_SIZE", "500"))         # 필터 조합별 풀 크기 (id만 보관)
+SAMPLER_LOW_WATER = int(os.getenv("SAMPLER_LOW_WATER", "100"))         # 이 아래로 줄면 백그라운드 리필
+SAMPLER_MAX_POOLS = int(os.getenv("SAMPLER_MAX_POOLS", "64"))          # 유지할 필터 조합 수 (LRU)
+SAMPLER_STATS_TTL = int(os.getenv("SAMPLER_STATS_TTL", "300"))         # id 범위/행 수 추정치 캐시 (초)
+SAMPLER_OVERSAMPLE = float(os.getenv("SAMPLER_OVERSAMPLE", "3"))       # 필터 탈락분을 감안한 표본 배수
+SAMPLER_MAX_PCT = float(os.getenv("SAMPLER_MAX_PCT", "10"))            # 표본 비율 상한 (%, 100이면 전체 정렬과 같음)
+SAMPLER_TABLESAMPLE_TRIES = int(os.getenv("SAMPLER_TABLESAMPLE_TRIES", "2"))   # 비율 올려 재시도 횟수 포함 최대 시도
+SAMPLER_MAX_PROBES = int(os.getenv("SAMPLER_MAX_PROBES", "200"))       # 필터 조합 보충용 PK Probe 최대 횟수
+
+
+class RandomSampler:
+    def __init__(self):
+        self.pools: OrderedDict[tuple, deque] = OrderedDict()
+        self._refills: dict[tuple, asyncio.Task] = {}
+        self._stats = None          # (min_id, max_id, row_estimate)
+        self._stats_at = 0.0
+        self.counters = {"pool_hit": 0, "probe": 0, "tablesample": 0, "refill": 0}
+
+    # ----------------------------------------------------
+    #  테이블 통계 (id 범위 + 행 수 추정)
+    # ----------------------------------------------------
+    async def _table_stats(self) -> tuple[int, int, float]:
+        if self._stats is None or time.monotonic() - self._stats_at > SAMPLER_STATS_TTL:
+            sql = """
+                SELECT
+                    (SELECT MIN(id) FROM youtube_list) AS min_id,
+                    (SELECT MAX(id) FROM youtube_list) AS max_id,
+                    (SELECT reltuples FROM pg_class WHERE relname = 'youtube_list') AS row_estimate
+            """
+            row = await fetch_one(sql)
+            self._stats = (row["min_id"], row["max_id"], max(float(row["row_estimate"] or 0), 1.0))
+            self._stats_at = time.monotonic()
+        return self._stats
+
+    def _filters(self, country: str, category: str, params: dict) -> str:
+        clauses = []
+        if country:
+            clauses.append("l.country_code = :country")
+            params["country"] = country
+        if category:
+            clauses.append("l.category_id = :category")
+            params["category"] = category
+        return "".join(f" AND {c}" for c in clauses)
+
+    # ----------------------------------------------------
+    #  샘플링 방식
+    # ----------------------------------------------------
+    async def _probe_id(self, country: str = None, category: str = None) -> int | None:
+        """[min_id, max_id] 난수 이후 첫 행 (PK 인덱스 1회 탐색, 못 찾으면 난수 앞쪽에서)"""
+        min_id, max_id, _ = await self._table_stats()
+        if min_id is None:
+            return None
+        self.counters["probe"] += 1
+
+        params = {"r": random.randint(min_id, max_id)}
+        filters = self._filters(country, category, params)
+        row = await fetch_one(f"SELECT l.id FROM youtube_list l WHERE l.id >= :r{filters} ORDER BY l.id LIMIT 1", params)
+        if not row:
+            row = await fetch_one(f"SELECT l.id FROM youtube_list l WHERE l.id < :r{filters} ORDER BY l.id DESC LIMIT 1", params)
+        return row["id"] if row else None
+
+    async def _probe_ids(self, country: str, category: str, k: int, exclude: set) -> list[int]:
+        """PK Probe 반복으로 중복 없는 id k개까지 (최대 SAMPLER_MAX_PROBES회)"""
+        ids = []
+        for _ in range(min(k * 2, SAMPLER_MAX_PROBES)):
+            if len(ids) >= k:
+                break
+            video_id = await self._probe_id(country, category)
+            if video_id is None:
+                break
+            if video_id not in exclude:
+                exclude.add(video_id)
+                ids.append(video_id)
+        return ids
+
+    async def _tablesample_ids(self, country: str, category: str, k: int) -> list[int]:
+        """
+        TABLESAMPLE BERNOULLI: 행마다 pct% 확률로 표본 추출 후 그 안에서만 섞어서 k개
+        - 필터 때문에 모자라면 비율을 늘려 재시도 (SAMPLER_TABLESAMPLE_TRIES회, SAMPLER_MAX_PCT까지)
+        - 그래도 모자란 필터 조합은 100%(전체 스캔 + 정렬) 대신 PK Probe로 보충
+        """
+        _, _, row_estimate = await self._table_stats()
+        self.counters["tablesample"] += 1
+
+        params = {"k": k}
+        filters = self._filters(country, category, params)
+        pct = min(100.0, max(0.01, k * SAMPLER_OVERSAMPLE * 100 / row_estimate))
+        max_pct = max(pct, SAMPLER_MAX_PCT)  # 작은 테이블은 처음부터 높은 비율 허용
+        ids = []
+        for _ in range(SAMPLER_TABLESAMPLE_TRIES):
+            params["pct"] = pct
+            rows = await fetch_all(f"""
+                SELECT l.id FROM youtube_list l TABLESAMPLE BERNOULLI (CAST(:pct AS real))
+                WHERE TRUE{filters}
+                ORDER BY RANDOM()
+                LIMIT :k
+            """, params)
+            ids = [row["id"] for row in rows]
+            if len(ids) >= k or pct >= max_pct:
+                break
+            pct = min(max_pct, pct * 4)
+
+        if len(ids) < k and filters:
+            ids += await self._probe_ids(country, category, k - len(ids), set(ids))
+        return ids
+
+    # ----------------------------------------------------
+    #  메모리 풀
+    # ----------------------------------------------------
+    def _pool(self, key: tuple) -> deque:
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = deque()
+            while len(self.pools) > SAMPLER_MAX_POOLS:
+                self.pools.popitem(last=False)
+        self.pools.move_to_end(key)
+        return pool
+
+    async def _refill(self, key: tuple):
+        try:
+            ids = await self._tablesample_ids(key[0], key[1], SAMPLER_POOL_SIZE)
+            random.shuffle(ids)
+            # 풀에 남아 있는 id와 겹치지 않게 (sample()의 중복 없음 보장)
+            pool = self._pool(key)
+            queued = set(pool)
+            pool.extend(i for i in ids if i not in queued)
+            self.counters["refill"] += 1
+        except Exception as e:
+            print(f"⚠️ [Sampler] Refill failed {key}: {e}")
+        finally:
+            self._refills.pop(key, None)
+
+    def _ensure_refill(self, key: tuple):
+        pool = self.pools.get(key)
+        if (pool is None or len(pool) < SAMPLER_LOW_WATER) and key not in self._refills:
+            self._refills[key] = asyncio.get_running_loop().create_task(self._refill(key))
+
+    # ----------------------------------------------------
+    #  Public API
+    # ----------------------------------------------------
+    async def pick(self, country: str = None, category: str = None) -> int | None:
+        """랜덤 영상 id 1개"""
+        key = (country, category)
+        pool = self._pool(key)
+        if pool:
+            self.counters["pool_hit"] += 1
+            video_id = pool.popleft()
+            self._ensure_refill(key)
+            return video_id
+        self._ensure_refill(key)
+        return await self._probe_id(country, category)
+
+    async def sample(self, country: str = None, category: str = None, k: int = 50) -> list[int]:
+        """랜덤 영상 id k개 (중복 없음)"""
+        key = (country, category)
+        pool = self._pool(key)
+        if len(pool) >= k:
+            self.counters["pool_hit"] += 1
+            ids = [pool.popleft() for _ in range(k)]
+            self._ensure_refill(key)
+            return ids
+        self._ensure_refill(key)
+        return await self._tablesample_ids(country, category, k)
+
+    def snapshot(self) -> dict:
+        return {
+            **self.counters,
+            "pools": {f"{k[0] or '*'}:{k[1] or '*'}": len(v) for k, v in self.pools.items()},
+            "refilling": len(self._refills)
+        }
+
+
+random_sampler = RandomSampler()
@@ -1,9 +1,19 @@
-from core.database import execute, fetch_one, fetch_all, insert_and_return
+from core.database import execute, fetch_one, fetch_all, insert_and_return, insert_and_return_all, transaction, register_statement
 from content.youtube import models
 import json
-from client.youtube_client import get_popular_videos, get_video_detail
+from client.youtube_client import get_video_detail
+from client.openai_client import EmbeddingPipeline
+from core.vector import to_vector_param, bulk_update_embeddings
+from core.pagination import KeysetSort, decode_cursor, EPOCH_SQL
+from content.youtube.sampler import random_sampler
+from content.youtube.taste_vector import on_channel_subscription, TASTE_VIEW_WEIGHT
+from content.youtube.enrichment import enrichment_queue
+from content.youtube.watch_time import watch_time_buffer
+from content.youtube.crawler import crawl_shard
+from content.youtube.crawl_scheduler import CrawlScheduler
 from datetime import datetime
 from utils.safe_ops import safe_execute
+from core.job_queue import job, report_progress
 
 
 # ========================================================
@@ -18,7 +28,7 @@ async def ensure_video_metadata(video_id: str, video_data: dict):
     """
     # 1. DB 확인
     check_sql = "SELECT id, view_count, title FROM youtube_list WHERE video_id = :video_id"
-    existing_video = await fetch_one(check_sql, {"video_id": video_id})
+    existing_video = await fetch_one(check_sql, {"video_id": video_id}, use_primary=True)  # 확인 후 쓰기 -> 복제본 지연 회피
 
     # Enrichment 필요 여부 (없거나, 조회수가 없거나)
     # [Zero-Cost 전략] API 호출 없이 있는 그대로(RSS) 저장한다.
@@ -28,7 +38,7 @@ async def ensure_video_metadata(video_id: str, video_data: dict):
     # 2. [Disabled] API 호출 및 데이터 보강 (JIT)
     # if needs_api:
     #     try:
-    #         detail = get_video_detail(video_id)
+    #         detail = await get_video_detail(video_id)
     #         if detail:
     #             video_data.update({ ... })
     #     except Exception as e:
@@ -57,7 +67,6 @@ async def ensure_video_metadata(video_id: str, video_data: dict):
         tags_str = video_data.get("tags") or ""
         text_content = f"{title} {ch_title} {tags_str} {desc[:500]}"
         embedding = await get_embedding_openai(text_content)
-        embedding_str = str(embedding) if embedding else None # 리스트 -> 문자열 변환
 
         await execute(
             """
@@ -88,7 +97,7 @@ async def ensure_video_metadata(video_id: str, video_data: dict):
                 "views": video_data.get("view_count", 0),
                 "cat": video_data.get("category_id"),
                 "tags": video_data.get("tags"),
-                "embed": embedding_str,
+                "embed": to_vector_param(embedding),
                 "pub": video_data.get("published_at")
             }
         )
@@ -115,72 +124,47 @@ async def ensure_video_metadata(video_id: str, video_data: dict):
         )
 
 
+UPSERT_VIEW_LOG = register_statement("youtube.upsert_view_log", """
+    INSERT INTO user_youtube_logs (user_id, video_id, watched_seconds, created_at, updated_at)
+    VALUES (:uid, :vid, 0, NOW(), NOW())
+    ON CONFLICT (user_id, video_id) DO UPDATE SET updated_at = NOW()
+    RETURNING id, (xmax = 0) AS inserted
+""")
+
 async def log_view(user_id: int, video_data: dict):
     """
     유튜브 시청 로그 저장 메인 함수
+    - 요청 경로: 시청 기록 Upsert 1번 (uq_user_youtube_logs_user_video 유니크 인덱스)
+    - 메타데이터 저장/임베딩/취향 벡터 반영은 보강 큐에서 백그라운드 처리
     """
     video_id = video_data.get("video_id")
     if not video_id: return {"error": "No video_id"}
 
-    # 1. 영상 메타데이터 보장 (실패해도 로그 저장은 시도)
-    with safe_execute(f"Metadata ensure failed for {video_id}"):
-        await ensure_video_metadata(video_id, video_data)
-
-    # 2. 시청 기록 저장 (UserYoutubeLog) - 중복 방지 (Upsert)
+    # 1. 시청 기록 저장 (UserYoutubeLog) - 있으면 최근 시청 시간만 갱신 (Top으로 올리기)
     with safe_execute(f"User log insert failed"):
-        # 먼저 해당 유저+영상의 로그가 있는지 확인
-        check_sql = "SELECT id FROM user_youtube_logs WHERE user_id = :uid AND video_id = :vid"
-        existing_log = await fetch_one(check_sql, {"uid": user_id, "vid": video_id})
-
-        if existing_log:
-            # 이미 있으면: 최근 시청 시간만 업데이트 (Top으로 올리기)
-            # 중복 데이터 정리 (가장 최근 것만 남기고 삭제) - Clean Up (Self-healing)
-            cleanup_sql = """
-                DELETE FROM user_youtube_logs
-                WHERE user_id = :uid AND video_id = :vid AND id != :keep_id
-            """
-            await execute(cleanup_sql, {"uid": user_id, "vid": video_id, "keep_id": existing_log["id"]})
+        log_record = await insert_and_return(UPSERT_VIEW_LOG, {"uid": user_id, "vid": video_id})
 
-            update_sql = """
-                UPDATE user_youtube_logs 
-                SET updated_at = NOW() 
-                WHERE id = :id
-            """
-            await execute(update_sql, {"id": existing_log["id"]})
-            return {"status": "updated", "log_id": existing_log["id"]}
-        else:
-            # 없으면: 신규 생성
-            sql = """
-                INSERT INTO user_youtube_logs 
-                    (user_id, video_id, watched_seconds, created_at, updated_at)
-                VALUES 
-                    (:user_id, :video_id, 0, NOW(), NOW())
-                RETURNING id
-            """
-            
-            log_record = await insert_and_return(sql, {
-                "user_id": user_id, 
-                "video_id": video_id
-            })
-            
-            return {"status": "logged", "log_id": log_record["id"]}
+        # 2. 영상 메타데이터 보강 + 신규 시청이면 취향 벡터 반영 (큐에 넣기만 함)
+        enrichment_queue.enqueue(
+            video_id, video_data,
+            user_id=user_id, taste_weight=TASTE_VIEW_WEIGHT if log_record["inserted"] else 0
+        )
+        status = "logged" if log_record["inserted"] else "updated"
+        return {"status": status, "log_id": log_record["id"]}
 
     # 예외 발생 시 safe_execute가 잡고 여기로 넘어옴
     return {"error": "Log action failed check server logs"}
 
 
-async def update_video_time(log_id: int, watched: int, total: int = None):
+async def update_video_time(user_id: int, log_id: int, watched: int, total: int = None):
     """
-    시청 시간 업데이트 (영상 종료/이탈 시 호출)
+    시청 시간 업데이트 (재생 중 주기적 / 영상 종료·이탈 시 호출)
     total 파라미터는 호환성을 위해 유지하지만 사용하지 않음
+    - Write-Behind: 버퍼에 최신값만 기록, WatchTimeBuffer가 주기적으로 일괄 UPDATE (+ 취향 벡터 반영)
+    - 본인(user_id) 로그만 갱신됨 (다른 유저 log_id는 flush 때 무시)
     """
-    sql = """
-        UPDATE user_youtube_logs 
-        SET watched_seconds = :w,
-            updated_at = NOW()
-        WHERE id = :log_id
-    """
-    await execute(sql, {"w": watched, "log_id": log_id})
+    if not watch_time_buffer.record(user_id, log_id, watched):
+        return {"status": "ignored", "watched": watched}
     return {"status": "updated", "watched": watched}
 
 
@@ -231,7 +215,7 @@ async def subscribe_channel(user_id: int, channel_data: dict, keyword: str = "")
 
     # 1. 채널 정보 확보 (DB -> Input -> API)
     check_ch_sql = "SELECT id, name, thumbnail_url, description FROM youtube_channels WHERE channel_id = :cid"
-    existing_ch = await fetch_one(check_ch_sql, {"cid": channel_id})
+    existing_ch = await fetch_one(check_ch_sql, {"cid": channel_id}, use_primary=True)  # 확인 후 쓰기 -> 복제본 지연 회피
 
     # 메타데이터가 부족하면 API 호출 시도 (JIT Enrichment)
     need_api_fetch = False
@@ -249,67 +233,74 @@ async def subscribe_channel(user_id: int, channel_data: dict, keyword: str = "")
     if not thumbnail and need_api_fetch:
          # API 호출
          from client.youtube_client import fetch_channel_metadata
-         meta = fetch_channel_metadata(channel_id) # 동기 호출 주의 (requests 사용중) -> async 래핑 필요하지만 일단 호출
+         meta = await fetch_channel_metadata(channel_id)
          if meta:
              channel_name = meta.get("name") or channel_name
              thumbnail = meta.get("thumbnail") or thumbnail
              description = meta.get("description") or ""
 
-    # Upsert Channel
-    if not existing_ch:
-         await execute(
-            """
-            INSERT INTO youtube_channels (channel_id, name, keywords, thumbnail_url, description, created_at)
-            VALUES (:cid, :name, :kw, :thumb, :desc, NOW())
-            """,
-            {
-                "cid": channel_id,
-                "name": channel_name,
-                "kw": keyword,
-                "thumb": thumbnail,
-                "desc": description
-            }
-        )
-    else:
-        # 정보 보강 (썸네일/설명이 비어있거나 업데이트 필요시)
-        updates = {}
-        if thumbnail and thumbnail != existing_ch.get("thumbnail_url"):
-            updates["thumbnail_url"] = thumbnail
-        if description and description != existing_ch.get("description"):
-            updates["description"] = description
-            
-        if updates:
-             set_clause = ", ".join([f"{k} = :{k}" for k in updates.keys()])
-             updates["cid"] = channel_id
-             await execute(
-                f"UPDATE youtube_channels SET {set_clause}, updated_at = NOW() WHERE channel_id = :cid",
-                updates
+    # 채널 저장 + 구독 기록을 한 트랜잭션으로 (API 호출은 위에서 끝낸 뒤 커넥션 점유)
+    async with transaction() as tx:
+        # Upsert Channel
+        if not existing_ch:
+            await tx.execute(
+                """
+                INSERT INTO youtube_channels (channel_id, name, keywords, thumbnail_url, description, created_at)
+                VALUES (:cid, :name, :kw, :thumb, :desc, NOW())
+                ON CONFLICT (channel_id) DO NOTHING
+                """,
+                {
+                    "cid": channel_id,
+                    "name": channel_name,
+                    "kw": keyword,
+                    "thumb": thumbnail,
+                    "desc": description
+                }
             )
+        else:
+            # 정보 보강 (썸네일/설명이 비어있거나 업데이트 필요시)
+            updates = {}
+            if thumbnail and thumbnail != existing_ch.get("thumbnail_url"):
+                updates["thumbnail_url"] = thumbnail
+            if description and description != existing_ch.get("description"):
+                updates["description"] = description
+                
+            if updates:
+                set_clause = ", ".join([f"{k} = :{k}" for k in updates.keys()])
+                updates["cid"] = channel_id
+                await tx.execute(
+                    f"UPDATE youtube_channels SET {set_clause}, updated_at = NOW() WHERE channel_id = :cid",
+                    updates
+                )
+
+        # 2. 유저 구독 로그 저장 (이미 구독했는지 확인)
+        check_sub_sql = """
+            SELECT id FROM user_logs 
+            WHERE user_id = :uid 
+              AND content_type = 'youtube_channel' 
+              AND content_id = :cid 
+              AND action = 'subscribe'
+        """
+        is_subscribed = await tx.fetch_one(check_sub_sql, {"uid": user_id, "cid": channel_id})
+
+        if not is_subscribed:
+            await tx.execute(
+                """
+                INSERT INTO user_logs (user_id, content_type, content_id, action)
+                VALUES (:uid, 'youtube_channel', :cid, 'subscribe')
+                """,
+                {
+                    "uid": user_id, 
+                    "cid": channel_id
+                }
+            )
+        else:
+            return {"status": "already_subscribed", "message": "이미 구독중인 채널입니다."}
 
-    # 2. 유저 구독 로그 저장 (이미 구독했는지 확인)
-    check_sub_sql = """
-        SELECT id FROM user_logs 
-        WHERE user_id = :uid 
-          AND content_type = 'youtube_channel' 
-          AND content_id = :cid 
-          AND action = 'subscribe'
-    """
-    is_subscribed = await fetch_one(check_sub_sql, {"uid": user_id, "cid": channel_id})
-
-    if not is_subscribed:
-        await execute(
-            """
-            INSERT INTO user_logs (user_id, content_type, content_id, action)
-            VALUES (:uid, 'youtube_channel', :cid, 'subscribe')
-            """,
-            {
-                "uid": user_id, 
-                "cid": channel_id
-            }
-        )
-        return {"status": "subscribed", "message": f"'{channel_name}' 채널을 구독했습니다."}
-    
-    return {"status": "already_subscribed", "message": "이미 구독중인 채널입니다."}
+    # 취향 벡터 증분 반영 (구독 커밋 후)
+    with safe_execute(f"Taste update failed for user {user_id}"):
+        await on_channel_subscription(user_id, channel_id, subscribed=True)
+    return {"status": "subscribed", "message": f"'{channel_name}' 채널을 구독했습니다."}
 
 
 async def get_my_channels(user_id: int):
@@ -345,148 +336,178 @@ async def unsubscribe_channel(user_id: int, channel_id: str):
           AND content_id = :cid 
           AND action = 'subscribe'
     """
-    await execute(sql, {"uid": user_id, "cid": channel_id})
+    result = await execute(sql, {"uid": user_id, "cid": channel_id})
+    if result.rowcount:
+        with safe_execute(f"Taste update failed for user {user_id}"):
+            await on_channel_subscription(user_id, channel_id, subscribed=False)
+
+RANDOM_VIDEO_BY_ID = register_statement("youtube.random_video_by_id", """
+    SELECT video_id, title, thumbnail_url, channel_title, channel_id, description, view_count, is_short, published_at, duration
+    FROM youtube_list
+    WHERE id = :id
+""")
 
 async def get_random_video():
     """
     DB에 저장된 영상 중 랜덤으로 1개를 가져옴 (쇼츠 감성 무한 스크롤용)
     """
-    # PostgreSQL의 RANDOM() 함수 사용
-    sql = """
-        SELECT video_id, title, thumbnail_url, channel_title, channel_id, description, view_count, is_short, published_at, duration
-        FROM youtube_list
-        ORDER BY RANDOM()
-        LIMIT 1
+    # ORDER BY RANDOM() 전체 정렬 대신 샘플러(메모리 풀 / PK Probe)로 id만 뽑고 PK로 조회
+    for _ in range(3):  # 풀에 있던 id가 그 사이 삭제된 경우 재시도
+        row_id = await random_sampler.pick()
+        if row_id is None:
+            return None
+        video = await fetch_one(RANDOM_VIDEO_BY_ID, {"id": row_id})
+        if video:
+            return video
+    return None
+
+def _build_embedding_text(item: dict) -> str:
+    """수집 영상 임베딩용 텍스트 (Title + Channel + Tags + Desc)"""
+    tags_str = ",".join(item.get('tags') or [])
+    return f"{item['title']} {item['channelTitle']} {tags_str} {(item.get('description') or '')[:300]}"
+
+async def _save_video_embeddings(results: dict):
+    """
+    임베딩 결과 일괄 저장 (EmbeddingPipeline on_flush 콜백)
+    이미 임베딩이 있는 영상은 덮어쓰지 않음 (비용 절약 정책 유지)
+    """
+    await bulk_update_embeddings("youtube_list", "video_id", results, only_missing=True)
+
+def _parse_published_at(item: dict):
+    # 날짜 파싱 (ISO 8601 -> datetime)
+    if not item.get('publishedAt'):
+        return None
+    try:
+        return datetime.fromisoformat(item['publishedAt'].replace('Z', '+00:00'))
+    except ValueError:
+        return datetime.now() # 파싱 실패 시 현재 시간
+
+async def bulk_upsert_videos(items: list, country: str) -> list[dict]:
+    """
+    인기 영상 1페이지(_parse_videos 결과)를 한 번에 저장 (Multi-row Upsert, 단일 트랜잭션)
+    - 신규: INSERT
+    - 기존: 조회수 갱신 + 비어있는 메타데이터만 보충 (기존 UPDATE 정책과 동일)
+    Returns: [{"video_id", "is_new", "needs_embedding"}, ...]
+    """
+    # 같은 페이지 내 중복 video_id 제거 (ON CONFLICT는 한 문장에서 같은 행을 두 번 갱신할 수 없음)
+    unique_items = {}
+    for item in items:
+        if item.get('id'):
+            unique_items[item['id']] = item
+    if not unique_items:
+        return []
+
+    values_sql = []
+    params = {"cc": country}
+    for i, item in enumerate(unique_items.values()):
+        values_sql.append(
+            f"(:vid_{i}, :title_{i}, :desc_{i}, :thumb_{i}, :ch_title_{i}, :ch_id_{i}, :tags_{i}, "
+            f":dur_{i}, :short_{i}, :views_{i}, :pub_{i}, :cc, :cat_{i}, :etag_{i}, NOW())"
+        )
+        params.update({
+            f"vid_{i}": item['id'],
+            f"title_{i}": item['title'],
+            f"desc_{i}": item['description'][:500] if item.get('description') else "", # 너무 길면 자름
+            f"thumb_{i}": item['thumbnail'],
+            f"ch_title_{i}": item['channelTitle'],
+            f"ch_id_{i}": item['channelId'],
+            f"tags_{i}": ",".join(item.get('tags') or []),
+            f"dur_{i}": str(item['duration']),
+            f"short_{i}": 1 if (item['duration'] and item['duration'] <= 60) else 0,
+            f"views_{i}": int(item['viewCount']) if item.get('viewCount') else 0,
+            f"pub_{i}": _parse_published_at(item),
+            f"cat_{i}": item.get('categoryId'),
+            f"etag_{i}": item.get('etag')
+        })
+
+    sql = f"""
+        INSERT INTO youtube_list 
+        (video_id, title, description, thumbnail_url, channel_title, channel_id, tags, duration, is_short, view_count, published_at, country_code, category_id, etag, created_at)
+        VALUES 
+        {", ".join(values_sql)}
+        ON CONFLICT (video_id) DO UPDATE SET
+            view_count = EXCLUDED.view_count,
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            thumbnail_url = EXCLUDED.thumbnail_url,
+            tags = COALESCE(NULLIF(youtube_list.tags, ''), EXCLUDED.tags),
+            duration = COALESCE(youtube_list.duration, EXCLUDED.duration),
+            is_short = COALESCE(youtube_list.is_short, EXCLUDED.is_short),
+            country_code = COALESCE(youtube_list.country_code, EXCLUDED.country_code),
+            category_id = COALESCE(youtube_list.category_id, EXCLUDED.category_id),
+            etag = COALESCE(EXCLUDED.etag, youtube_list.etag),
+            updated_at = NOW()
+        RETURNING video_id, (xmax::text = '0') AS is_new, (embedding IS NULL) AS needs_embedding
     """
-    return await fetch_one(sql)
+    return await insert_and_return_all(sql, params)
 
-async def collect_global_trends():
+async def _store_trend_page(items: list, country: str, pipeline: EmbeddingPipeline) -> int:
+    """
+    인기 영상 1페이지 저장 + 임베딩 필요한 영상은 파이프라인에 적재
+    Returns: 신규 저장 개수
+    """
+    rows = await bulk_upsert_videos(items, country)
+    items_by_id = {item['id']: item for item in items}
+
+    new_count = 0
+    for row in rows:
+        if row.get("is_new"):
+            new_count += 1
+        # 임베딩은 없는 경우에만 생성 (비용 절약)
+        if row.get("needs_embedding"):
+            await pipeline.add(row["video_id"], _build_embedding_text(items_by_id[row["video_id"]]))
+    return new_count
+
+# 글로벌 수집 대상 (국가 x 카테고리 = 샤드)
+TREND_COUNTRIES = ['KR', 'US', 'JP']
+# None(전체), 10(음악), 20(게임), 24(엔터), 17(스포츠), 25(뉴스)
+TREND_CATEGORIES = [None, '10', '20', '24']
+
+def trend_shards() -> list[tuple[str, str | None]]:
+    return [(country, category) for country in TREND_COUNTRIES for category in TREND_CATEGORIES]
+
+@job("youtube.collect_global_trends", concurrency=1, max_attempts=2)
+async def collect_global_trends(force: bool = False):
     """
     [CRON] 글로벌 인기 영상 대량 수집 (All-in-One 전략)
     KR, US, JP 등 주요 국가의 카테고리별 인기 영상을 긁어서 DB에 저장.
     Cost: API 호출 1회당 50개 영상 메타데이터(태그,길이,조회수) 획득 (가성비 최강)
+    증분 수집: 샤드별 체크포인트로 중단 지점부터 재개, 최근 수집한 샤드/안 바뀐 영상은 건너뜀 (crawler.py)
+    병렬 수집: 샤드를 동시에 실행하되 남은 쿼터 안에서만, 목록 변화가 빠른 샤드부터 (crawl_scheduler.py)
+    임베딩: EmbeddingPipeline으로 배치/동시 처리 후 일괄 저장 (샤드끼리 공유)
     """
-    target_countries = ['KR', 'US', 'JP']
-    # None(전체), 10(음악), 20(게임), 24(엔터), 17(스포츠), 25(뉴스)
-    target_categories = [None, '10', '20', '24'] 
-    
-    total_processed = 0
-    new_videos = 0
+    pipeline = EmbeddingPipeline(on_flush=_save_video_embeddings)
+    scheduler = CrawlScheduler()
     
     print(f"🌍 [Collector] Starting global trend collection...")
-    
-    for country in target_countries:
-        for category in target_categories:
-            next_page_token = None
-            
-            # 카테고리당 최대 4페이지 (약 200개) 스캔
-            for page in range(4):
-                with safe_execute(f"Collection Error ({country}-{category})"):
-                    res = get_popular_videos(
-                        max_results=50, 
-                        region_code=country, 
-                        category_id=category, 
-                        page_token=next_page_token
-                    )
-                    
-                    if "error" in res:
-                        print(f"❌ API Error ({country}-{category}): {res['error']}")
-                        break
-                        
-                    items = res.get("items", [])
-                    if not items: break
-                    
-                    for item in items:
-                        vid = item['id']
-                        
-                        # 이미 있는지 확인
-                        check_sql = "SELECT id FROM youtube_list WHERE video_id = :vid"
-                        existing = await fetch_one(check_sql, {"vid": vid})
-                        
-                        tags_str = ",".join(item.get('tags', [])) if item.get('tags') else ""
-                        duration = str(item['duration'])
-                        is_short = 1 if (item['duration'] and item['duration'] <= 60) else 0
-                        
-                        # 날짜 파싱 (ISO 8601 -> datetime)
-                        pub_dt = None
-                        if item.get('publishedAt'):
-                            try:
-                                pub_dt = datetime.fromisoformat(item['publishedAt'].replace('Z', '+00:00'))
-                            except ValueError:
-                                pub_dt = datetime.now() # 파싱 실패 시 현재 시간
-
-                        # 임베딩 생성 (Title + Channel + Tags + Desc)
-                        from client.openai_client import get_embedding_openai
-                        text_content = f"{item['title']} {item['channelTitle']} {tags_str} {item.get('description', '')[:300]}"
-                        embedding = await get_embedding_openai(text_content)
-                        embedding_str = str(embedding) if embedding else None
-
-                        if not existing:
-                            # 신규 저장
-                            insert_sql = """
-                                INSERT INTO youtube_list 
-                                (video_id, title, description, thumbnail_url, channel_title, channel_id, tags, duration, is_short, view_count, published_at, country_code, category_id, embedding, created_at)
-                                VALUES 
-                                (:vid, :title, :desc, :thumb, :ch_title, :ch_id, :tags, :dur, :short, :views, :pub, :cc, :cat, CAST(:embed AS vector), NOW())
-                            """
-                            await execute(insert_sql, {
-                                "vid": vid,
-                                "title": item['title'],
-                                "desc": item['description'][:500] if item.get('description') else "", # 너무 길면 자름
-                                "thumb": item['thumbnail'],
-                                "ch_title": item['channelTitle'],
-                                "ch_id": item['channelId'],
-                                "tags": tags_str,
-                                "dur": duration,
-                                "short": is_short,
-                                "views": int(item['viewCount']) if item['viewCount'] else 0,
-                                "pub": pub_dt,
-                                "cc": country,
-                                "cat": item.get('categoryId'),
-                                "embed": embedding_str
-                            })
-                            new_videos += 1
-                        else:
-                            # 업데이트 (국가 정보 등 갱신)
-                            # 임베딩은 이미 있으면 굳이 업데이트 안 함 (비용 절약) - 필요하면 COALESCE 사용
-                            update_sql = """
-                                UPDATE youtube_list 
-                                SET view_count = :views,
-                                    tags = COALESCE(NULLIF(tags, ''), :tags),
-                                    duration = COALESCE(duration, :dur),
-                                    is_short = COALESCE(is_short, :short),
-                                    country_code = COALESCE(country_code, :cc),
-                                    category_id = COALESCE(category_id, :cat),
-                                    embedding = COALESCE(embedding, CAST(:embed AS vector)) 
-                                WHERE video_id = :vid
-                            """
-                            await execute(update_sql, {
-                                "views": int(item['viewCount']) if item['viewCount'] else 0,
-                                "tags": tags_str,
-                                "dur": duration,
-                                "short": is_short,
-                                "vid": vid,
-                                "cc": country,
-                                "cat": item.get('categoryId'),
-                                "embed": embedding_str
-                            })
-                            
-                        total_processed += 1
-                        
-                    next_page_token = res.get("nextPageToken")
-                    if not next_page_token: break
-                    
-    print(f"🏁 [Collector] Finished. Scanned: {total_processed}, New: {new_videos}")
-    return {"status": "success", "processed": total_processed, "new": new_videos}
 
-async def collect_trend_one(country: str, category: str = None):
+    async def _on_progress(done: int, total: int, totals: dict):
+        await report_progress(done / total, f"{done}/{total} shards, scanned {totals['seen']}")
+
+    res = await scheduler.run(trend_shards(), force=force, pipeline=pipeline, on_progress=_on_progress)
+
+    # 남은 임베딩 마무리
+    with safe_execute("Embedding flush failed"):
+        await pipeline.flush()
+
+    totals = res["totals"]
+    statuses = {}
+    for shard in res["shards"]:
+        statuses[shard["status"]] = statuses.get(shard["status"], 0) + 1
+                    
+    print(f"🏁 [Collector] Finished in {res['elapsed_sec']}s. Scanned: {totals['seen']}, New: {totals['new']}, "
+          f"Updated: {totals['updated']}, Skipped: {totals['skipped']}, Shards: {statuses}, "
+          f"Embedded: {pipeline.embedded_count}, Quota left: {res['quota_remaining']}")
+    return {"status": "success", "processed": totals["seen"], **totals, "shards": statuses,
+            "embedded": pipeline.embedded_count, "quota_remaining": res["quota_remaining"]}
+
+@job("youtube.collect_trend_one", concurrency=4, max_attempts=3)
+async def collect_trend_one(country: str, category: str = None, force: bool = True):
     """
     [Admin] 특정 국가/카테고리만 콕 집어서 수집 (200개)
-    Cost: 약 4 Unit
+    Cost: 약 4 Unit (force=False면 최근 수집 샤드는 0)
     """
-    total_processed = 0
-    new_videos = 0
-    next_page_token = None
+    pipeline = EmbeddingPipeline(on_flush=_save_video_embeddings)
     
     # category가 'null' 문자열로 오면 None으로 변환
     if category == 'null' or category == 'undefined':
@@ -494,161 +515,70 @@ async def collect_trend_one(country: str, category: str = None):
         
     print(f"🎯 [Collector-One] Start {country} - {category}")
 
-    # 최대 4페이지 (약 200개) 스캔
-    for page in range(4):
-        with safe_execute(f"Collection Error ({country}-{category})"):
-            res = get_popular_videos(
-                max_results=50, 
-                region_code=country, 
-                category_id=category, 
-                page_token=next_page_token
-            )
-            
-            if "error" in res:
-                print(f"❌ API Error ({country}-{category}): {res['error']}")
-                break
-                
-            items = res.get("items", [])
-            if not items: break
-            
-            for item in items:
-                vid = item['id']
-                
-                # 이미 있는지 확인
-                check_sql = "SELECT id FROM youtube_list WHERE video_id = :vid"
-                existing = await fetch_one(check_sql, {"vid": vid})
-                
-                tags_str = ",".join(item.get('tags', [])) if item.get('tags') else ""
-                duration = str(item['duration'])
-                is_short = 1 if (item['duration'] and item['duration'] <= 60) else 0
-                
-                # 날짜 파싱 (ISO 8601 -> datetime)
-                pub_dt = None
-                if item.get('publishedAt'):
-                    try:
-                        pub_dt = datetime.fromisoformat(item['publishedAt'].replace('Z', '+00:00'))
-                    except ValueError:
-                        pub_dt = datetime.now()
-
-                    if not existing:
-                        # 임베딩 생성 (Title + Channel + Tags + Desc)
-                        from client.openai_client import get_embedding_openai
-                        text_content = f"{item['title']} {item['channelTitle']} {tags_str} {item.get('description', '')[:300]}"
-                        embedding = await get_embedding_openai(text_content)
-                        embedding_str = str(embedding) if embedding else None
-
-                        # 신규/업데이트 (Upsert) + 중복체크 로그
-                        upsert_sql = """
-                            INSERT INTO youtube_list 
-                            (video_id, title, description, thumbnail_url, channel_title, channel_id, tags, duration, is_short, view_count, published_at, country_code, category_id, embedding, created_at)
-                            VALUES 
-                            (:vid, :title, :desc, :thumb, :ch_title, :ch_id, :tags, :dur, :short, :views, :pub, :cc, :cat, CAST(:embed AS vector), NOW())
-                            ON CONFLICT (video_id) DO UPDATE SET
-                                view_count = EXCLUDED.view_count,
-                                title = EXCLUDED.title,
-                                description = EXCLUDED.description,
-                                thumbnail_url = EXCLUDED.thumbnail_url,
-                                embedding = COALESCE(youtube_list.embedding, EXCLUDED.embedding),
-                                updated_at = NOW()
-                            RETURNING (xmax::text = '0') as is_new
-                        """
-                        result = await insert_and_return(upsert_sql, {
-                            "vid": vid,
-                            "title": item['title'],
-                            "desc": item['description'][:500] if item.get('description') else "", 
-                            "thumb": item['thumbnail'],
-                            "ch_title": item['channelTitle'],
-                            "ch_id": item['channelId'],
-                            "tags": tags_str,
-                            "dur": duration,
-                            "short": is_short,
-                            "views": int(item['viewCount']) if item['viewCount'] else 0,
-                            "pub": pub_dt,
-                            "cc": country,
-                            "cat": item.get('categoryId'),
-                            "embed": embedding_str
-                        })
-                        
-                        if result and result.get('is_new'):
-                            new_videos += 1
-                        else:
-                            print(f"⚠️ [Duplicate] Video {vid} already exists. Updated info.")
-                else:
-                    # 업데이트 시에도 임베딩 없으면 추가
-                    embedding_str = None
-                    # 임베딩이 없는 경우에만 API 호출 (비용 절약)
-                    check_embed_sql = "SELECT embedding FROM youtube_list WHERE video_id = :vid"
-                    curr = await fetch_one(check_embed_sql, {"vid": vid})
-                    
-                    if not curr or not curr['embedding']:
-                         from client.openai_client import get_embedding_openai
-                         text_content = f"{item['title']} {item['channelTitle']} {tags_str} {item.get('description', '')[:300]}"
-                         embedding = await get_embedding_openai(text_content)
-                         embedding_str = str(embedding) if embedding else None
-
-                    update_sql = """
-                        UPDATE youtube_list 
-                        SET view_count = :views,
-                            tags = COALESCE(NULLIF(tags, ''), :tags),
-                            duration = COALESCE(duration, :dur),
-                            is_short = COALESCE(is_short, :short),
-                            country_code = COALESCE(country_code, :cc),
-                            category_id = COALESCE(category_id, :cat),
-                            embedding = COALESCE(embedding, CAST(:embed AS vector))
-                        WHERE video_id = :vid
-                    """
-                    await execute(update_sql, {
-                        "views": int(item['viewCount']) if item['viewCount'] else 0,
-                        "tags": tags_str,
-                        "dur": duration,
-                        "short": is_short,
-                        "vid": vid,
-                        "cc": country,
-                        "cat": item.get('categoryId'),
-                        "embed": embedding_str
-                    })
-                    
-                total_processed += 1
-                
-            next_page_token = res.get("nextPageToken")
-            if not next_page_token: break
-            
-    print(f"✅ [Collector-One] Finished. Scanned: {total_processed}, New: {new_videos}")
-    return {"status": "success", "processed": total_processed, "new": new_videos}
+    async def _on_page(pages_done: int, max_pages: int):
+        await report_progress(pages_done / max_pages, f"page {pages_done}/{max_pages}")
 
-async def get_random_video(seed: int = None):
-    # RANDOM() 대신 TABLESAMPLE이나 OFFSET 등을 쓸 수도 있지만 데이터 적을 땐 RANDOM() OK
-    sql = "SELECT * FROM youtube_list ORDER BY RANDOM() LIMIT 1"
-    return await fetch_one(sql)
+    res = await crawl_shard(country, category, force=force, pipeline=pipeline, on_page=_on_page)
 
-async def get_collected_videos(country: str = None, category: str = None, limit: int = 50, offset: int = 0, sort_by: str = "newest"):
+    with safe_execute("Embedding flush failed"):
+        await pipeline.flush()
+            
+    print(f"✅ [Collector-One] Finished ({res['status']}). Scanned: {res['seen']}, New: {res['new']}, "
+          f"Updated: {res['updated']}, Skipped: {res['skipped']}, Embedded: {pipeline.embedded_count}")
+    return {"status": "success", "processed": res["seen"], "shard": res, "embedded": pipeline.embedded_count}
+
+# 피드 정렬별 Keyset 정의 (표현식 인덱스: alembic c5a7e2d4f918)
+FEED_SORTS = {
+    "newest": KeysetSort("newest", f"COALESCE(l.published_at, {EPOCH_SQL})", "l.id", "sort_key", "datetime"),
+    "popular": KeysetSort("popular", "COALESCE(l.view_count, -1)", "l.id", "sort_key", "int"),
+}
+
+async def get_videos_feed(country: str = None, category: str = None, limit: int = 50, sort_by: str = "newest",
+                          cursor: str = None, offset: int = 0) -> dict:
     """
-    DB에 수집된 영상 목록 조회 (New UI용)
-    - sort_by: "newest" (최신순) | "popular" (조회수순)
-    - offset: 페이징 offset
+    DB에 수집된 영상 목록 조회 (New UI용, Keyset 페이지네이션)
+    - sort_by: "newest" (최신순) | "popular" (조회수순) | "random"
+    - cursor: 이전 응답의 next_cursor (없으면 첫 페이지). 형식 오류 시 ValueError
+    - offset: 하위 호환용 (cursor 사용 시 무시, random 정렬은 커서/offset 없음 - 매번 새 표본)
+    - 반환: {"videos": [...], "next_cursor": str | None, "sort_by": str}
     """
     where_clauses = []
-    params = {"limit": limit, "offset": offset}
+    params = {"limit": limit}
     
     # 1. 국가 필터
     if country:
-        where_clauses.append("country_code = :country")
+        where_clauses.append("l.country_code = :country")
         params["country"] = country
         
     # 2. 카테고리 필터
     if category:
-        where_clauses.append("category_id = :category")
+        where_clauses.append("l.category_id = :category")
         params["category"] = category
-        
-    where_str = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
     
     # 3. 정렬 결정
+    keyset = None
     if sort_by == "random":
-        order_clause = "ORDER BY RANDOM()"
-    elif sort_by == "popular":
-        order_clause = "ORDER BY view_count DESC NULLS LAST"
-    else: # newest
-        order_clause = "ORDER BY published_at DESC"
+        # 샘플러로 뽑은 id만 조회 (필터는 샘플링 단계에서 적용, 순서는 아래에서 복원)
+        sample_ids = await random_sampler.sample(country, category, limit)
+        where_clauses = ["l.id = ANY(:ids)"]
+        params = {"ids": sample_ids, "limit": limit}
+        order_clause = ""
+        offset = 0
+    else:
+        keyset = FEED_SORTS.get(sort_by, FEED_SORTS["newest"])
+        sort_by = keyset.name
+        order_clause = keyset.order_clause
+
+    # 4. 페이지 위치 (커서 우선)
+    if cursor and keyset:
+        where_clauses.append(keyset.where_clause(decode_cursor(cursor, keyset.name), params))
+        offset = 0
+    paging_clause = "LIMIT :limit"
+    if offset:
+        paging_clause += " OFFSET :offset"
+        params["offset"] = offset
+        
+    where_str = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
     
     sql = f"""
         SELECT 
@@ -663,75 +593,74 @@ async def get_collected_videos(country: str = None, category: str = None, limit:
             l.duration, 
             l.is_short as "isShort",
             l.tags,
-            c.thumbnail_url as "channelThumbnail"
+            c.thumbnail_url as "channelThumbnail",
+            l.id as row_id,
+            {keyset.expr if keyset else "NULL"} as sort_key
         FROM youtube_list l
         LEFT JOIN youtube_channels c ON l.channel_id = c.channel_id
         {where_str}
         {order_clause}
-        LIMIT :limit OFFSET :offset
+        {paging_clause}
     """
+
+    # 필터/정렬/페이지 방식 조합별 이름 붙은 Statement -> 반복 호출 시 Parse/Plan 생략
+    page_mode = "cursor" if "cursor_id" in params else ("offset" if offset else "first")
+    variant = f"{sort_by}:{'country' if country else '-'}:{'category' if category else '-'}:{page_mode}"
+    stmt = register_statement(f"youtube.collected_videos[{variant}]", sql)
     
-    rows = await fetch_all(sql, params)
-    return [dict(row) for row in rows]
+    rows = await fetch_all(stmt, params)
+    next_cursor = keyset.next_cursor(rows, limit, id_field="row_id") if keyset else None
+    if not keyset:
+        order = {row_id: i for i, row_id in enumerate(sample_ids)}
+        rows.sort(key=lambda row: order.get(row["row_id"], 0))
+
+    videos = []
+    for row in rows:
+        row.pop("row_id", None)
+        row.pop("sort_key", None)
+        videos.append(row)
+    return {"videos": videos, "next_cursor": next_cursor, "sort_by": sort_by}
+
+async def get_collected_videos(country: str = None, category: str = None, limit: int = 50, offset: int = 0, sort_by: str = "newest"):
+    """DB에 수집된 영상 목록 (리스트만 필요한 곳용, 첫 페이지/offset)"""
+    page = await get_videos_feed(country=country, category=category, limit=limit, sort_by=sort_by, offset=offset)
+    return page["videos"]
 
 async def add_channel(channel_id: str, name: str, keywords: str = None, category: str = None, thumbnail_url: str = None, description: str = None):
     """
     채널 DB 저장 (Upsert)
     - 이미 존재하면 키워드/이름/썸네일/설명 업데이트
     """
-    check_sql = "SELECT channel_id FROM youtube_channels WHERE channel_id = :cid"
-    exists = await fetch_one(check_sql, {"cid": channel_id})
-    
-    if exists:
-        # Update
-        update_sql = """
-            UPDATE youtube_channels
-            SET name = :name,
-                keywords = COALESCE(:processed_kw, keywords),
-                thumbnail_url = COALESCE(:thumb, thumbnail_url),
-                description = COALESCE(:desc, description),
-                category = COALESCE(category, :cat),
-                embedding = COALESCE(CAST(:embed AS vector), embedding), 
-                updated_at = NOW()
-            WHERE channel_id = :cid
-        """
-        
-        # 임베딩 생성 (Update시에도 정보가 바뀌면 갱신)
-        text_content = f"{name} {keywords or ''} {category or ''} {description or ''}"
-        from client.openai_client import get_embedding_openai
-        embedding = await get_embedding_openai(text_content)
-        embedding_str = str(embedding) if embedding else None
-
-        await execute(update_sql, {
-            "cid": channel_id, 
-            "name": name, 
-            "processed_kw": keywords,
-            "thumb": thumbnail_url,
-            "desc": description,
-            "cat": category,
-            "embed": embedding_str
-        })
-    else:
-        # Insert
-        text_content = f"{name} {keywords or ''} {category or ''} {description or ''}"
-        from client.openai_client import get_embedding_openai
-        embedding = await get_embedding_openai(text_content)
-        embedding_str = str(embedding) if embedding else None
-        
-        insert_sql = """
-            INSERT INTO youtube_channels (channel_id, name, keywords, category, thumbnail_url, description, embedding, created_at)
-            VALUES (:cid, :name, :kw, :cat, :thumb, :desc, CAST(:embed AS vector), NOW())
-        """
-        await execute(insert_sql, {
-            "cid": channel_id,
-            "name": name,
-            "kw": keywords,
-            "cat": category,
-            "thumb": thumbnail_url,
-            "desc": description,
-            "embed": embedding_str
-        })
+    # 임베딩 생성 (Update시에도 정보가 바뀌면 갱신)
+    text_content = f"{name} {keywords or ''} {category or ''} {description or ''}"
+    from client.openai_client import get_embedding_openai
+    embedding = await get_embedding_openai(text_content)
+
+    # 존재 확인 없이 한 문장으로 Upsert (복제본 지연으로 방금 저장한 채널을 못 보고 INSERT 충돌하는 일 방지)
+    upsert_sql = """
+        INSERT INTO youtube_channels (channel_id, name, keywords, category, thumbnail_url, description, embedding, created_at)
+        VALUES (:cid, :name, :kw, :cat, :thumb, :desc, CAST(:embed AS vector), NOW())
+        ON CONFLICT (channel_id) DO UPDATE SET
+            name = EXCLUDED.name,
+            keywords = COALESCE(EXCLUDED.keywords, youtube_channels.keywords),
+            thumbnail_url = COALESCE(EXCLUDED.thumbnail_url, youtube_channels.thumbnail_url),
+            description = COALESCE(EXCLUDED.description, youtube_channels.description),
+            category = COALESCE(youtube_channels.category, EXCLUDED.category),
+            embedding = COALESCE(EXCLUDED.embedding, youtube_channels.embedding)
+    """
+    await execute(upsert_sql, {
+        "cid": channel_id,
+        "name": name,
+        "kw": keywords,
+        "cat": category,
+        "thumb": thumbnail_url,
+        "desc": description,
+        "embed": to_vector_param(embedding)
+    })
 
 async def get_channel(channel_id: str):
-    sql = "SELECT * FROM youtube_channels WHERE channel_id = :cid"
+    sql = """
+        SELECT channel_id, name, keywords, category, thumbnail_url, description
+        FROM youtube_channels WHERE channel_id = :cid
+    """
     return await fetch_one(sql, {"cid": channel_id})
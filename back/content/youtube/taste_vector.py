@@ -0,0 +1,171 @@
+"""
+유저 취향 벡터 (user.taste_embedding)
+- 시청 영상 임베딩(시청 시간 가중) + 구독 채널 임베딩의 가중 평균을 유저 행에 저장
+- 시청/시청시간/구독 이벤트마다 증분 갱신: m' = (W·m + w·v) / (W + w), W' = W + w
+  (더하기만 증분, 구독 취소는 전체 재계산 -> 더한 적 없는 기여분을 빼지 않음)
+  -> 개인화 추천이 취향 벡터 기준 ANN 쿼리 1번으로 끝남
+- 가중치: 시청 1회 TASTE_VIEW_WEIGHT + 시청 분(TASTE_WATCH_CAP_SEC까지) / 구독 TASTE_SUBSCRIBE_WEIGHT
+"""
+import os
+import numpy as np
+from core.database import fetch_one, fetch_all, transaction
+from core.vector import to_vector_param
+from core.job_queue import job, report_progress
+
+TASTE_VIEW_WEIGHT = float(os.getenv("TASTE_VIEW_WEIGHT", "1.0"))             # 시청 시작 1회당 가중치
+TASTE_WATCH_CAP_SEC = int(os.getenv("TASTE_WATCH_CAP_SEC", "1800"))          # 영상 1개당 반영할 최대 시청 시간 (초)
+TASTE_SUBSCRIBE_WEIGHT = float(os.getenv("TASTE_SUBSCRIBE_WEIGHT", "5.0"))   # 채널 구독 1건당 가중치
+
+
+def watch_weight(watched_seconds: int) -> float:
+    """시청 시간 가중치 (분 단위, 긴 영상 하나가 취향을 독점하지 않도록 상한)"""
+    return min(max(watched_seconds or 0, 0), TASTE_WATCH_CAP_SEC) / 60.0
+
+
+async def apply_taste_delta(user_id: int, vector, weight: float) -> bool:
+    """
+    취향 벡터에 (vector, weight) 반영 (weight < 0 이면 기여분 제거)
+    - 유저 행 FOR UPDATE로 동시 갱신 직렬화
+    - 반환: 실제 갱신 여부
+    """
+    vector = to_vector_param(vector)
+    if vector is None or not weight:
+        return False
+
+    async with transaction() as tx:
+        row = await tx.fetch_one(
+            'SELECT taste_embedding, taste_weight FROM "user" WHERE id = :uid FOR UPDATE',
+            {"uid": user_id}
+        )
+        if not row:
+            return False
+
+        current = row["taste_embedding"]
+        total = float(row["taste_weight"] or 0)
+        if current is None or total <= 0:
+            if weight <= 0:
+                return False
+            new_vector, new_total = vector, weight
+        else:
+            new_total = total + weight
+            if new_total <= 0:
+                # 기여분이 전부 빠짐 -> 취향 없음 (다음 이벤트부터 새로 시작)
+                new_vector, new_total = None, 0.0
+            else:
+                new_vector = (np.asarray(current, dtype=np.float32) * total + vector * weight) / new_total
+
+        await tx.execute(
+            """
+            UPDATE "user"
+            SET taste_embedding = CAST(:tv AS vector),
+                taste_weight = :tw,
+                taste_updated_at = NOW()
+            WHERE id = :uid
+            """,
+            {"uid": user_id, "tv": to_vector_param(new_vector), "tw": new_total}
+        )
+    return True
+
+
+# ==========================================================
+#  이벤트별 증분 갱신
+# ==========================================================
+
+async def on_video_watch(user_id: int, video_id: str, weight: float) -> bool:
+    """시청 시작(weight=TASTE_VIEW_WEIGHT) / 시청 시간 변화(weight=분 차이) 반영"""
+    if not weight:
+        return False
+    row = await fetch_one(
+        "SELECT embedding FROM youtube_list WHERE video_id = :vid AND embedding IS NOT NULL",
+        {"vid": video_id}, use_primary=True
+    )
+    if not row:
+        return False  # 임베딩 전 영상은 재계산(rebuild_taste_vector) 때 반영
+    return await apply_taste_delta(user_id, row["embedding"], weight)
+
+
+async def on_channel_subscription(user_id: int, channel_id: str, subscribed: bool = True) -> bool:
+    """
+    구독(+) / 구독 취소 반영
+    - 구독 취소는 -w 증분 대신 전체 재계산: 기능 도입 전 구독이나 당시 임베딩 없던 채널은
+      더해진 적이 없어서, 빼면 취향이 반대로 밀리거나 (W <= w면) 통째로 지워짐
+    """
+    if not subscribed:
+        await rebuild_taste_vector(user_id)
+        return True
+    row = await fetch_one(
+        "SELECT embedding FROM youtube_channels WHERE channel_id = :cid AND embedding IS NOT NULL",
+        {"cid": channel_id}, use_primary=True
+    )
+    if not row:
+        return False
+    return await apply_taste_delta(user_id, row["embedding"], TASTE_SUBSCRIBE_WEIGHT)
+
+
+# ==========================================================
+#  전체 재계산 (증분 누적 오차 / 임베딩 늦게 생성된 영상 반영)
+# ==========================================================
+
+async def rebuild_taste_vector(user_id: int) -> dict:
+    """시청 기록 + 구독 채널 전체로 취향 벡터 재계산"""
+    watch_sql = """
+        SELECT yl.embedding, uyl.watched_seconds
+        FROM user_youtube_logs uyl
+        JOIN youtube_list yl ON yl.video_id = uyl.video_id
+        WHERE uyl.user_id = :uid AND yl.embedding IS NOT NULL
+    """
+    sub_sql = """
+        SELECT DISTINCT ON (yc.channel_id) yc.embedding
+        FROM user_logs ul
+        JOIN youtube_channels yc ON yc.channel_id = ul.content_id
+        WHERE ul.user_id = :uid
+          AND ul.content_type = 'youtube_channel'
+          AND ul.action = 'subscribe'
+          AND yc.embedding IS NOT NULL
+    """
+    watched = await fetch_all(watch_sql, {"uid": user_id}, use_primary=True)
+    subscribed = await fetch_all(sub_sql, {"uid": user_id}, use_primary=True)
+
+    vectors = [row["embedding"] for row in watched] + [row["embedding"] for row in subscribed]
+    weights = [TASTE_VIEW_WEIGHT + watch_weight(row["watched_seconds"]) for row in watched]
+    weights += [TASTE_SUBSCRIBE_WEIGHT] * len(subscribed)
+
+    total = float(sum(weights))
+    taste = None
+    if vectors and total > 0:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        taste = (matrix * np.asarray(weights, dtype=np.float32)[:, None]).sum(axis=0) / total
+
+    async with transaction() as tx:
+        await tx.execute(
+            """
+            UPDATE "user"
+            SET taste_embedding = CAST(:tv AS vector),
+                taste_weight = :tw,
+                taste_updated_at = NOW()
+            WHERE id = :uid
+            """,
+            {"uid": user_id, "tv": to_vector_param(taste), "tw": total if taste is not None else 0.0}
+        )
+    return {"user_id": user_id, "videos": len(watched), "channels": len(subscribed), "weight": round(total, 2)}
+
+
+@job("taste.rebuild_all", concurrency=1, max_attempts=2)
+async def rebuild_all_taste_vectors() -> dict:
+    """활성 유저 전체 재계산 (Admin -> 작업 큐)"""
+    users = await fetch_all('SELECT id FROM "user" WHERE is_active = true ORDER BY id', use_primary=True)
+    rebuilt = 0
+    for done, user in enumerate(users, start=1):
+        try:
+            await rebuild_taste_vector(user["id"])
+            rebuilt += 1
+        except Exception as e:
+            print(f"⚠️ [Taste] Rebuild failed for user {user['id']}: {e}")
+        await report_progress(done / len(users), f"{done}/{len(users)} users")
+    print(f"🧭 [Taste] Rebuilt {rebuilt}/{len(users)} taste vectors")
+    return {"total": len(users), "rebuilt": rebuilt}
+
+
+async def get_taste_vector(user_id: int) -> np.ndarray | None:
+    row = await fetch_one('SELECT taste_embedding FROM "user" WHERE id = :uid', {"uid": user_id})
+    return row["taste_embedding"] if row else None
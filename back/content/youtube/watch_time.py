@@ -0,0 +1,121 @@
+"""
+시청 시간 Write-Behind 버퍼 (/log/time)
+- 재생 중 몇 초마다 오는 시청 시간 보고를 (user_id, log_id)별 최신값 하나로 합침 (메모리만 갱신)
+- UPDATE는 로그 주인(user_id)이 일치하는 행만 반영 -> 남의 log_id로 시청 시간/취향 벡터를 건드릴 수 없음
+- WATCH_TIME_FLUSH_INTERVAL 초마다 UPDATE ... FROM (VALUES) 한 문장으로 반영, 종료 시 마지막 flush
+- 유실 범위 = flush 지연 (snapshot의 oldest_pending_sec / last_flush_ago_sec 로 확인)
+"""
+import os
+import time
+from core.database import insert_and_return_all
+from utils.periodic import PeriodicTask
+from utils.safe_ops import safe_execute
+
+WATCH_TIME_FLUSH_INTERVAL = float(os.getenv("WATCH_TIME_FLUSH_INTERVAL", "5"))   # DB 반영 주기 (초)
+WATCH_TIME_FLUSH_CHUNK = int(os.getenv("WATCH_TIME_FLUSH_CHUNK", "1000"))        # UPDATE 1회당 로그 수
+
+
+class WatchTimeBuffer:
+    def __init__(self, interval: float = WATCH_TIME_FLUSH_INTERVAL):
+        self.pending: dict[tuple[int, int], tuple[int, float]] = {}  # (user_id, log_id) -> (최신 시청 시간, 처음 버퍼에 들어온 시각)
+        self.stats = {"recorded": 0, "rejected": 0, "flushed": 0, "flushes": 0, "failures": 0}
+        self.last_flush_at = time.monotonic()
+        self.last_flush_ms = 0.0
+        self.task = PeriodicTask("WatchTimeBuffer", interval, self.flush)
+
+    def record(self, user_id: int, log_id: int, watched: int) -> bool:
+        """시청 시간 기록 (같은 로그는 최신값으로 덮어씀, DB 쓰기 없음). 음수면 버리고 False"""
+        if watched is None or watched < 0:
+            self.stats["rejected"] += 1
+            return False
+        key = (user_id, log_id)
+        entry = self.pending.get(key)
+        first_at = entry[1] if entry else time.monotonic()
+        self.pending[key] = (watched, first_at)
+        self.stats["recorded"] += 1
+        return True
+
+    async def flush(self) -> int:
+        """모인 시청 시간을 일괄 UPDATE. 반영한 로그 수 반환"""
+        if not self.pending:
+            self.last_flush_at = time.monotonic()
+            return 0
+
+        started = time.monotonic()
+        batch, self.pending = self.pending, {}
+        items = list(batch.items())
+        flushed = 0
+        try:
+            for start in range(0, len(items), WATCH_TIME_FLUSH_CHUNK):
+                chunk = items[start:start + WATCH_TIME_FLUSH_CHUNK]
+                values = []
+                params = {}
+                for i, ((user_id, log_id), (watched, _)) in enumerate(chunk):
+                    values.append(f"(CAST(:l_{i} AS INTEGER), CAST(:u_{i} AS INTEGER), CAST(:w_{i} AS INTEGER))")
+                    params[f"l_{i}"] = log_id
+                    params[f"u_{i}"] = user_id
+                    params[f"w_{i}"] = watched
+
+                # 이전 값을 같이 돌려받아 취향 벡터에 시청 시간 차이만 반영
+                # 시청 시간은 최대값만 유지 (다시 보기로 0부터 보고돼도 줄지 않음 -> 반영된 적 없는 분을 빼지 않음)
+                sql = f"""
+                    WITH v(id, user_id, watched) AS (VALUES {", ".join(values)}),
+                    prev AS (
+                        SELECT l.id, l.watched_seconds
+                        FROM user_youtube_logs l JOIN v ON v.id = l.id AND l.user_id = v.user_id
+                        FOR UPDATE OF l
+                    )
+                    UPDATE user_youtube_logs AS l
+                    SET watched_seconds = GREATEST(prev.watched_seconds, v.watched),
+                        updated_at = NOW()
+                    FROM v JOIN prev ON prev.id = v.id
+                    WHERE l.id = v.id AND l.user_id = v.user_id
+                    RETURNING l.user_id, l.video_id, prev.watched_seconds AS prev_watched, l.watched_seconds AS watched
+                """
+                changed = await insert_and_return_all(sql, params)
+                flushed += len(chunk)
+                # 커밋된 청크는 바로 취향 반영 (뒤 청크가 실패해 재시도돼도 차이가 사라지지 않도록)
+                await self._apply_taste(changed)
+        except BaseException:
+            # 실패/취소 시 아직 반영 안 된 청크만 다음 주기에 재시도 (그 사이 들어온 더 최신 값은 유지)
+            self.stats["failures"] += 1
+            for key, entry in items[flushed:]:
+                self.pending.setdefault(key, entry)
+            self.stats["flushed"] += flushed
+            raise
+
+        self.stats["flushed"] += flushed
+        self.stats["flushes"] += 1
+        self.last_flush_at = time.monotonic()
+        self.last_flush_ms = round((self.last_flush_at - started) * 1000, 1)
+        return flushed
+
+    async def _apply_taste(self, rows: list[dict]):
+        from content.youtube.taste_vector import on_video_watch, watch_weight
+        for row in rows:
+            delta = watch_weight(row["watched"]) - watch_weight(row["prev_watched"])
+            if delta > 0:  # 증가분만 (감소분은 더해진 적이 있는지 알 수 없음)
+                with safe_execute(f"Taste update failed for user {row['user_id']}"):
+                    await on_video_watch(row["user_id"], row["video_id"], delta)
+
+    def start(self):
+        self.task.start()
+
+    async def stop(self):
+        """루프 종료 + 남은 기록 마지막 flush"""
+        await self.task.stop()
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        oldest = min((first_at for _, first_at in self.pending.values()), default=None)
+        return {
+            **self.stats,
+            "pending": len(self.pending),
+            "oldest_pending_sec": round(now - oldest, 2) if oldest is not None else 0.0,  # 지금 죽으면 잃는 최대 구간
+            "last_flush_ago_sec": round(now - self.last_flush_at, 2),
+            "last_flush_ms": self.last_flush_ms,
+            "interval_sec": self.task.interval
+        }
+
+
+watch_time_buffer = WatchTimeBuffer()
@@ -1,6 +1,14 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import text
+from sqlalchemy import text, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from pgvector.asyncpg import register_vector
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from collections import deque
+from functools import lru_cache
+import asyncio
+import time
 import os
 from dotenv import load_dotenv
 
@@ -21,79 +29,416 @@ DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5433")
 DB_NAME = os.getenv("DB_NAME", "aisogething")
 
-# 비동기 드라이버 (postgresql+asyncpg)
-SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# 커넥션별 Prepared Statement 캐시 크기 (SQLAlchemy asyncpg 드라이버, 기본 100)
+# 같은 SQL 문자열은 두 번째 실행부터 Parse/Plan 생략
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "500"))
+
+# 커넥션 풀 설정
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))                  # 상시 유지 커넥션 수
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))           # 피크 시 추가 허용 수
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))         # 커넥션 대기 최대 시간 (초)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))         # 이 시간(초)보다 오래된 커넥션은 재연결
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"  # 체크아웃 시 끊긴 커넥션 감지
+
+# 읽기 전용 복제본 (설정 안 하면 Primary 하나로 동작)
+DB_READ_HOST = os.getenv("DB_READ_HOST", "")
+DB_READ_PORT = os.getenv("DB_READ_PORT", DB_PORT)
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(DB_POOL_SIZE)))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", str(DB_MAX_OVERFLOW)))
+
+def _database_url(host: str, port: str) -> str:
+    # 비동기 드라이버 (postgresql+asyncpg)
+    return (
+        f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{host}:{port}/{DB_NAME}"
+        f"?prepared_statement_cache_size={DB_PREPARED_STATEMENT_CACHE_SIZE}"
+    )
+
+SQLALCHEMY_DATABASE_URL = _database_url(DB_HOST, DB_PORT)
 
 # 디버깅: 연결 정보 출력 (비밀번호 제외)
-print(f"🔌 DB 연결 정보: {DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
-
-# Async 엔진 생성
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_size=5,
-    max_overflow=10,
-    echo=False  # 쿼리 로그 볼거면 True
-)
+print(f"🔌 DB 연결 정보: {DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME} (pool={DB_POOL_SIZE}+{DB_MAX_OVERFLOW})")
+
+def _create_engine(url: str, pool_size: int, max_overflow: int):
+    return create_async_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        echo=False  # 쿼리 로그 볼거면 True
+    )
+
+# Async 엔진 생성 (Primary: 쓰기 + 트랜잭션)
+engine = _create_engine(SQLALCHEMY_DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW)
+
+# 읽기 엔진 (fetch_one / fetch_all 기본 경로. 복제본 없으면 Primary와 동일 객체)
+if DB_READ_HOST:
+    print(f"🔌 DB 읽기 복제본: {DB_USER}@{DB_READ_HOST}:{DB_READ_PORT}/{DB_NAME} (pool={DB_READ_POOL_SIZE}+{DB_READ_MAX_OVERFLOW})")
+    read_engine = _create_engine(_database_url(DB_READ_HOST, DB_READ_PORT), DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW)
+else:
+    read_engine = engine
+
+
+def _register_vector_codec(dbapi_connection, connection_record):
+    """
+    새 커넥션마다 pgvector 바이너리 코덱 등록
+    - 바인딩: list / numpy 배열을 텍스트 변환 없이 바이너리로 전송
+    - 조회: vector 컬럼이 numpy.ndarray(float32)로 반환됨
+    """
+    try:
+        dbapi_connection.run_async(register_vector)
+    except Exception as e:
+        # vector 확장이 아직 없는 DB (마이그레이션 전)에서도 앱은 기동되도록
+        print(f"⚠️ pgvector 코덱 등록 실패 (vector 확장 확인 필요): {e}")
+
+for _engine in {engine, read_engine}:
+    event.listen(_engine.sync_engine, "connect", _register_vector_codec)
+
+
+# ==========================================================
+#  커넥션 획득 (풀 대기 시간 측정)
+# ==========================================================
+
+class PoolMetrics:
+    """엔진별 커넥션 획득 대기 시간 (풀 크기 산정용)"""
+    def __init__(self, name: str, target, window: int = 1000):
+        self.name = name
+        self.engine = target
+        self.waits = deque(maxlen=window)  # 최근 대기 시간 (ms)
+        self.acquired = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.timeouts = 0
+
+    def record(self, wait_ms: float):
+        self.acquired += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.waits.append(wait_ms)
+
+    def snapshot(self) -> dict:
+        pool = self.engine.sync_engine.pool
+        ordered = sorted(self.waits)
+        pick = lambda pct: round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 2) if ordered else 0.0
+        return {
+            "engine": self.name,
+            "pool": {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow()
+            },
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait_ms / self.acquired, 2) if self.acquired else 0.0,
+            "p50_wait_ms": pick(0.5),
+            "p95_wait_ms": pick(0.95),
+            "p99_wait_ms": pick(0.99),
+            "max_wait_ms": round(self.max_wait_ms, 2)
+        }
+
+_pool_metrics = {id(engine): PoolMetrics("primary", engine)}
+if read_engine is not engine:
+    _pool_metrics[id(read_engine)] = PoolMetrics("replica", read_engine)
+
+def get_pool_stats() -> list[dict]:
+    return [metrics.snapshot() for metrics in _pool_metrics.values()]
+
+@asynccontextmanager
+async def connection(begin: bool = True, readonly: bool = False):
+    """
+    풀에서 커넥션 획득 (대기 시간 기록)
+    - begin=True: 트랜잭션 (정상 종료 시 Commit) / False: 단순 조회용
+    - readonly=True: 읽기 엔진(복제본) 사용
+    """
+    target = read_engine if readonly else engine
+    metrics = _pool_metrics[id(target)]
+    acquired = False
+    started = time.perf_counter()
+    try:
+        async with (target.begin() if begin else target.connect()) as conn:
+            acquired = True
+            metrics.record((time.perf_counter() - started) * 1000)
+            yield conn
+    except PoolTimeoutError:
+        # pool_timeout 동안 커넥션을 못 얻은 경우 (풀 크기 부족 신호)
+        if not acquired:
+            metrics.timeouts += 1
+        raise
 
 # Base 선언 (마이그레이션용)
 Base = declarative_base()
 
 
+# ==========================================================
+#  [Statement Registry] 이름 붙은 SQL (1회 컴파일) + 실행 시간 통계
+# ==========================================================
+
+SQL_TEXT_CACHE_SIZE = int(os.getenv("SQL_TEXT_CACHE_SIZE", "512"))   # 문자열 쿼리 text() 컴파일 캐시 크기
+
+class Statement:
+    """
+    이름 붙은 SQL 문 (모듈 import 시 1회 text() 컴파일)
+    - 헬퍼에 문자열 대신 넘기면 같은 TextClause를 재사용 -> SQLAlchemy 컴파일 캐시 + asyncpg Prepared Statement 캐시 적중
+    - 실행 횟수 / 누적 / 최대 시간 기록 (Admin 통계)
+    사용법:
+        GET_USER = register_statement("user.get_by_email", 'SELECT * FROM "user" WHERE email = :email')
+        await fetch_one(GET_USER, {"email": email})
+    """
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.clause = text(sql)
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, failed: bool = False):
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if failed:
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 2),
+            "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 2)
+        }
+
+_statements: dict[str, Statement] = {}
+_adhoc = Statement("<adhoc>", "SELECT 1")  # 이름 없는 문자열 쿼리 합산 통계
+
+def register_statement(name: str, sql: str) -> Statement:
+    """이름으로 Statement 등록 (같은 이름 + 같은 SQL이면 기존 객체 반환)"""
+    stmt = _statements.get(name)
+    if stmt is None or stmt.sql != sql:
+        stmt = Statement(name, sql)
+        _statements[name] = stmt
+    return stmt
+
+def get_statement_stats(limit: int = 50) -> list[dict]:
+    """누적 실행 시간 상위 Statement 통계"""
+    stats = sorted([*_statements.values(), _adhoc], key=lambda s: s.total_ms, reverse=True)
+    return [stmt.snapshot() for stmt in stats[:limit] if stmt.calls]
+
+def reset_statement_stats():
+    for stmt in [*_statements.values(), _adhoc]:
+        stmt.calls = stmt.errors = 0
+        stmt.total_ms = stmt.max_ms = 0.0
+
+@lru_cache(maxsize=SQL_TEXT_CACHE_SIZE)
+def _compile(sql: str):
+    # 문자열 쿼리도 매 호출 text() 파싱하지 않도록 캐시
+    return text(sql)
+
+async def _run(conn, query: str | Statement, params):
+    """모든 헬퍼의 공통 실행 경로 (컴파일 캐시 + 시간 기록)"""
+    if isinstance(query, Statement):
+        stmt, clause = query, query.clause
+    else:
+        stmt, clause = _adhoc, _compile(query)
+    started = time.perf_counter()
+    failed = True
+    try:
+        result = await conn.execute(clause, params)
+        failed = False
+        return result
+    finally:
+        stmt.record((time.perf_counter() - started) * 1000, failed)
+
+
+# ==========================================================
+#  [Unit of Work] 트랜잭션 공유 (커넥션 1개로 여러 쿼리 + 원자성)
+# ==========================================================
+
+class Transaction:
+    """
+    하나의 커넥션/트랜잭션 위에서 동작하는 헬퍼 묶음 (모듈 헬퍼와 동일 API)
+    - asyncpg 커넥션은 동시 쿼리 불가 -> gather 등으로 동시에 불려도 Lock으로 직렬화
+    """
+    def __init__(self, conn):
+        self.conn = conn
+        self.closed = False
+        self._lock = asyncio.Lock()
+
+    async def _run(self, query: str | Statement, params):
+        async with self._lock:
+            return await _run(self.conn, query, params)
+
+    async def execute(self, query: str | Statement, params: dict = None):
+        return await self._run(query, params or {})
+
+    async def execute_many(self, query: str | Statement, params_list: list[dict]):
+        if not params_list:
+            return None
+        return await self._run(query, params_list)
+
+    async def fetch_one(self, query: str | Statement, params: dict = None) -> dict | None:
+        result = await self._run(query, params or {})
+        row = result.mappings().first()
+        return dict(row) if row else None
+
+    async def fetch_all(self, query: str | Statement, params: dict = None) -> list[dict]:
+        result = await self._run(query, params or {})
+        return [dict(row) for row in result.mappings().all()]
+
+    async def insert_and_return(self, query: str | Statement, params: dict = None) -> dict | None:
+        return await self.fetch_one(query, params)
+
+    async def insert_and_return_all(self, query: str | Statement, params: dict = None) -> list[dict]:
+        return await self.fetch_all(query, params)
+
+
+# 현재 Task(요청)에서 진행 중인 트랜잭션
+_current_tx: ContextVar[Transaction | None] = ContextVar("db_transaction", default=None)
+
+def _ambient_tx() -> Transaction | None:
+    tx = _current_tx.get()
+    # 트랜잭션 안에서 띄운 백그라운드 Task가 종료된 트랜잭션을 물고 있지 않도록
+    return tx if tx is not None and not tx.closed else None
+
+@asynccontextmanager
+async def transaction():
+    """
+    Unit of Work (비동기)
+    사용법:
+        async with transaction() as tx:
+            row = await tx.fetch_one(...)
+            await execute(...)   # 모듈 헬퍼도 자동으로 같은 트랜잭션에 참여
+    - 블록 정상 종료 시 Commit, 예외 시 Rollback
+    - 중첩 호출 시 SAVEPOINT (안쪽 블록만 Rollback)
+    - 블록 안에서 외부 API 호출 등 오래 걸리는 작업 금지 (커넥션 점유)
+    """
+    outer = _ambient_tx()
+    if outer is not None:
+        async with outer.conn.begin_nested():
+            yield outer
+        return
+
+    try:
+        async with connection() as conn:
+            tx = Transaction(conn)
+            token = _current_tx.set(tx)
+            try:
+                yield tx
+            finally:
+                tx.closed = True
+                _current_tx.reset(token)
+    except Exception as e:
+        print(f"❌ transaction 실패 (Rollback): {e}")
+        raise e
+
+
 # ==========================================================
 #  [핵심] Async Raw SQL 실행 래퍼 함수
+#  - transaction() 블록 안에서 호출되면 해당 트랜잭션에 자동 참여
 # ==========================================================
 
-async def execute(query: str, params: dict = None):
+async def execute(query: str | Statement, params: dict = None):
     """
     INSERT, UPDATE, DELETE 쿼리 실행 (비동기)
     """
+    tx = _ambient_tx()
+    if tx is not None:
+        return await tx.execute(query, params)
     try:
-        async with engine.begin() as conn:  # 비동기 트랜잭션 (성공 시 자동 Commit)
-            result = await conn.execute(text(query), params or {})
+        async with connection() as conn:  # 비동기 트랜잭션 (성공 시 자동 Commit)
+            result = await _run(conn, query, params or {})
             return result
     except Exception as e:
         print(f"❌ execute 실패: {e}")
         raise e
 
-async def fetch_one(query: str, params: dict = None) -> dict | None:
+async def execute_many(query: str | Statement, params_list: list[dict]):
+    """
+    동일한 쿼리를 여러 파라미터로 일괄 실행 (비동기, 단일 트랜잭션 - executemany)
+    """
+    if not params_list:
+        return None
+    tx = _ambient_tx()
+    if tx is not None:
+        return await tx.execute_many(query, params_list)
+    try:
+        async with connection() as conn:
+            result = await _run(conn, query, params_list)
+            return result
+    except Exception as e:
+        print(f"❌ execute_many 실패: {e}")
+        raise e
+
+async def fetch_one(query: str | Statement, params: dict = None, use_primary: bool = False) -> dict | None:
     """
     SELECT 단건 조회 (비동기, Dict 반환)
+    - 기본은 읽기 엔진(복제본). 방금 쓴 데이터를 읽어야 하면 use_primary=True
     """
+    tx = _ambient_tx()
+    if tx is not None:
+        return await tx.fetch_one(query, params)
     try:
-        async with engine.connect() as conn:
-            result = await conn.execute(text(query), params or {})
+        async with connection(begin=False, readonly=not use_primary) as conn:
+            result = await _run(conn, query, params or {})
             row = result.mappings().first()
             return dict(row) if row else None
     except Exception as e:
         print(f"❌ fetch_one 실패: {e}")
         raise e
 
-async def fetch_all(query: str, params: dict = None) -> list[dict]:
+async def fetch_all(query: str | Statement, params: dict = None, use_primary: bool = False) -> list[dict]:
     """
     SELECT 다건 조회 (비동기, List[Dict] 반환)
+    - 기본은 읽기 엔진(복제본). 방금 쓴 데이터를 읽어야 하면 use_primary=True
     """
+    tx = _ambient_tx()
+    if tx is not None:
+        return await tx.fetch_all(query, params)
     try:
-        async with engine.connect() as conn:
-            result = await conn.execute(text(query), params or {})
+        async with connection(begin=False, readonly=not use_primary) as conn:
+            result = await _run(conn, query, params or {})
             rows = result.mappings().all()
             return [dict(row) for row in rows]
     except Exception as e:
         print(f"❌ fetch_all 실패: {e}")
         raise e
 
-async def insert_and_return(query: str, params: dict = None) -> dict | None:
+async def insert_and_return(query: str | Statement, params: dict = None) -> dict | None:
     """
     INSERT/UPDATE 후 결과 반환 (비동기, Transaction Commit 포함)
     """
+    tx = _ambient_tx()
+    if tx is not None:
+        return await tx.insert_and_return(query, params)
     try:
-        async with engine.begin() as conn:
-            result = await conn.execute(text(query), params or {})
+        async with connection() as conn:
+            result = await _run(conn, query, params or {})
             row = result.mappings().first()
             return dict(row) if row else None
     except Exception as e:
         print(f"❌ insert_and_return 실패: {e}")
         raise e
 
+async def insert_and_return_all(query: str | Statement, params: dict = None) -> list[dict]:
+    """
+    다건 INSERT/UPDATE ... RETURNING 결과 전체 반환 (비동기, Transaction Commit 포함)
+    """
+    tx = _ambient_tx()
+    if tx is not None:
+        return await tx.insert_and_return_all(query, params)
+    try:
+        async with connection() as conn:
+            result = await _run(conn, query, params or {})
+            rows = result.mappings().all()
+            return [dict(row) for row in rows]
+    except Exception as e:
+        print(f"❌ insert_and_return_all 실패: {e}")
+        raise e
+
 # ==========================================================
 #  [Legacy] 의존성 주입용 (비동기 세션으로 변경 필요 시 사용)
 # ==========================================================
@@ -116,5 +461,6 @@ async def get_db():
 # 모델 Import
 # 모델 Import (content 도메인 분리 반영)
 from user.models import User
-from content.youtube.models import Comment, UserLog, YoutubeList
+from content.youtube.models import Comment, UserLog, YoutubeList, CrawlCheckpoint
 from content.novel.models import Novel, NovelCut
+from core.models import QueryEmbeddingCache, Job
@@ -0,0 +1,160 @@
+"""
+검색어 임베딩 캐시 (LRU + TTL, 선택적 Postgres 영구 캐시)
+- 스마트 검색 / 챗봇 RAG에서 같은 질의를 반복 임베딩하지 않도록 함 (~200ms OpenAI 왕복 절감)
+- 키: 정규화된 텍스트 + 모델명
+- 값: float32 배열 (pgvector 바이너리 바인딩에 그대로 사용, 리스트 대비 메모리 절감)
+"""
+import os
+import time
+import asyncio
+import hashlib
+import unicodedata
+import numpy as np
+from collections import OrderedDict
+from core.database import execute, fetch_one
+from core.vector import to_vector_param
+from client.openai_client import get_embedding_openai, EMBEDDING_MODEL
+from utils.safe_ops import safe_execute
+
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))              # 메모리 보관 개수 (LRU)
+EMBED_CACHE_TTL = int(os.getenv("EMBED_CACHE_TTL", str(60 * 60 * 24)))    # 유효 시간 (초)
+EMBED_CACHE_PERSIST = os.getenv("EMBED_CACHE_PERSIST", "false").lower() == "true"  # Postgres 영구 캐시 사용 여부
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 정규화 (유니코드 NFC + 소문자 + 공백 정리)"""
+    text = unicodedata.normalize("NFC", text or "")
+    return " ".join(text.lower().split())
+
+
+def _cache_key(normalized: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    프로세스 내 LRU + TTL 캐시
+    - 동일 질의가 동시에 들어오면 OpenAI 호출은 1번만 (Single-flight)
+    - 메모리 미스 시 (옵션) Postgres query_embedding_cache 테이블 조회
+    """
+    def __init__(self, max_size: int = EMBED_CACHE_SIZE, ttl: int = EMBED_CACHE_TTL, persist: bool = EMBED_CACHE_PERSIST):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.persist = persist
+        self.entries: OrderedDict[str, tuple[np.ndarray, float]] = OrderedDict()  # key -> (vector, expires_at)
+        self.inflight: dict[str, asyncio.Future] = {}
+        self.stats = {"hit": 0, "persist_hit": 0, "miss": 0, "coalesced": 0}
+
+    def _get_memory(self, key: str):
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        vector, expires_at = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return vector
+
+    def _put_memory(self, key: str, vector: np.ndarray):
+        self.entries[key] = (vector, time.monotonic() + self.ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    async def _get_persistent(self, key: str):
+        sql = """
+            SELECT embedding
+            FROM query_embedding_cache
+            WHERE cache_key = :key
+              AND created_at > NOW() - make_interval(secs => :ttl)
+        """
+        row = await fetch_one(sql, {"key": key, "ttl": self.ttl})
+        return row["embedding"] if row else None
+
+    async def _put_persistent(self, key: str, normalized: str, model: str, vector: np.ndarray):
+        sql = """
+            INSERT INTO query_embedding_cache (cache_key, model, query_text, embedding, created_at)
+            VALUES (:key, :model, :query, CAST(:embed AS vector), NOW())
+            ON CONFLICT (cache_key) DO UPDATE SET
+                embedding = EXCLUDED.embedding,
+                created_at = NOW()
+        """
+        await execute(sql, {"key": key, "model": model, "query": normalized[:1000], "embed": vector})
+
+    async def _load(self, key: str, normalized: str, model: str) -> np.ndarray:
+        # 1. 영구 캐시 (옵션)
+        if self.persist:
+            vector = None
+            with safe_execute("Embedding cache read failed"):
+                vector = await self._get_persistent(key)
+            if vector is not None:
+                self.stats["persist_hit"] += 1
+                self._put_memory(key, vector)
+                return vector
+
+        # 2. OpenAI 호출
+        self.stats["miss"] += 1
+        vector = to_vector_param(await get_embedding_openai(normalized))
+
+        # API 실패(0 벡터)는 캐싱하지 않음
+        if vector is not None and vector.any():
+            self._put_memory(key, vector)
+            if self.persist:
+                with safe_execute("Embedding cache write failed"):
+                    await self._put_persistent(key, normalized, model, vector)
+        return vector
+
+    async def get(self, text: str, model: str = EMBEDDING_MODEL) -> np.ndarray:
+        normalized = normalize_query(text)
+        key = _cache_key(normalized, model)
+
+        vector = self._get_memory(key)
+        if vector is not None:
+            self.stats["hit"] += 1
+            return vector
+
+        # 같은 질의를 이미 계산 중이면 결과를 기다렸다가 공유
+        if key in self.inflight:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(self.inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            vector = await self._load(key, normalized, model)
+            future.set_result(vector)
+            return vector
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self.inflight[key]
+            if not future.done():
+                # 요청 취소 등으로 결과 없이 빠져나간 경우 대기자도 함께 해제
+                future.cancel()
+            elif not future.cancelled():
+                # 대기자가 없을 때 "exception never retrieved" 경고 방지
+                future.exception()
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hit"] + self.stats["persist_hit"] + self.stats["miss"] + self.stats["coalesced"]
+        saved = lookups - self.stats["miss"]
+        return {
+            **self.stats,
+            "size": len(self.entries),
+            "persist": self.persist,
+            "saved_ratio": round(saved / lookups, 3) if lookups else 0.0
+        }
+
+
+embedding_cache = EmbeddingCache()
+
+
+async def get_query_embedding(text: str) -> np.ndarray:
+    """검색어 임베딩 (캐시 우선). 검색/RAG 질의에는 get_embedding_openai 대신 이 함수 사용"""
+    return await embedding_cache.get(text)
+
+
+def get_embedding_cache_stats() -> dict:
+    return embedding_cache.snapshot()
@@ -0,0 +1,414 @@
+"""
+Postgres 기반 백그라운드 작업 큐 (jobs 테이블)
+- API 프로세스는 enqueue_job()으로 행만 넣고 즉시 반환 -> 무거운 작업은 별도 워커 프로세스(back/worker.py)에서 실행
+- 워커는 SELECT ... FOR UPDATE SKIP LOCKED로 작업을 가져감 -> 워커를 여러 대 띄워도 중복 실행 없음 (수평 확장)
+- 작업 종류별 동시 실행 수 / 재시도(지수 백오프) / 진행률 / 하트비트(죽은 워커의 작업 재대기)
+사용법:
+    @job("youtube.collect_trend_one", concurrency=4)
+    async def collect_trend_one(country, category=None): ...
+
+    job_id = await enqueue_job("youtube.collect_trend_one", {"country": "KR"})
+    await report_progress(0.5, "2/4 pages")   # 작업 함수 안에서 (워커 밖에서는 무시됨)
+"""
+import os
+import json
+import time
+import socket
+import random
+import asyncio
+import importlib
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from core.database import execute, fetch_one, fetch_all, insert_and_return, register_statement
+from utils.periodic import PeriodicTask
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))               # 할 일이 없을 때 Claim 재시도 간격 (초)
+JOB_MAX_CONCURRENCY = int(os.getenv("JOB_MAX_CONCURRENCY", "8"))             # 워커 1개당 전체 동시 실행 상한
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "15"))    # 하트비트 주기 (초)
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "120"))                 # 하트비트가 이만큼 끊기면 재대기 (초)
+JOB_RETRY_BASE_SEC = float(os.getenv("JOB_RETRY_BASE_SEC", "30"))            # 재시도 대기 = base * 2^(시도-1)
+JOB_RETRY_MAX_SEC = float(os.getenv("JOB_RETRY_MAX_SEC", "1800"))            # 재시도 대기 상한 (초)
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "2"))       # 진행률 DB 반영 최소 간격 (초)
+JOB_SHUTDOWN_TIMEOUT = float(os.getenv("JOB_SHUTDOWN_TIMEOUT", "30"))        # 종료 시 실행 중 작업 대기 (초)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+# 작업 함수가 정의된 모듈 (import 시 @job 데코레이터로 JOB_REGISTRY에 등록됨)
+JOB_MODULES = [
+    "content.youtube.service",
+    "content.youtube.taste_vector",
+    "content.novel.langgraph_workflow",
+    "admin.router",
+]
+
+
+# ==========================================================
+#  작업 종류 등록
+# ==========================================================
+
+class JobSpec:
+    def __init__(self, name: str, func, concurrency: int, max_attempts: int, timeout: float | None):
+        self.name = name
+        self.func = func
+        # 운영 중 조정: JOB_CONCURRENCY_YOUTUBE_COLLECT_TREND_ONE=8
+        env_key = "JOB_CONCURRENCY_" + name.upper().replace(".", "_")
+        self.concurrency = max(1, int(os.getenv(env_key, concurrency)))
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+
+JOB_REGISTRY: dict[str, JobSpec] = {}
+
+
+def job(name: str, concurrency: int = 1, max_attempts: int = 3, timeout: float = None):
+    """
+    작업 함수 등록 데코레이터 (함수는 그대로 반환 -> 기존처럼 직접 호출도 가능)
+    - payload(dict)는 kwargs로 전달, 반환값은 JSON으로 result에 저장
+    """
+    def decorator(func):
+        JOB_REGISTRY[name] = JobSpec(name, func, concurrency, max_attempts, timeout)
+        return func
+    return decorator
+
+
+def load_job_modules():
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+
+
+# ==========================================================
+#  Enqueue / 조회 (API 프로세스)
+# ==========================================================
+
+ENQUEUE_JOB = register_statement("jobs.enqueue", """
+    INSERT INTO jobs (job_type, payload, priority, dedupe_key, max_attempts, run_at, created_at)
+    VALUES (:job_type, CAST(:payload AS JSONB), :priority, :dedupe_key, :max_attempts, COALESCE(:run_at, NOW()), NOW())
+    ON CONFLICT (dedupe_key) WHERE status IN ('queued', 'running') DO NOTHING
+    RETURNING id
+""")
+GET_ACTIVE_BY_DEDUPE = register_statement("jobs.get_active_by_dedupe", """
+    SELECT id FROM jobs WHERE dedupe_key = :dedupe_key AND status IN ('queued', 'running')
+""")
+JOB_COLUMNS = """id, job_type, payload, status, priority, dedupe_key, attempts, max_attempts, run_at,
+    locked_by, heartbeat_at, progress, progress_message, result, last_error, created_at, started_at, finished_at"""
+
+
+def _json_value(value):
+    # 타입 정보 없는 text() 조회에서는 JSONB가 문자열로 올 수 있음
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _job_row(row: dict | None) -> dict | None:
+    if row is None:
+        return None
+    return {**row, "payload": _json_value(row["payload"]), "result": _json_value(row["result"])}
+
+
+async def enqueue_job(job_type: str, payload: dict = None, priority: int = 0, dedupe_key: str = None,
+                      max_attempts: int = None, delay: float = 0) -> dict:
+    """
+    작업 등록 (DB INSERT 1번)
+    - dedupe_key: 같은 키의 작업이 이미 대기/실행 중이면 새로 만들지 않고 기존 id 반환
+    - 반환: {"job_id", "created"}
+    """
+    spec = JOB_REGISTRY.get(job_type)
+    run_at = datetime.now(timezone.utc) + timedelta(seconds=delay) if delay else None
+    row = await insert_and_return(ENQUEUE_JOB, {
+        "job_type": job_type,
+        "payload": json.dumps(payload or {}, ensure_ascii=False, default=str),
+        "priority": priority,
+        "dedupe_key": dedupe_key,
+        "max_attempts": max_attempts or (spec.max_attempts if spec else 3),
+        "run_at": run_at
+    })
+    if row:
+        print(f"📥 [JobQueue] Enqueued #{row['id']} {job_type}")
+        return {"job_id": row["id"], "created": True}
+
+    existing = await fetch_one(GET_ACTIVE_BY_DEDUPE, {"dedupe_key": dedupe_key}, use_primary=True)
+    return {"job_id": existing["id"] if existing else None, "created": False}
+
+
+async def get_job(job_id: int) -> dict | None:
+    row = await fetch_one(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = :id", {"id": job_id}, use_primary=True)
+    return _job_row(row)
+
+
+async def list_jobs(status: str = None, job_type: str = None, limit: int = 50) -> list[dict]:
+    where_clauses = []
+    params = {"limit": limit}
+    if status:
+        where_clauses.append("status = :status")
+        params["status"] = status
+    if job_type:
+        where_clauses.append("job_type = :job_type")
+        params["job_type"] = job_type
+    where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    rows = await fetch_all(f"""
+        SELECT {JOB_COLUMNS} FROM jobs
+        {where_sql}
+        ORDER BY id DESC
+        LIMIT :limit
+    """, params, use_primary=True)
+    return [_job_row(row) for row in rows]
+
+
+async def get_job_counts() -> list[dict]:
+    """작업 종류/상태별 건수 (대기열 길이 모니터링)"""
+    return await fetch_all("""
+        SELECT job_type, status, COUNT(*) AS count, MIN(run_at) AS oldest_run_at
+        FROM jobs
+        WHERE status IN ('queued', 'running') OR finished_at > NOW() - INTERVAL '1 day'
+        GROUP BY job_type, status
+        ORDER BY job_type, status
+    """, use_primary=True)
+
+
+async def retry_job(job_id: int) -> bool:
+    """실패한 작업을 즉시 재대기 (시도 횟수 초기화). 재대기했으면 True"""
+    result = await execute("""
+        UPDATE jobs
+        SET status = 'queued', attempts = 0, run_at = NOW(), last_error = NULL, finished_at = NULL
+        WHERE id = :id AND status = 'failed'
+          AND NOT EXISTS (  -- 같은 dedupe_key 작업이 이미 대기/실행 중이면 재시도 안 함
+              SELECT 1 FROM jobs active
+              WHERE active.dedupe_key = jobs.dedupe_key AND active.status IN ('queued', 'running')
+          )
+    """, {"id": job_id})
+    return bool(result.rowcount)
+
+
+# ==========================================================
+#  진행률 (작업 함수 안에서 호출)
+# ==========================================================
+
+class JobContext:
+    def __init__(self, job_id: int, job_type: str, attempt: int):
+        self.job_id = job_id
+        self.job_type = job_type
+        self.attempt = attempt
+        self._last_report = 0.0
+
+    async def report(self, progress: float, message: str = None, force: bool = False):
+        now = time.monotonic()
+        if not force and progress < 1 and now - self._last_report < JOB_PROGRESS_INTERVAL:
+            return  # 페이지마다 부르더라도 DB 쓰기는 간격 제한
+        self._last_report = now
+        await execute(
+            "UPDATE jobs SET progress = :p, progress_message = :m, heartbeat_at = NOW() WHERE id = :id",
+            {"id": self.job_id, "p": max(0.0, min(1.0, progress)), "m": message}
+        )
+
+
+_current_job: ContextVar[JobContext | None] = ContextVar("current_job", default=None)
+
+
+async def report_progress(progress: float, message: str = None):
+    """현재 실행 중인 작업의 진행률 기록 (0.0 ~ 1.0). 워커 밖(직접 호출)에서는 아무것도 안 함"""
+    ctx = _current_job.get()
+    if ctx is not None:
+        await ctx.report(progress, message)
+
+
+# ==========================================================
+#  워커 (back/worker.py에서 실행)
+# ==========================================================
+
+CLAIM_JOB = register_statement("jobs.claim", """
+    UPDATE jobs
+    SET status = 'running', attempts = attempts + 1, locked_by = :worker,
+        started_at = NOW(), heartbeat_at = NOW(), last_error = NULL
+    WHERE id = (
+        SELECT id FROM jobs
+        WHERE status = 'queued' AND job_type = :job_type AND run_at <= NOW()
+        ORDER BY priority DESC, run_at, id
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1
+    )
+    RETURNING id, job_type, payload, attempts, max_attempts
+""")
+COMPLETE_JOB = register_statement("jobs.complete", """
+    UPDATE jobs
+    SET status = 'succeeded', result = CAST(:result AS JSONB), progress = 1.0,
+        locked_by = NULL, finished_at = NOW()
+    WHERE id = :id AND locked_by = :worker
+""")
+FAIL_JOB = register_statement("jobs.fail", """
+    UPDATE jobs
+    SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+        run_at = CASE WHEN attempts < max_attempts THEN NOW() + make_interval(secs => :delay) ELSE run_at END,
+        finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+        last_error = :error, locked_by = NULL
+    WHERE id = :id AND locked_by = :worker
+    RETURNING status, run_at
+""")
+# 재시도하지 않는 작업(max_attempts=1)은 반납하지 않고 실패 처리 (중간 결과 위에 다시 실행되지 않도록)
+RELEASE_JOBS = register_statement("jobs.release", """
+    UPDATE jobs
+    SET status = CASE WHEN max_attempts > 1 THEN 'queued' ELSE 'failed' END,
+        attempts = CASE WHEN max_attempts > 1 THEN GREATEST(attempts - 1, 0) ELSE attempts END,
+        finished_at = CASE WHEN max_attempts > 1 THEN NULL ELSE NOW() END,
+        last_error = CASE WHEN max_attempts > 1 THEN last_error ELSE 'cancelled on worker shutdown' END,
+        locked_by = NULL, run_at = NOW()
+    WHERE id = ANY(:ids) AND locked_by = :worker AND status = 'running'
+    RETURNING id, status
+""")
+HEARTBEAT_JOBS = register_statement("jobs.heartbeat", """
+    UPDATE jobs SET heartbeat_at = NOW() WHERE id = ANY(:ids) AND locked_by = :worker
+""")
+REQUEUE_STALE_JOBS = register_statement("jobs.requeue_stale", """
+    UPDATE jobs
+    SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+        finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+        last_error = 'worker heartbeat lost (' || COALESCE(locked_by, '?') || ')',
+        locked_by = NULL, run_at = NOW()
+    WHERE status = 'running' AND heartbeat_at < NOW() - make_interval(secs => :stale)
+    RETURNING id
+""")
+
+
+def retry_delay(attempt: int) -> float:
+    """지수 백오프 + 지터 (여러 작업이 동시에 재시도하며 몰리지 않도록)"""
+    delay = min(JOB_RETRY_MAX_SEC, JOB_RETRY_BASE_SEC * (2 ** max(attempt - 1, 0)))
+    return round(delay * random.uniform(0.8, 1.2), 1)
+
+
+class JobWorker:
+    def __init__(self, job_types: list[str] = None, worker_id: str = None, max_concurrency: int = JOB_MAX_CONCURRENCY):
+        names = job_types or list(JOB_REGISTRY)
+        unknown = [name for name in names if name not in JOB_REGISTRY]
+        if unknown:
+            raise ValueError(f"Unknown job types: {unknown}")
+        self.specs = [JOB_REGISTRY[name] for name in names]
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.max_concurrency = max_concurrency
+        self.running: dict[int, asyncio.Task] = {}          # job_id -> 실행 Task
+        self.running_by_type: dict[str, int] = {spec.name: 0 for spec in self.specs}
+        self.stats = {"claimed": 0, "succeeded": 0, "retried": 0, "failed": 0, "requeued_stale": 0}
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self.heartbeat = PeriodicTask("JobHeartbeat", JOB_HEARTBEAT_INTERVAL, self._heartbeat)
+
+    async def _heartbeat(self):
+        if self.running:
+            await execute(HEARTBEAT_JOBS, {"ids": list(self.running), "worker": self.worker_id})
+        # 다른 워커가 죽으면서 남긴 작업 회수 (어느 워커가 해도 결과는 같음)
+        stale = await fetch_all(REQUEUE_STALE_JOBS, {"stale": JOB_STALE_AFTER}, use_primary=True)
+        if stale:
+            self.stats["requeued_stale"] += len(stale)
+            print(f"♻️ [JobWorker] Requeued {len(stale)} stale jobs: {[row['id'] for row in stale]}")
+
+    async def _claim(self, spec: JobSpec) -> dict | None:
+        return await insert_and_return(CLAIM_JOB, {"job_type": spec.name, "worker": self.worker_id})
+
+    async def _execute(self, spec: JobSpec, row: dict):
+        job_id = row["id"]
+        ctx = JobContext(job_id, spec.name, row["attempts"])
+        token = _current_job.set(ctx)
+        started = time.perf_counter()
+        print(f"▶️ [JobWorker] #{job_id} {spec.name} (attempt {row['attempts']}/{row['max_attempts']})")
+        try:
+            coro = spec.func(**(_json_value(row["payload"]) or {}))
+            result = await (asyncio.wait_for(coro, spec.timeout) if spec.timeout else coro)
+            await execute(COMPLETE_JOB, {
+                "id": job_id, "worker": self.worker_id,
+                "result": json.dumps(result, ensure_ascii=False, default=str)
+            })
+            self.stats["succeeded"] += 1
+            print(f"✅ [JobWorker] #{job_id} {spec.name} done in {round(time.perf_counter() - started, 1)}s")
+        except asyncio.CancelledError:
+            raise  # 종료 처리는 stop()에서 (작업 반납)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            delay = retry_delay(row["attempts"])
+            outcome = await insert_and_return(FAIL_JOB, {
+                "id": job_id, "worker": self.worker_id, "error": error[:2000], "delay": delay
+            })
+            if outcome and outcome["status"] == "queued":
+                self.stats["retried"] += 1
+                print(f"🔁 [JobWorker] #{job_id} {spec.name} failed ({error}), retry in {delay}s")
+            else:
+                self.stats["failed"] += 1
+                print(f"❌ [JobWorker] #{job_id} {spec.name} failed permanently: {error}")
+        finally:
+            _current_job.reset(token)
+
+    def _spawn(self, spec: JobSpec, row: dict):
+        job_id = row["id"]
+        self.running_by_type[spec.name] += 1
+
+        def _done(_):
+            self.running.pop(job_id, None)
+            self.running_by_type[spec.name] -= 1
+            self._wakeup.set()  # 자리가 났으니 바로 다음 작업 Claim
+
+        task = asyncio.get_running_loop().create_task(self._execute(spec, row))
+        task.add_done_callback(_done)
+        self.running[job_id] = task
+        self.stats["claimed"] += 1
+
+    async def _claim_round(self) -> int:
+        """종류별 빈 자리만큼 Claim. 가져온 작업 수 반환"""
+        claimed = 0
+        for spec in self.specs:
+            while (self.running_by_type[spec.name] < spec.concurrency
+                   and len(self.running) < self.max_concurrency
+                   and not self._stopping.is_set()):
+                row = await self._claim(spec)
+                if not row:
+                    break
+                self._spawn(spec, row)
+                claimed += 1
+        return claimed
+
+    async def run(self):
+        print(f"👷 [JobWorker] {self.worker_id} started: "
+              + ", ".join(f"{spec.name}(x{spec.concurrency})" for spec in self.specs))
+        self.heartbeat.start()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    claimed = await self._claim_round()
+                except Exception as e:
+                    claimed = 0
+                    print(f"⚠️ [JobWorker] Claim failed: {e}")
+                if claimed:
+                    continue
+                # 할 일이 없거나 자리가 없으면 폴링 간격만큼 대기 (작업이 끝나면 즉시 깨어남)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._shutdown()
+
+    def stop(self):
+        """새 작업 Claim 중단 (run() 루프가 실행 중 작업을 정리하고 반환)"""
+        self._stopping.set()
+        self._wakeup.set()
+
+    async def _shutdown(self):
+        if self.running:
+            print(f"⏳ [JobWorker] Waiting for {len(self.running)} running jobs...")
+            await asyncio.wait(list(self.running.values()), timeout=JOB_SHUTDOWN_TIMEOUT)
+        if self.running:
+            # 시간 내 못 끝낸 작업은 취소 후 대기열로 반납 (시도 횟수 차감 -> 다른 워커가 이어서 실행)
+            # 취소된 작업은 CancelledError를 받아 자체 정리(롤백)를 마친 뒤 끝남
+            ids = list(self.running)
+            for task in self.running.values():
+                task.cancel()
+            await asyncio.gather(*self.running.values(), return_exceptions=True)
+            rows = await fetch_all(RELEASE_JOBS, {"ids": ids, "worker": self.worker_id}, use_primary=True)
+            released = [row["id"] for row in rows if row["status"] == "queued"]
+            failed = [row["id"] for row in rows if row["status"] == "failed"]
+            print(f"↩️ [JobWorker] Released unfinished jobs: {released}, failed (no retry): {failed}")
+        await self.heartbeat.stop(run_final=False)
+        print(f"👋 [JobWorker] {self.worker_id} stopped {self.stats}")
+
+    def snapshot(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            **self.stats,
+            "running": dict(self.running_by_type)
+        }
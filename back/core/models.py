@@ -0,0 +1,47 @@
+from sqlalchemy import Column, String, Text, DateTime, Integer, BigInteger, Float, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+from core.database import Base
+
+
+class QueryEmbeddingCache(Base):
+    """검색어 임베딩 영구 캐시 (core/embedding_cache.py의 2차 캐시)"""
+    __tablename__ = "query_embedding_cache"
+
+    cache_key = Column(String(64), primary_key=True)                 # sha256(model + 정규화 텍스트)
+    model = Column(String, nullable=False)                           # 임베딩 모델명
+    query_text = Column(Text, nullable=True)                         # 정규화된 검색어 (디버깅용)
+    embedding = Column(Vector(1536), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class Job(Base):
+    """백그라운드 작업 큐 (core/job_queue.py, 워커: back/worker.py)"""
+    __tablename__ = "jobs"
+
+    id = Column(BigInteger, primary_key=True)
+    job_type = Column(String, nullable=False)                        # 등록된 작업 이름 (예: youtube.collect_global_trends)
+    payload = Column(JSONB, nullable=False, server_default="{}")     # 작업 함수 kwargs
+    status = Column(String, nullable=False, server_default="queued")  # queued | running | succeeded | failed
+    priority = Column(Integer, nullable=False, server_default="0")   # 클수록 먼저
+    dedupe_key = Column(String, nullable=True)                       # 같은 키는 대기/실행 중 1개만
+    attempts = Column(Integer, nullable=False, server_default="0")
+    max_attempts = Column(Integer, nullable=False, server_default="3")
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # 재시도 백오프 시각
+    locked_by = Column(String, nullable=True)                        # 실행 중인 워커 ID
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)    # 워커 생존 신호 (끊기면 재대기)
+    progress = Column(Float, nullable=True)                          # 0.0 ~ 1.0
+    progress_message = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # 워커 Claim 쿼리용 (대기 중인 작업만)
+        Index("ix_jobs_claim", "job_type", priority.desc(), "run_at", "id", postgresql_where=text("status = 'queued'")),
+        Index("uq_jobs_dedupe_active", "dedupe_key", unique=True, postgresql_where=text("status IN ('queued', 'running')")),
+        Index("ix_jobs_created_at", "created_at"),
+    )
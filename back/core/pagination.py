@@ -0,0 +1,68 @@
+"""
+Keyset(커서) 페이지네이션 공용 유틸
+- OFFSET은 깊이 스크롤할수록 앞 행을 전부 읽고 버리므로 느려짐
+- 마지막 행의 (정렬값, id)를 불투명 커서로 내려주고, 다음 요청은 그 뒤부터 인덱스로 바로 탐색
+"""
+import base64
+import json
+from datetime import datetime
+
+# NULL 정렬값 대체용 상수 (표현식 인덱스와 같은 식이어야 인덱스를 탐)
+EPOCH_SQL = "TIMESTAMPTZ '1970-01-01 00:00:00+00'"
+
+
+class KeysetSort:
+    """
+    정렬 1종 정의 (내림차순 고정, 동률은 id로 구분)
+    - expr: ORDER BY / WHERE에 쓰는 SQL 식 (NULL 없는 COALESCE 식 -> 표현식 인덱스와 동일해야 함)
+    - key_field: 결과 row에서 다음 커서 값을 꺼낼 컬럼명 (SELECT에 expr AS key_field 포함 필요)
+    - kind: "datetime" | "int" (커서 복원 시 타입 변환)
+    """
+    def __init__(self, name: str, expr: str, id_expr: str, key_field: str, kind: str):
+        self.name = name
+        self.expr = expr
+        self.id_expr = id_expr
+        self.key_field = key_field
+        self.kind = kind
+
+    @property
+    def order_clause(self) -> str:
+        return f"ORDER BY {self.expr} DESC, {self.id_expr} DESC"
+
+    def where_clause(self, cursor: dict, params: dict) -> str:
+        """커서 이후 조건 (Row 비교 -> (expr DESC, id DESC) 인덱스로 바로 Seek)"""
+        params["cursor_key"] = self._parse(cursor["k"])
+        params["cursor_id"] = int(cursor["id"])
+        return f"({self.expr}, {self.id_expr}) < (:cursor_key, :cursor_id)"
+
+    def next_cursor(self, rows: list[dict], limit: int, id_field: str = "id") -> str | None:
+        """가득 찬 페이지면 마지막 행 기준 다음 커서, 아니면 None (마지막 페이지)"""
+        if not rows or len(rows) < limit:
+            return None
+        last = rows[-1]
+        return encode_cursor(self.name, last[self.key_field], last[id_field])
+
+    def _parse(self, value):
+        if self.kind == "datetime":
+            return datetime.fromisoformat(value)
+        return int(value)
+
+
+def encode_cursor(sort_name: str, key, row_id: int) -> str:
+    key = key.isoformat() if isinstance(key, datetime) else key
+    raw = json.dumps({"s": sort_name, "k": key, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_name: str) -> dict:
+    """불투명 커서 복원. 형식이 틀렸거나 다른 정렬용 커서면 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(data, dict) or "k" not in data or "id" not in data:
+            raise ValueError("missing fields")
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if data.get("s") != sort_name:
+        raise ValueError("Cursor does not match sort order")
+    return data
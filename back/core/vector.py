@@ -0,0 +1,312 @@
+"""
+pgvector 공용 유틸
+- ANN 인덱스(HNSW / IVFFlat) 생성 및 무중단 재생성
+- 검색 시 ef_search / probes 설정 (쿼리 단위 SET LOCAL)
+- Recall vs Latency 벤치마크 (파라미터 튜닝용)
+- 벡터 파라미터 바인딩 (pgvector 바이너리 코덱, core/database.py에서 등록)
+- 임베딩 일괄 저장 (UPDATE ... FROM VALUES)
+"""
+import os
+import time
+import numpy as np
+from sqlalchemy import text
+from core.database import engine, connection
+
+# ==========================================================
+#  기본 파라미터 (환경변수로 조정)
+# ==========================================================
+VECTOR_INDEX_METHOD = os.getenv("VECTOR_INDEX_METHOD", "hnsw")        # hnsw | ivfflat
+HNSW_M = int(os.getenv("HNSW_M", "16"))                               # 노드당 연결 수 (클수록 Recall↑ 메모리↑)
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))   # 빌드 시 후보 수 (클수록 빌드 느림, 품질↑)
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))               # 검색 시 후보 수 (LIMIT 이상이어야 함)
+IVFFLAT_LISTS = int(os.getenv("IVFFLAT_LISTS", "100"))                # 클러스터 수 (권장: rows / 1000)
+IVFFLAT_PROBES = int(os.getenv("IVFFLAT_PROBES", "10"))               # 검색 시 탐색 클러스터 수
+VECTOR_BULK_CHUNK = int(os.getenv("VECTOR_BULK_CHUNK", "500"))        # UPDATE 1회당 행 수 (바인딩 파라미터 한도 32767)
+VECTOR_INDEX_BUILD_MEM = os.getenv("VECTOR_INDEX_BUILD_MEM", "")      # 빌드용 maintenance_work_mem (예: '1GB')
+
+# 벡터 검색 대상 테이블 -> ANN 인덱스 이름
+VECTOR_TABLES = {
+    "youtube_list": "ix_youtube_list_embedding_ann",
+    "youtube_channels": "ix_youtube_channels_embedding_ann",
+}
+
+
+def to_vector_param(embedding) -> np.ndarray | None:
+    """
+    임베딩 -> vector 컬럼 바인딩 값 (float32 배열, 바이너리 전송)
+    - str(list) 텍스트 직렬화(벡터당 ~30KB) 대신 사용
+    - None / 빈 리스트는 NULL
+    """
+    if embedding is None or len(embedding) == 0:
+        return None
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def build_index_sql(table: str, index_name: str, method: str = VECTOR_INDEX_METHOD,
+                    m: int = HNSW_M, ef_construction: int = HNSW_EF_CONSTRUCTION,
+                    lists: int = IVFFLAT_LISTS, concurrently: bool = True) -> str:
+    """ANN 인덱스 생성 DDL (Cosine Distance: <=> 연산자용 vector_cosine_ops)"""
+    if table not in VECTOR_TABLES:
+        raise ValueError(f"Unknown vector table: {table}")
+
+    if method == "hnsw":
+        with_clause = f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)})"
+    elif method == "ivfflat":
+        with_clause = f"WITH (lists = {int(lists)})"
+    else:
+        raise ValueError(f"Unknown index method: {method}")
+
+    concurrently_str = "CONCURRENTLY " if concurrently else ""
+    return (
+        f"CREATE INDEX {concurrently_str}IF NOT EXISTS {index_name} "
+        f"ON {table} USING {method} (embedding vector_cosine_ops) {with_clause}"
+    )
+
+
+def search_settings_sql(ef_search: int = None, probes: int = None) -> list[str]:
+    """쿼리 단위 ANN 검색 파라미터 (트랜잭션 안에서만 유효한 SET LOCAL)"""
+    return [
+        f"SET LOCAL hnsw.ef_search = {int(ef_search or HNSW_EF_SEARCH)}",
+        f"SET LOCAL ivfflat.probes = {int(probes or IVFFLAT_PROBES)}",
+    ]
+
+
+# ==========================================================
+#  임베딩 일괄 저장
+# ==========================================================
+
+async def bulk_update_embeddings(table: str, key_column: str, results: dict, only_missing: bool = True) -> int:
+    """
+    {key: vector}를 UPDATE ... FROM (VALUES ...) 한 문장으로 저장 (VECTOR_BULK_CHUNK 단위, 단일 트랜잭션)
+    - 행마다 UPDATE를 날리던 방식 대비 왕복/트랜잭션 수를 1/N로 줄임
+    - only_missing: 이미 임베딩이 있는 행은 덮어쓰지 않음
+    - 반환: 실제 갱신된 행 수
+    """
+    if table not in VECTOR_TABLES:
+        raise ValueError(f"Unknown vector table: {table}")
+    if not results:
+        return 0
+
+    items = list(results.items())
+    missing_clause = "AND t.embedding IS NULL" if only_missing else ""
+    updated = 0
+    try:
+        async with connection() as conn:
+            for start in range(0, len(items), VECTOR_BULK_CHUNK):
+                chunk = items[start:start + VECTOR_BULK_CHUNK]
+                values = []
+                params = {}
+                for i, (key, vec) in enumerate(chunk):
+                    values.append(f"(:k_{i}, CAST(:e_{i} AS vector))")
+                    params[f"k_{i}"] = key
+                    params[f"e_{i}"] = to_vector_param(vec)
+
+                sql = f"""
+                    UPDATE {table} AS t
+                    SET embedding = v.embed
+                    FROM (VALUES {", ".join(values)}) AS v(key, embed)
+                    WHERE t.{key_column} = v.key {missing_clause}
+                """
+                result = await conn.execute(text(sql), params)
+                updated += result.rowcount
+        return updated
+    except Exception as e:
+        print(f"❌ bulk_update_embeddings 실패: {e}")
+        raise e
+
+
+# ==========================================================
+#  ANN 검색 실행
+# ==========================================================
+
+async def fetch_all_ann(query: str, params: dict = None, ef_search: int = None, probes: int = None) -> list[dict]:
+    """
+    벡터 유사도 검색 전용 fetch_all
+    - 같은 트랜잭션에서 SET LOCAL 후 쿼리 실행 (다른 요청에 설정이 새지 않음)
+    - ef_search는 LIMIT보다 작으면 결과가 모자랄 수 있으므로 자동 보정
+    """
+    limit = (params or {}).get("limit") or 0
+    ef_search = max(int(ef_search or HNSW_EF_SEARCH), int(limit))
+    try:
+        # 읽기 엔진(복제본)에서 실행 - 크롤러 쓰기와 커넥션 경쟁 X
+        async with connection(readonly=True) as conn:
+            for setting in search_settings_sql(ef_search, probes):
+                await conn.execute(text(setting))
+            result = await conn.execute(text(query), params or {})
+            return [dict(row) for row in result.mappings().all()]
+    except Exception as e:
+        print(f"❌ fetch_all_ann 실패: {e}")
+        raise e
+
+
+# ==========================================================
+#  인덱스 관리 (Admin)
+# ==========================================================
+
+async def _execute_autocommit(statements: list[str], settings: dict[str, str] = None):
+    # CREATE/DROP INDEX CONCURRENTLY는 트랜잭션 블록 안에서 실행 불가
+    # settings는 세션 단위 SET이므로 끝나면 RESET (풀에 반납된 커넥션으로 새지 않도록)
+    settings = settings or {}
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            for name, value in settings.items():
+                await conn.execute(text(f"SET {name} = '{value}'"))
+            for statement in statements:
+                await conn.execute(text(statement))
+        finally:
+            for name in settings:
+                await conn.execute(text(f"RESET {name}"))
+
+
+async def get_vector_indexes() -> list[dict]:
+    """현재 벡터 컬럼 인덱스 목록 + 크기"""
+    sql = """
+        SELECT
+            i.tablename AS table_name,
+            i.indexname AS index_name,
+            i.indexdef AS definition,
+            pg_size_pretty(pg_relation_size(c.oid)) AS size
+        FROM pg_indexes i
+        JOIN pg_class c ON c.relname = i.indexname
+        WHERE i.tablename = ANY(:tables)
+          AND i.indexdef ILIKE '%embedding%'
+        ORDER BY i.tablename, i.indexname
+    """
+    async with engine.connect() as conn:
+        result = await conn.execute(text(sql), {"tables": list(VECTOR_TABLES.keys())})
+        return [dict(row) for row in result.mappings().all()]
+
+
+async def rebuild_vector_index(table: str, method: str = VECTOR_INDEX_METHOD,
+                               m: int = HNSW_M, ef_construction: int = HNSW_EF_CONSTRUCTION,
+                               lists: int = IVFFLAT_LISTS) -> dict:
+    """
+    ANN 인덱스 무중단 재생성
+    1. 새 파라미터로 임시 인덱스를 CONCURRENTLY 생성 (쓰기 차단 없음)
+    2. 기존 인덱스 CONCURRENTLY 삭제
+    3. 임시 인덱스를 정식 이름으로 변경
+    """
+    index_name = VECTOR_TABLES.get(table)
+    if not index_name:
+        raise ValueError(f"Unknown vector table: {table}")
+
+    tmp_name = f"{index_name}_new"
+    settings = {"maintenance_work_mem": VECTOR_INDEX_BUILD_MEM} if VECTOR_INDEX_BUILD_MEM else None
+    statements = [
+        # 이전 실패로 남은 INVALID 임시 인덱스 정리
+        f"DROP INDEX CONCURRENTLY IF EXISTS {tmp_name}",
+        build_index_sql(table, tmp_name, method, m, ef_construction, lists),
+        f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}",
+        f"ALTER INDEX {tmp_name} RENAME TO {index_name}",
+    ]
+
+    print(f"🔧 [VectorIndex] Rebuilding {table} ({method}, m={m}, ef_construction={ef_construction}, lists={lists})...")
+    started = time.perf_counter()
+    await _execute_autocommit(statements, settings)
+    elapsed = round(time.perf_counter() - started, 2)
+    print(f"✅ [VectorIndex] {index_name} rebuilt in {elapsed}s")
+
+    return {
+        "table": table,
+        "index": index_name,
+        "method": method,
+        "params": {"m": m, "ef_construction": ef_construction} if method == "hnsw" else {"lists": lists},
+        "elapsed_sec": elapsed
+    }
+
+
+# ==========================================================
+#  Recall vs Latency 벤치마크
+# ==========================================================
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def benchmark_vector_search(table: str, k: int = 10, samples: int = 20,
+                                  method: str = VECTOR_INDEX_METHOD,
+                                  ef_search_values: list[int] = None,
+                                  probes_values: list[int] = None) -> dict:
+    """
+    테이블의 임의 벡터를 질의로 사용해 정확 검색(Seq Scan) 대비 ANN 결과의 Recall@k, 지연시간 측정
+    - hnsw: ef_search 값별 측정 / ivfflat: probes 값별 측정 (현재 인덱스 방식에 맞춰 지정)
+    """
+    if table not in VECTOR_TABLES:
+        raise ValueError(f"Unknown vector table: {table}")
+
+    ef_search_values = ef_search_values or [20, 40, 80, 160]
+    probes_values = probes_values or [1, 5, 10, 20]
+
+    search_sql = f"""
+        SELECT id FROM {table}
+        WHERE embedding IS NOT NULL
+        ORDER BY embedding <=> CAST(:qv AS vector)
+        LIMIT :k
+    """
+
+    async with engine.connect() as conn:
+        result = await conn.execute(text(f"""
+            SELECT embedding AS qv FROM {table}
+            WHERE embedding IS NOT NULL
+            ORDER BY RANDOM()
+            LIMIT :samples
+        """), {"samples": samples})
+        queries = [row["qv"] for row in result.mappings().all()]
+
+    if not queries:
+        return {"table": table, "error": "No embeddings to benchmark"}
+
+    async def _run(qv: np.ndarray, settings: list[str]) -> tuple[set, float]:
+        async with engine.begin() as conn:
+            for setting in settings:
+                await conn.execute(text(setting))
+            started = time.perf_counter()
+            result = await conn.execute(text(search_sql), {"qv": qv, "k": k})
+            ids = {row[0] for row in result.all()}
+            return ids, (time.perf_counter() - started) * 1000
+
+    # 1. 정답셋 (인덱스 미사용 정확 검색)
+    exact = []
+    exact_latency = []
+    for qv in queries:
+        ids, ms = await _run(qv, ["SET LOCAL enable_indexscan = off"])
+        exact.append(ids)
+        exact_latency.append(ms)
+
+    # 2. ANN 설정별 측정
+    if method == "hnsw":
+        variants = [("ef_search", v, search_settings_sql(ef_search=v)) for v in ef_search_values]
+    else:
+        variants = [("probes", v, search_settings_sql(probes=v)) for v in probes_values]
+
+    results = []
+    for param, value, settings in variants:
+        recalls, latencies = [], []
+        for qv, truth in zip(queries, exact):
+            ids, ms = await _run(qv, settings)
+            recalls.append(len(ids & truth) / max(1, len(truth)))
+            latencies.append(ms)
+        results.append({
+            "param": param,
+            "value": value,
+            "recall": round(sum(recalls) / len(recalls), 4),
+            "p50_ms": round(_percentile(latencies, 50), 2),
+            "p95_ms": round(_percentile(latencies, 95), 2)
+        })
+
+    return {
+        "table": table,
+        "method": method,
+        "k": k,
+        "samples": len(queries),
+        "exact": {
+            "p50_ms": round(_percentile(exact_latency, 50), 2),
+            "p95_ms": round(_percentile(exact_latency, 95), 2)
+        },
+        "ann": results
+    }
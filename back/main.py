@@ -11,9 +11,23 @@ from admin.router import router as admin_router
 from content.search.router import router as search_router
 from content.novel.router import router as novel_router
 from game.router import router as game_router
+from utils.http_client import close_http_client
+from user.activity import activity_tracker
+from user.presence import presence
+from content.youtube.enrichment import enrichment_queue
+from content.youtube.watch_time import watch_time_buffer
+from utils.safe_ops import safe_execute
+from core.job_queue import JobWorker, load_job_modules
+import asyncio
+import os
 
 app = FastAPI()
 
+# 로컬 개발용: 별도 worker.py 없이 API 프로세스 안에서 작업 큐 처리 (운영은 false + pm2 worker)
+JOB_WORKER_EMBEDDED = os.getenv("JOB_WORKER_EMBEDDED", "false").lower() == "true"
+embedded_worker: JobWorker | None = None
+embedded_worker_task: asyncio.Task | None = None
+
 # ========================================================
 #  Logging Configuration (Filter Heartbeat/Stats)
 # ========================================================
@@ -31,6 +45,41 @@ async def startup_event():
     logger = logging.getLogger("uvicorn.access")
     logger.addFilter(EndpointFilter())
 
+    # 유저 활동 시간 Write-Behind flush 루프
+    activity_tracker.start()
+
+    # 시청 시간 Write-Behind flush 루프
+    watch_time_buffer.start()
+
+    # 시청 로그 영상 메타데이터 보강 큐 (임베딩 생성을 요청 경로에서 분리)
+    enrichment_queue.start()
+
+    # (옵션) 내장 작업 워커
+    global embedded_worker, embedded_worker_task
+    if JOB_WORKER_EMBEDDED:
+        load_job_modules()
+        embedded_worker = JobWorker()
+        embedded_worker_task = asyncio.get_running_loop().create_task(embedded_worker.run())
+
+    # 접속자 Presence 초기화 (DB의 최근 활동 유저)
+    with safe_execute("Presence seed failed"):
+        await presence.seed_from_db()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # 내장 작업 워커 종료 (못 끝낸 작업은 대기열로 반납)
+    if embedded_worker is not None:
+        embedded_worker.stop()
+        await embedded_worker_task
+    # 남은 활동 기록 마지막 반영
+    await activity_tracker.stop()
+    # 남은 시청 시간 마지막 반영
+    await watch_time_buffer.stop()
+    # 대기 중인 메타데이터 보강 작업 처리 후 종료
+    await enrichment_queue.stop()
+    # 공용 HTTP 커넥션 풀 정리
+    await close_http_client()
+
 # CORS 설정 (프론트엔드/클라우드 허용)
 origins = [
     "http://localhost:3000",
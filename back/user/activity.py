@@ -0,0 +1,75 @@
+"""
+유저 활동 시간 Write-Behind 트래커
+- 인증된 요청마다 UPDATE "user"를 날리던 방식 대신, 메모리에 마지막 활동 시각만 기록
+- ACTIVITY_FLUSH_INTERVAL 초마다 모인 유저를 UPDATE ... FROM (VALUES) 한 문장으로 반영
+"""
+import os
+from datetime import datetime, timezone
+from core.database import execute
+from utils.periodic import PeriodicTask
+
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", "5"))   # DB 반영 주기 (초)
+ACTIVITY_FLUSH_CHUNK = int(os.getenv("ACTIVITY_FLUSH_CHUNK", "1000"))        # UPDATE 1회당 유저 수
+
+
+class ActivityTracker:
+    def __init__(self, interval: float = ACTIVITY_FLUSH_INTERVAL):
+        self.pending: dict[int, datetime] = {}  # user_id -> 마지막 활동 시각 (UTC)
+        self.stats = {"touched": 0, "flushed": 0, "flushes": 0}
+        self.task = PeriodicTask("ActivityTracker", interval, self.flush)
+
+    def touch(self, user_id: int):
+        """활동 기록 (메모리만 갱신, DB 쓰기 없음)"""
+        self.pending[user_id] = datetime.now(timezone.utc)
+        self.stats["touched"] += 1
+
+    def discard(self, user_id: int):
+        """아직 반영 안 된 활동 기록 제거 (로그아웃 직후 flush가 온라인으로 되돌리지 않도록)"""
+        self.pending.pop(user_id, None)
+
+    async def flush(self) -> int:
+        """모인 활동 시각을 일괄 UPDATE. 반영한 유저 수 반환"""
+        if not self.pending:
+            return 0
+
+        batch, self.pending = self.pending, {}
+        items = list(batch.items())
+        try:
+            for start in range(0, len(items), ACTIVITY_FLUSH_CHUNK):
+                chunk = items[start:start + ACTIVITY_FLUSH_CHUNK]
+                values = []
+                params = {}
+                for i, (user_id, active_at) in enumerate(chunk):
+                    values.append(f"(CAST(:u_{i} AS INTEGER), CAST(:t_{i} AS TIMESTAMPTZ))")
+                    params[f"u_{i}"] = user_id
+                    params[f"t_{i}"] = active_at
+
+                sql = f"""
+                    UPDATE "user" AS u
+                    SET last_active_at = GREATEST(COALESCE(u.last_active_at, v.active_at), v.active_at)
+                    FROM (VALUES {", ".join(values)}) AS v(id, active_at)
+                    WHERE u.id = v.id
+                """
+                await execute(sql, params)
+        except BaseException:
+            # 실패/취소 시 다음 주기에 재시도 (그 사이 들어온 더 최신 기록은 유지)
+            for user_id, active_at in batch.items():
+                self.pending.setdefault(user_id, active_at)
+            raise
+
+        self.stats["flushed"] += len(items)
+        self.stats["flushes"] += 1
+        return len(items)
+
+    def start(self):
+        self.task.start()
+
+    async def stop(self):
+        """루프 종료 + 남은 기록 마지막 flush"""
+        await self.task.stop()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "pending": len(self.pending)}
+
+
+activity_tracker = ActivityTracker()
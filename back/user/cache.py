@@ -0,0 +1,52 @@
+"""
+인증 유저 캐시 (uid -> user row, 짧은 TTL)
+- get_current_user가 매 요청마다 "user" 테이블을 조회하지 않도록 함
+- 유저 정보가 바뀌는 곳(로그아웃, 이후 추가될 비활성화/프로필/비밀번호 변경 등)에서는 반드시 invalidate(uid) 호출
+  (last_active_at은 ActivityTracker가 계속 갱신하므로 TTL 동안의 오차는 허용 / 취향 벡터 컬럼은 캐시 대상 아님)
+"""
+import os
+import time
+from collections import OrderedDict
+
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "30"))       # 유효 시간 (초)
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))    # 최대 보관 유저 수 (LRU)
+
+
+class UserCache:
+    def __init__(self, ttl: float = AUTH_USER_CACHE_TTL, max_size: int = AUTH_USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: OrderedDict[int, tuple[dict, float]] = OrderedDict()  # uid -> (user, expires_at)
+        self.stats = {"hit": 0, "miss": 0}
+
+    def get(self, user_id: int) -> dict | None:
+        entry = self.entries.get(user_id)
+        if entry and entry[1] >= time.monotonic():
+            self.entries.move_to_end(user_id)
+            self.stats["hit"] += 1
+            return entry[0]
+        if entry:
+            del self.entries[user_id]
+        self.stats["miss"] += 1
+        return None
+
+    def put(self, user_id: int, user: dict):
+        self.entries[user_id] = (user, time.monotonic() + self.ttl)
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        """유저 행이 바뀐 직후 호출 -> 다음 요청은 DB에서 다시 읽음"""
+        self.entries.pop(user_id, None)
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hit"] + self.stats["miss"]
+        return {
+            **self.stats,
+            "size": len(self.entries),
+            "hit_ratio": round(self.stats["hit"] / lookups, 3) if lookups else 0.0
+        }
+
+
+user_cache = UserCache()
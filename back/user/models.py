@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float
+from pgvector.sqlalchemy import Vector
 from sqlalchemy.sql import func
 from core.database import Base
 import uuid
@@ -17,3 +18,8 @@ class User(Base):
     is_superuser = Column(Boolean, default=False)                     # 관리자 여부
     created_at = Column(DateTime(timezone=True), server_default=func.now()) # 가입 일시
     last_active_at = Column(DateTime(timezone=True), nullable=True)   # 마지막 활동 시간 (접속자 집계용)
+
+    # 취향 벡터 (시청 영상 + 구독 채널 임베딩 가중 평균, content/youtube/taste_vector.py에서 갱신)
+    taste_embedding = Column(Vector(1536), nullable=True)
+    taste_weight = Column(Float, nullable=False, server_default="0")  # 누적 가중치 (증분 평균용)
+    taste_updated_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,179 @@
+"""
+실시간 접속자(Presence) 엔진
+- 최근 활동한 uid를 시간 버킷(PRESENCE_BUCKET_SEC) 단위 슬라이딩 윈도우로 관리
+- 접속자 수: 버킷 크기 합 (O(버킷 수) = 상수), 목록: 최신 버킷부터 k명 (O(k))
+- "user" 테이블 COUNT / ORDER BY 스캔 대체. DB 반영(last_active_at)은 ActivityTracker 담당
+- 백엔드 교체 가능 (PRESENCE_BACKEND=memory | redis)
+  - memory: 워커(프로세스)별 상태. uvicorn 워커가 1개일 때 사용
+  - redis: Sorted Set 하나를 모든 워커가 공유 (redis 패키지 필요)
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from core.database import fetch_all
+
+PRESENCE_BACKEND = os.getenv("PRESENCE_BACKEND", "memory")                 # memory | redis
+PRESENCE_WINDOW = int(os.getenv("PRESENCE_WINDOW", "300"))                 # 유지 시간 (초, 통계 최대 조회 범위)
+PRESENCE_BUCKET_SEC = int(os.getenv("PRESENCE_BUCKET_SEC", "10"))          # 버킷 크기 (초, 집계 해상도)
+PRESENCE_REDIS_URL = os.getenv("PRESENCE_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+PRESENCE_REDIS_KEY = os.getenv("PRESENCE_REDIS_KEY", "presence:online")
+
+
+class MemoryPresenceBackend:
+    """
+    프로세스 내 버킷 윈도우
+    - last_seen: uid -> 마지막 활동 시각
+    - buckets: 버킷 번호 -> uid 집합 (uid는 항상 가장 최근 버킷 하나에만 존재)
+    """
+    def __init__(self, window: int = PRESENCE_WINDOW, bucket_sec: int = PRESENCE_BUCKET_SEC):
+        self.window = window
+        self.bucket_sec = max(1, bucket_sec)
+        self.last_seen: dict[int, float] = {}
+        self.buckets: dict[int, set[int]] = {}
+
+    def _bucket(self, ts: float) -> int:
+        return int(ts // self.bucket_sec)
+
+    def _evict(self, now: float):
+        # 윈도우 밖 버킷 통째로 제거 (버킷 수가 상수이므로 O(1) 상각)
+        oldest = self._bucket(now - self.window)
+        for bucket in [b for b in self.buckets if b < oldest]:
+            for user_id in self.buckets.pop(bucket):
+                self.last_seen.pop(user_id, None)
+
+    async def touch(self, user_id: int, ts: float):
+        prev = self.last_seen.get(user_id)
+        if prev is not None:
+            if ts <= prev:
+                return
+            prev_bucket = self._bucket(prev)
+            if prev_bucket != self._bucket(ts) and prev_bucket in self.buckets:
+                self.buckets[prev_bucket].discard(user_id)
+                if not self.buckets[prev_bucket]:
+                    del self.buckets[prev_bucket]
+        self.last_seen[user_id] = ts
+        self.buckets.setdefault(self._bucket(ts), set()).add(user_id)
+
+    async def remove(self, user_id: int):
+        ts = self.last_seen.pop(user_id, None)
+        if ts is not None:
+            bucket = self.buckets.get(self._bucket(ts))
+            if bucket is not None:
+                bucket.discard(user_id)
+
+    async def count(self, seconds: int) -> int:
+        """최근 seconds초 활동 유저 수 (버킷 해상도 단위 근사)"""
+        now = time.time()
+        self._evict(now)
+        if seconds >= self.window:
+            return len(self.last_seen)
+        since = self._bucket(now - seconds)
+        return sum(len(users) for bucket, users in self.buckets.items() if bucket >= since)
+
+    async def recent(self, seconds: int, limit: int) -> list[tuple[int, float]]:
+        """최근 활동순 (uid, 시각) 최대 limit개"""
+        now = time.time()
+        self._evict(now)
+        cutoff = now - seconds
+        since = self._bucket(cutoff)
+        result = []
+        for bucket in sorted((b for b in self.buckets if b >= since), reverse=True):
+            users = sorted(self.buckets[bucket], key=self.last_seen.__getitem__, reverse=True)
+            for user_id in users:
+                ts = self.last_seen[user_id]
+                if ts < cutoff:
+                    break
+                result.append((user_id, ts))
+                if len(result) >= limit:
+                    return result
+        return result
+
+    async def size(self) -> int:
+        return len(self.last_seen)
+
+
+class RedisPresenceBackend:
+    """
+    Redis Sorted Set (member=uid, score=마지막 활동 시각) - 여러 워커가 상태 공유
+    - count: ZCOUNT (O(log n)) / recent: ZREVRANGEBYSCORE LIMIT k (O(log n + k))
+    """
+    def __init__(self, url: str = PRESENCE_REDIS_URL, key: str = PRESENCE_REDIS_KEY, window: int = PRESENCE_WINDOW):
+        import redis.asyncio as redis  # 선택 의존성 (redis 백엔드 사용할 때만 필요)
+        self.redis = redis.from_url(url, decode_responses=True)
+        self.key = key
+        self.window = window
+
+    async def touch(self, user_id: int, ts: float):
+        # GT: 더 최신 시각일 때만 갱신 (DB 시딩 값이 실시간 기록을 덮지 않도록)
+        await self.redis.zadd(self.key, {str(user_id): ts}, gt=True)
+
+    async def remove(self, user_id: int):
+        await self.redis.zrem(self.key, str(user_id))
+
+    async def _evict(self, now: float):
+        await self.redis.zremrangebyscore(self.key, "-inf", now - self.window)
+
+    async def count(self, seconds: int) -> int:
+        now = time.time()
+        await self._evict(now)
+        return await self.redis.zcount(self.key, now - seconds, "+inf")
+
+    async def recent(self, seconds: int, limit: int) -> list[tuple[int, float]]:
+        now = time.time()
+        await self._evict(now)
+        rows = await self.redis.zrevrangebyscore(self.key, "+inf", now - seconds, start=0, num=limit, withscores=True)
+        return [(int(member), score) for member, score in rows]
+
+    async def size(self) -> int:
+        return await self.redis.zcard(self.key)
+
+
+class PresenceEngine:
+    def __init__(self, backend_name: str = PRESENCE_BACKEND, window: int = PRESENCE_WINDOW):
+        self.backend_name = backend_name
+        self.window = window
+        self._backend = None
+
+    @property
+    def backend(self):
+        # Lazy 생성 (redis 모듈은 실제 사용 시점에만 import)
+        if self._backend is None:
+            if self.backend_name == "redis":
+                self._backend = RedisPresenceBackend(window=self.window)
+            else:
+                self._backend = MemoryPresenceBackend(window=self.window)
+        return self._backend
+
+    async def touch(self, user_id: int, ts: float = None):
+        await self.backend.touch(user_id, ts or time.time())
+
+    async def remove(self, user_id: int):
+        await self.backend.remove(user_id)
+
+    async def count(self, minutes: int = 5) -> int:
+        return await self.backend.count(min(minutes * 60, self.window))
+
+    async def recent(self, minutes: int = 5, limit: int = 50) -> list[tuple[int, datetime]]:
+        rows = await self.backend.recent(min(minutes * 60, self.window), limit)
+        return [(user_id, datetime.fromtimestamp(ts, timezone.utc)) for user_id, ts in rows]
+
+    async def seed_from_db(self) -> int:
+        """서버 재시작 직후 접속자 0명으로 보이지 않도록 DB의 최근 활동 유저로 초기화"""
+        limit_time = datetime.now(timezone.utc) - timedelta(seconds=self.window)
+        sql = """
+            SELECT id, last_active_at
+            FROM "user"
+            WHERE last_active_at >= :limit_time
+              AND is_active = true
+        """
+        rows = await fetch_all(sql, {"limit_time": limit_time})
+        for row in rows:
+            await self.backend.touch(row["id"], row["last_active_at"].timestamp())
+        print(f"👥 [Presence] Seeded {len(rows)} active users ({self.backend_name})")
+        return len(rows)
+
+    async def snapshot(self) -> dict:
+        return {"backend": self.backend_name, "window_sec": self.window, "tracked": await self.backend.size()}
+
+
+presence = PresenceEngine()
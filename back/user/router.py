@@ -17,7 +17,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 @router.post("/signup", response_model=schemas.UserResponse)
 async def signup(user: schemas.UserCreate):
     # 1. 이메일 중복 체크
-    db_user = await service.get_user_by_email(email=user.email)
+    db_user = await service.get_user_by_email(email=user.email, use_primary=True)
     if db_user:
         raise HTTPException(
             status_code=400, 
@@ -33,7 +33,7 @@ async def signup(user: schemas.UserCreate):
 @router.post("/login", response_model=schemas.Token)
 async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
     # 1. 사용자 조회 (Async Raw SQL)
-    user = await service.get_user_by_email(form_data.username)
+    user = await service.get_user_by_email(form_data.username, use_primary=True)
     if not user:
         raise HTTPException(status_code=400, detail="이메일 또는 비밀번호가 틀렸습니다.")
     
@@ -70,16 +70,17 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
+        uid = payload.get("uid")
     except JWTError:
         raise credentials_exception
     
-    # 사용자 조회 (Async Raw SQL)
-    user = await service.get_user_by_email(email=email)
+    # 사용자 조회 (uid 캐시 우선 -> Async Raw SQL)
+    user = await service.get_auth_user(email=email, user_id=uid)
     if user is None:
         raise credentials_exception
         
-    # [Active 전략] API 호출 시마다 마지막 활동 시간 갱신
-    await service.update_last_active(user["id"])
+    # [Active 전략] API 호출 시마다 마지막 활동 시간 갱신 (메모리 기록, 주기적 일괄 반영)
+    await service.update_last_active(user["id"], is_active=user.get("is_active", True))
     
     return user
 
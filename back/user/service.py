@@ -1,6 +1,9 @@
 from .schemas import UserCreate
 from .auth import get_password_hash
-from core.database import execute, fetch_one, fetch_all, insert_and_return  # Raw SQL 래퍼 사용
+from core.database import execute, fetch_one, fetch_all, insert_and_return, register_statement  # Raw SQL 래퍼 사용
+from .cache import user_cache
+from .activity import activity_tracker
+from .presence import presence
 from datetime import datetime, timedelta
 import uuid
 
@@ -8,20 +11,46 @@ import uuid
 #  User 서비스 (Raw SQL 버전)
 # ========================================================
 
-async def get_user_by_email(email: str):
-    """이메일로 사용자 조회 (Async Raw SQL)"""
-    sql = 'SELECT * FROM "user" WHERE email = :email'
-    return await fetch_one(sql, {"email": email})
+# 자주 쓰는 조회문 (import 시 1회 컴파일, Prepared Statement 재사용)
+# taste_embedding(1536차원)은 인증/프로필 조회에 불필요 -> SELECT * 대신 컬럼 명시
+USER_COLUMNS = "id, uuid, email, hashed_password, nickname, is_active, is_superuser, created_at, last_active_at"
+GET_USER_BY_EMAIL = register_statement("user.get_by_email", f'SELECT {USER_COLUMNS} FROM "user" WHERE email = :email')
+GET_USER_BY_ID = register_statement("user.get_by_id", f'SELECT {USER_COLUMNS} FROM "user" WHERE id = :user_id')
+GET_USER_BY_UUID = register_statement("user.get_by_uuid", f'SELECT {USER_COLUMNS} FROM "user" WHERE uuid = :uuid')
+GET_USERS_BY_IDS = register_statement("user.get_by_ids", """
+    SELECT id, uuid, nickname, email
+    FROM "user"
+    WHERE id = ANY(:ids)
+      AND is_active = true
+""")
+
+async def get_user_by_email(email: str, use_primary: bool = False):
+    """이메일로 사용자 조회 (Async Raw SQL, 가입/로그인 직후처럼 최신값이 필요하면 use_primary=True)"""
+    return await fetch_one(GET_USER_BY_EMAIL, {"email": email}, use_primary=use_primary)
 
 async def get_user_by_id(user_id: int):
     """ID로 사용자 조회 (Async Raw SQL)"""
-    sql = 'SELECT * FROM "user" WHERE id = :user_id'
-    return await fetch_one(sql, {"user_id": user_id})
+    return await fetch_one(GET_USER_BY_ID, {"user_id": user_id})
 
 async def get_user_by_uuid(uuid: str):
     """UUID로 사용자 조회 (Async Raw SQL)"""
-    sql = 'SELECT * FROM "user" WHERE uuid = :uuid'
-    return await fetch_one(sql, {"uuid": uuid})
+    return await fetch_one(GET_USER_BY_UUID, {"uuid": uuid})
+
+async def get_auth_user(email: str, user_id: int = None):
+    """
+    인증용 사용자 조회 (토큰의 uid 기준 캐시 우선, 미스 시 이메일로 조회)
+    - uid가 없는 예전 토큰은 캐시 없이 매번 조회
+    """
+    if user_id is not None:
+        user = user_cache.get(user_id)
+        if user and user["email"] == email:
+            return user
+
+    # 캐시 미스는 드물므로 Primary에서 조회 (가입 직후 복제 지연으로 401 나지 않도록)
+    user = await get_user_by_email(email, use_primary=True)
+    if user and user["id"] == user_id:
+        user_cache.put(user_id, user)
+    return user
 
 
 async def create_user(user: UserCreate):
@@ -49,49 +78,39 @@ async def create_user(user: UserCreate):
     # 4. 실행 및 결과 반환
     return await insert_and_return(sql, params)
 
-async def update_last_active(user_id: int):
-    """유저 마지막 활동 시간 갱신 (Heartbeat)"""
-    sql = """
-        UPDATE "user"
-        SET last_active_at = NOW()
-        WHERE id = :user_id
+async def update_last_active(user_id: int, is_active: bool = True):
+    """
+    유저 마지막 활동 시간 갱신 (Heartbeat)
+    - Write-Behind: 메모리에 기록 후 ActivityTracker가 몇 초마다 일괄 UPDATE
+    - 접속자 집계는 Presence 엔진에 기록 (비활성 계정은 집계 제외)
     """
-    await execute(sql, {"user_id": user_id})
+    activity_tracker.touch(user_id)
+    if is_active:
+        await presence.touch(user_id)
 
 async def count_online_users(minutes: int = 5):
     """
     최근 N분 내 활동 유저 수 조회
     """
-    # Python에서 시간 계산 (DB 종속성 제거 및 안전성 확보)
-    limit_time = datetime.now() - timedelta(minutes=minutes)
-    
-    sql = """
-        SELECT COUNT(*) as count 
-        FROM "user" 
-        WHERE last_active_at >= :limit_time
-          AND is_active = true
-    """
-    
-    result = await fetch_one(sql, {"limit_time": limit_time})
-    return result["count"] if result else 0
+    # Presence 엔진 메모리 집계 (DB COUNT 스캔 없음)
+    return await presence.count(minutes)
 
 async def get_online_users_list(minutes: int = 5):
     """
     최근 N분 내 활동 유저 목록 조회 (닉네임, 이메일 등)
     """
-    limit_time = datetime.now() - timedelta(minutes=minutes)
-    
-    sql = """
-        SELECT id, uuid, nickname, email, last_active_at
-        FROM "user" 
-        WHERE last_active_at >= :limit_time
-          AND is_active = true
-        ORDER BY last_active_at DESC
-        LIMIT 50
-    """
     # 너무 많으면 UI 터지니까 일단 50명 제한
-    
-    return await fetch_all(sql, {"limit_time": limit_time})
+    recent = await presence.recent(minutes, limit=50)
+    if not recent:
+        return []
+
+    # 상위 k명만 PK로 조회 (정렬/시간은 Presence 기준)
+    rows = await fetch_all(GET_USERS_BY_IDS, {"ids": [user_id for user_id, _ in recent]})
+    users = {row["id"]: row for row in rows}
+    return [
+        {**users[user_id], "last_active_at": active_at}
+        for user_id, active_at in recent if user_id in users
+    ]
 
 async def get_all_users_list(limit: int = 50):
     """
@@ -113,6 +132,11 @@ async def mark_user_offline(user_id: int):
     # 5분 조회 조건에서 즉시 빠지도록 1시간 전으로 세팅
     past_time = datetime.now() - timedelta(hours=1)
     
+    # 아직 반영 안 된 활동 기록이 뒤늦게 덮어쓰지 않도록 제거
+    activity_tracker.discard(user_id)
+    await presence.remove(user_id)
+    user_cache.invalidate(user_id)  # 유저 행이 바뀌므로 인증 캐시에서도 제거
+
     sql = """
         UPDATE "user"
         SET last_active_at = :past_time
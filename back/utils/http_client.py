@@ -0,0 +1,102 @@
+import os
+import asyncio
+import random
+import urllib.parse
+import httpx
+
+# ========================================================
+#  공용 비동기 HTTP 클라이언트 (Keep-Alive Pool + 호스트별 동시성 제한)
+#  - 모든 client/* 모듈은 requests 대신 이 모듈을 통해 외부 API 호출
+#  - 느린 호스트 하나가 워커 전체(이벤트 루프)를 막지 않도록 함
+# ========================================================
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))   # 전체 커넥션 상한
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))        # 유지할 Keep-Alive 커넥션 수
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "10"))      # 호스트별 동시 요청 수
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))                  # 기본 타임아웃 (초)
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))             # 재시도 횟수 (최초 요청 제외)
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))       # 지수 백오프 기본값 (초)
+
+# 재시도 대상 상태 코드 (Rate Limit / 일시적 서버 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_client: httpx.AsyncClient | None = None
+_host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """프로세스 전역 AsyncClient (Lazy 생성, 커넥션 풀 공유)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE
+            ),
+            follow_redirects=True
+        )
+    return _client
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urllib.parse.urlsplit(url).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(HTTP_PER_HOST_LIMIT)
+    return _host_semaphores[host]
+
+
+def _backoff_seconds(attempt: int, response: httpx.Response = None) -> float:
+    # 429 응답에 Retry-After(초)가 있으면 우선 사용
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+    return HTTP_BACKOFF_BASE * (2 ** attempt) + random.uniform(0, HTTP_BACKOFF_BASE)
+
+
+async def http_get(
+    url: str,
+    params: dict = None,
+    headers: dict = None,
+    timeout: float = None,
+    retries: int = None
+) -> httpx.Response:
+    """
+    비동기 GET (호스트별 동시성 제한 + 타임아웃 + 지수 백오프 재시도)
+    - 재시도 대상 상태코드/네트워크 오류는 retries 횟수만큼 재시도
+    - 최종 응답은 상태코드와 무관하게 반환 (판단은 호출자 몫)
+    - 재시도 후에도 네트워크 오류면 httpx.HTTPError 발생
+    """
+    client = get_http_client()
+    max_retries = HTTP_MAX_RETRIES if retries is None else retries
+    semaphore = _host_semaphore(url)
+
+    attempt = 0
+    while True:
+        response = None
+        try:
+            async with semaphore:
+                response = await client.get(
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=timeout if timeout is not None else HTTP_TIMEOUT
+                )
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+                return response
+        except (httpx.TimeoutException, httpx.TransportError):
+            if attempt >= max_retries:
+                raise
+
+        # 세마포어 밖에서 대기 (대기 중 슬롯 점유 방지)
+        await asyncio.sleep(_backoff_seconds(attempt, response))
+        attempt += 1
+
+
+async def close_http_client():
+    """앱 종료 시 커넥션 풀 정리"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
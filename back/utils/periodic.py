@@ -0,0 +1,52 @@
+import asyncio
+from typing import Awaitable, Callable
+
+
+class PeriodicTask:
+    """
+    [비동기] 주기 실행 백그라운드 작업 (Write-Behind flush 등)
+    - start(): 이벤트 루프에 루프 태스크 등록 (앱 startup에서 호출)
+    - stop(): 루프 취소 후 마지막으로 1회 더 실행 (앱 shutdown에서 호출 -> 남은 데이터 유실 방지)
+    - 실행 중 예외는 로그만 남기고 다음 주기에 재시도
+    사용법:
+        task = PeriodicTask("activity-flush", 5, tracker.flush)
+        task.start()
+        await task.stop()
+    """
+    def __init__(self, name: str, interval: float, func: Callable[[], Awaitable[object]]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+        print(f"⏱️ [{self.name}] started (every {self.interval}s)")
+
+    async def _run_once(self):
+        try:
+            await self.func()
+        except Exception as e:
+            print(f"❌ [{self.name}] 실행 실패: {e}")
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._run_once()
+
+    async def stop(self, run_final: bool = True):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if run_final:
+            await self._run_once()
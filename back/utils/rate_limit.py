@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    [비동기] 토큰 버킷 Rate Limiter
+    - capacity: 버킷 최대 용량 (순간 허용량)
+    - refill_per_sec: 초당 충전량
+    사용법:
+        bucket = TokenBucket(capacity=1_000_000, refill_per_sec=1_000_000 / 60)
+        await bucket.acquire(cost)  # 토큰이 모자라면 충전될 때까지 대기
+    """
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = float(capacity)
+        self.refill_per_sec = float(refill_per_sec)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_sec)
+        self.updated_at = now
+
+    async def acquire(self, cost: float = 1):
+        """cost 만큼 토큰 차감 (부족하면 대기). capacity보다 큰 요청은 capacity로 잘라서 처리"""
+        cost = min(float(cost), self.capacity)
+        # Lock으로 대기 순서 보장 (먼저 온 요청이 먼저 나감)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return
+                wait_sec = (cost - self.tokens) / self.refill_per_sec
+                await asyncio.sleep(wait_sec)
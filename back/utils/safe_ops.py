@@ -1,6 +1,6 @@
 import json
 import os
-import requests
+from utils.http_client import http_get
 
 def load_json_safe(file_path: str, default_data: dict = None) -> dict:
     """
@@ -41,13 +41,13 @@ def append_json_line(file_path: str, data: dict):
     except Exception as e:
         print(f"Log append error: {e}")
 
-def safe_http_get(url: str, headers: dict = None) -> tuple[dict, str]:
+async def safe_http_get(url: str, headers: dict = None, params: dict = None, timeout: float = None) -> tuple[dict, str]:
     """
-    HTTP GET 요청을 안전하게 수행합니다.
+    HTTP GET 요청을 안전하게 수행합니다. (비동기, 공용 커넥션 풀 사용)
     :return: (성공시_JSON데이터, 실패시_에러메시지) 튜플 반환
     """
     try:
-        response = requests.get(url, headers=headers)
+        response = await http_get(url, params=params, headers=headers, timeout=timeout)
         if response.status_code == 200:
             return response.json(), None
         else:
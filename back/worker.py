@@ -0,0 +1,41 @@
+from dotenv import load_dotenv
+load_dotenv(override=True) # .env 파일 로드 (시스템 환경변수 덮어쓰기)
+
+# ========================================================
+#  백그라운드 작업 워커 (API 프로세스와 분리 실행)
+#  실행: python worker.py                      -> 등록된 모든 작업 처리
+#        python worker.py --types youtube.collect_trend_one,admin.migrate_vectors
+#  여러 대 띄워도 됨 (SKIP LOCKED로 작업 중복 없음)
+# ========================================================
+import argparse
+import asyncio
+import signal
+
+from core.job_queue import JobWorker, JOB_REGISTRY, load_job_modules
+from utils.http_client import close_http_client
+
+load_job_modules()
+
+
+async def main(job_types: list[str] | None):
+    worker = JobWorker(job_types)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C는 KeyboardInterrupt로 처리
+
+    try:
+        await worker.run()
+    finally:
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AiSogeThing background job worker")
+    parser.add_argument("--types", default="", help=f"처리할 작업 종류 (콤마 구분, 기본: 전체). 등록됨: {', '.join(JOB_REGISTRY)}")
+    args = parser.parse_args()
+    types = [t.strip() for t in args.types.split(",") if t.strip()] or None
+    asyncio.run(main(types))
@@ -38,12 +38,15 @@ npm run build
 echo "🔥 [4/4] PM2 프로세스 재시작 (완전 삭제 후 재시작)..."
 # 기존 프로세스 완전 삭제
 pm2 delete backend || true
+pm2 delete worker || true
 pm2 delete frontend || true
 
 # 새로 시작 (빌드된 파일 기준으로 시작해야 함. ecosystem.config.js 확인 필요)
 # 임시로 dev 서버 다시 시작 (나중에 serve로 바꿔야 함)
 cd "$BACK_DIR"
 pm2 start "uvicorn main:app --host 0.0.0.0 --port 8400" --name backend --update-env
+# 백그라운드 작업 워커 (수집/벡터화/웹툰 생성, jobs 테이블 큐)
+pm2 start "python worker.py" --name worker --update-env --kill-timeout 35000
 
 cd "$FRONT_DIR"
 pm2 start "npm run dev" --name frontend --update-env